@@ -0,0 +1,210 @@
+"""
+Async Download Client
+Excel kaynaklarını (Google Sheets export) event loop'u bloklamadan indirir
+"""
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadError(Exception):
+    """İndirme hatası"""
+    pass
+
+
+class DownloadClient:
+    """
+    Paylaşılan aiohttp session üzerinden koşullu (ETag / If-Modified-Since)
+    indirme yapan client.
+    
+    - Dosya önce geçici dosyaya yazılır, sonra atomik olarak yerine taşınır
+      (yarım kalan indirme cache'i bozmaz)
+    - Sunucu 304 dönerse dosyaya dokunulmaz
+    - source_override ayarlanmışsa indirmeler yerel bir klasörden veya
+      başka bir base URL'den yapılır (offline benchmark için)
+    """
+    
+    def __init__(self, timeout: int = 30, source_override: str = "", max_connections: int = 4):
+        """
+        Initialize download client
+        
+        Args:
+            timeout: İstek timeout'u (saniye)
+            source_override: Yerel klasör veya base URL (boşsa orijinal URL kullanılır)
+            max_connections: Bağlantı havuzu limiti
+        """
+        self.timeout = timeout
+        self.source_override = source_override.strip()
+        self.max_connections = max_connections
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+        logger.info(f"DownloadClient initialized (override: {self.source_override or '-'})")
+    
+    async def _ensure_session(self):
+        """Ensure pooled aiohttp session exists"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            logger.debug("Created new aiohttp session")
+    
+    async def download(self, url: str, target_path: Path) -> bool:
+        """
+        Dosyayı indir ve target_path'e atomik olarak yaz
+        
+        Args:
+            url: Kaynak URL
+            target_path: Hedef dosya yolu
+        
+        Returns:
+            Yeni içerik yazıldıysa True, kaynak değişmemişse (304) False
+        
+        Raises:
+            DownloadError: İndirme başarısız olursa
+        """
+        target_path = Path(target_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        if self.source_override and not self._is_url(self.source_override):
+            return await self._copy_from_directory(target_path)
+        
+        if self.source_override:
+            url = urljoin(self.source_override.rstrip('/') + '/', target_path.name)
+        
+        return await self._download_http(url, target_path)
+    
+    async def _download_http(self, url: str, target_path: Path) -> bool:
+        """HTTP üzerinden koşullu indirme"""
+        await self._ensure_session()
+        
+        headers = {}
+        validators = self._read_validators(target_path) if target_path.exists() else {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        logger.info(f"İndiriliyor: {url}")
+        tmp_path = target_path.with_name(target_path.name + '.tmp')
+        
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    logger.info(f"Kaynak değişmemiş (304): {target_path.name}")
+                    return False
+                
+                if response.status >= 400:
+                    raise DownloadError(f"HTTP {response.status}: {url}")
+                
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        f.write(chunk)
+                
+                self._validate_file(tmp_path, target_path)
+                os.replace(tmp_path, target_path)
+                
+                self._write_validators(target_path, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                })
+                
+                logger.info(f"Dosya indirildi: {target_path} ({target_path.stat().st_size} byte)")
+                return True
+        
+        except aiohttp.ClientError as e:
+            raise DownloadError(f"Network error: {e}")
+        
+        except asyncio.TimeoutError:
+            raise DownloadError(f"Request timeout after {self.timeout}s: {url}")
+        
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    async def _copy_from_directory(self, target_path: Path) -> bool:
+        """Yerel klasördeki aynı isimli dosyayı kopyala (mtime/size ile koşullu)"""
+        source_path = Path(self.source_override) / target_path.name
+        
+        if not source_path.exists():
+            raise DownloadError(f"Yerel kaynak bulunamadı: {source_path}")
+        
+        stat = source_path.stat()
+        validators = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        
+        if target_path.exists() and self._read_validators(target_path) == validators:
+            logger.info(f"Yerel kaynak değişmemiş: {source_path}")
+            return False
+        
+        tmp_path = target_path.with_name(target_path.name + '.tmp')
+        
+        try:
+            await asyncio.to_thread(shutil.copyfile, source_path, tmp_path)
+            self._validate_file(tmp_path, target_path)
+            os.replace(tmp_path, target_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        
+        self._write_validators(target_path, validators)
+        logger.info(f"Yerel kaynaktan kopyalandı: {source_path} -> {target_path}")
+        return True
+    
+    def _validate_file(self, tmp_path: Path, target_path: Path):
+        """İndirilen dosyanın boş olmadığını ve xlsx ise zip olduğunu kontrol et"""
+        if tmp_path.stat().st_size == 0:
+            raise DownloadError(f"İndirilen dosya boş: {target_path.name}")
+        
+        # xlsx bir zip arşividir - giriş sayfası gibi HTML cevapları cache'e yazma
+        if target_path.suffix.lower() == '.xlsx':
+            with open(tmp_path, 'rb') as f:
+                if f.read(2) != b'PK':
+                    raise DownloadError(f"Beklenmeyen içerik (xlsx değil): {target_path.name}")
+    
+    @staticmethod
+    def _is_url(value: str) -> bool:
+        return value.startswith(('http://', 'https://'))
+    
+    @staticmethod
+    def _validators_path(target_path: Path) -> Path:
+        return target_path.with_name(target_path.name + '.meta.json')
+    
+    def _read_validators(self, target_path: Path) -> Dict:
+        """Son indirmenin ETag/Last-Modified bilgisini oku"""
+        try:
+            with open(self._validators_path(target_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_validators(self, target_path: Path, validators: Dict):
+        """ETag/Last-Modified bilgisini dosyanın yanına kaydet"""
+        validators = {k: v for k, v in validators.items() if v is not None}
+        try:
+            with open(self._validators_path(target_path), 'w', encoding='utf-8') as f:
+                json.dump(validators, f)
+        except OSError as e:
+            logger.warning(f"Validator kaydedilemedi ({target_path.name}): {e}")
+    
+    async def close(self):
+        """Close aiohttp session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.debug("Closed aiohttp session")
+
+
+# Global instance
+download_client = DownloadClient(
+    timeout=settings.download_timeout,
+    source_override=settings.download_source_override
+)
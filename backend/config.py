@@ -31,6 +31,16 @@ class Settings(BaseSettings):
     
     # Cache Configuration
     excel_cache_path: str = "./data/cache/standart.xlsx"
+    snapshot_path: str = "./data/cache/state_snapshot.pkl"  # Warm start snapshot'ı
+    
+    # Download Configuration
+    download_timeout: int = 30
+    # Yerel klasör veya base URL - ayarlanırsa Excel'ler buradan indirilir (offline benchmark için)
+    download_source_override: str = ""
+    
+    # Build Executor Configuration (Excel parse / TF-IDF fit gibi CPU işleri)
+    build_executor_mode: str = "process"  # "process" veya "thread"
+    build_executor_workers: int = 2
     
     # Groq LLM Configuration
     groq_api_key: str = ""
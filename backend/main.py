@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -18,6 +18,7 @@ async def auto_refresh_task():
     """Background task to refresh data every 10 minutes"""
     from services.excel_service import excel_service
     from services.embedding_service import embedding_service
+    from services.snapshot_service import snapshot_service
     
     while True:
         try:
@@ -27,9 +28,15 @@ async def auto_refresh_task():
             logger.info("🔄 Otomatik yenileme başlıyor...")
             
             # Excel'i yeniden indir
+            previous_generation = excel_service.data_generation
             success = await excel_service.refresh_data()
             
             if success:
+                # İçerik değişmediyse embedding'leri yeniden oluşturma
+                if excel_service.data_generation == previous_generation and embedding_service.is_ready:
+                    logger.info("✅ Otomatik yenileme: Excel değişmemiş, embedding yenileme atlandı")
+                    continue
+                
                 # Embedding'leri yeniden oluştur
                 profiles = excel_service.get_profiles()
                 emb_success = await embedding_service.initialize(profiles)
@@ -37,6 +44,7 @@ async def auto_refresh_task():
                 if emb_success:
                     stats = excel_service.get_stats()
                     logger.info(f"✅ Otomatik yenileme tamamlandı: {stats['total_profiles']} profil")
+                    await asyncio.to_thread(snapshot_service.save_if_changed)
                 else:
                     logger.error("❌ Embedding yenileme başarısız")
             else:
@@ -49,6 +57,7 @@ async def auto_refresh_task():
 async def auto_refresh_catalog_task():
     """Background task to refresh catalog every 10 minutes"""
     from services.catalog_service import catalog_service
+    from services.snapshot_service import snapshot_service
     
     while True:
         try:
@@ -57,6 +66,7 @@ async def auto_refresh_catalog_task():
             success = await catalog_service.initialize()
             if success:
                 logger.info("✅ Katalog yenileme tamamlandı")
+                await asyncio.to_thread(snapshot_service.save_if_changed)
             else:
                 logger.error("❌ Katalog yenileme başarısız")
         except Exception as e:
@@ -74,65 +84,69 @@ async def initialize_services_background():
     from services.llm_service import LLMService
     import services.llm_service as llm_module
     from services.similarity_service import similarity_service
+    from services.snapshot_service import snapshot_service
+    from services.init_orchestrator import init_orchestrator
     
     try:
         logger.info("🚀 Background initialization starting...")
         
-        # Initialize Excel service (standart profiller)
-        success = await excel_service.initialize()
-        if not success:
-            logger.error("Excel servisi başlatılamadı!")
-        else:
-            stats = excel_service.get_stats()
-            logger.info(f"✅ Excel servisi hazır: {stats['total_profiles']} profil")
-            
-            # Initialize Embedding service
-            profiles = excel_service.get_profiles()
-            emb_success = await embedding_service.initialize(profiles)
-            
-            if emb_success:
-                logger.info("✅ Embedding servisi hazır")
-            else:
-                logger.error("❌ Embedding servisi başlatılamadı!")
+        # Warm start: kaynak hash'leri eşleşiyorsa türetilmiş durumu snapshot'tan yükle
+        warm_started = await asyncio.to_thread(snapshot_service.load)
+        if warm_started:
+            llm_module.llm_service = LLMService(rag_service=rag_service)
+            logger.info("⚡ Snapshot'tan warm start yapıldı, kaynaklar arka planda doğrulanıyor")
         
-        # Initialize Catalog service (tüm profiller)
-        catalog_success = await catalog_service.initialize()
-        if catalog_success:
-            cat_stats = catalog_service.get_stats()
-            logger.info(f"✅ Katalog servisi hazır: {cat_stats['total_profiles']} profil")
-        else:
-            logger.error("❌ Katalog servisi başlatılamadı!")
+        excel_generation = excel_service.data_generation
         
-        # Initialize Image service (profil görselleri)
-        image_success = await image_service.initialize()
-        if image_success:
-            logger.info("✅ Image servisi hazır")
-        else:
-            logger.warning("⚠️ Image servisi başlatılamadı")
+        async def init_excel():
+            # Standart profiller
+            return await excel_service.initialize()
         
-        # Initialize Connection service (profil birleşim sistemleri)
-        try:
+        async def init_embeddings():
+            if embedding_service.is_ready and excel_service.data_generation == excel_generation:
+                logger.info("Excel verisi snapshot ile aynı, embedding yeniden oluşturulmadı")
+                return True
+            return await embedding_service.initialize(excel_service.get_profiles())
+        
+        async def init_catalog():
+            # Tüm katalog profilleri
+            return await catalog_service.initialize()
+        
+        async def init_images():
+            return await image_service.initialize()
+        
+        async def init_connections():
+            # Profil birleşim sistemleri (hata durumunda DataLoadError fırlatır)
             await connection_service.initialize()
-            conn_data = connection_service.get_all_systems()
-            logger.info(f"✅ Connection servisi hazır: {len(conn_data)} sistem")
-        except Exception as e:
-            logger.error(f"❌ Connection servisi başlatılamadı: {e}")
         
-        # Initialize Similarity service (benzerlik arama)
-        try:
+        async def init_similarity():
             await similarity_service.initialize()
-            if similarity_service.available:
-                logger.info("✅ Benzerlik servisi hazır")
-            else:
-                logger.warning("⚠️ Benzerlik servisi kullanılamıyor")
-        except Exception as e:
-            logger.error(f"❌ Benzerlik servisi başlatılamadı: {e}")
+            return similarity_service.available
+        
+        async def init_llm():
+            if llm_module.llm_service is None:
+                llm_module.llm_service = LLMService(rag_service=rag_service)
+        
+        # Embedding'ler standart profillere bağlı, diğer servisler birbirinden bağımsız.
+        # LLM servisi (RAG) veri servisleri bittikten sonra, sonuçlarından bağımsız oluşturulur.
+        init_orchestrator.register("excel", init_excel)
+        init_orchestrator.register("embeddings", init_embeddings, depends_on=("excel",))
+        init_orchestrator.register("catalog", init_catalog)
+        init_orchestrator.register("images", init_images, critical=False)
+        init_orchestrator.register("connections", init_connections)
+        init_orchestrator.register("similarity", init_similarity, critical=False)
+        init_orchestrator.register("llm", init_llm, after=("embeddings", "catalog", "connections"))
+        
+        statuses = await init_orchestrator.run()
         
-        # Initialize LLM service with RAG service
-        llm_module.llm_service = LLMService(rag_service=rag_service)
-        logger.info("✅ LLM servisi hazır")
+        # Veri değiştiyse (veya ilk açılışsa) snapshot'ı güncelle
+        await asyncio.to_thread(snapshot_service.save_if_changed)
         
-        logger.info("🎉 All services initialized successfully!")
+        status = init_orchestrator.get_status()
+        if status["status"] == "ready":
+            logger.info(f"🎉 All services initialized successfully! ({status['total_duration_ms']:.0f} ms)")
+        else:
+            logger.warning(f"⚠️ Initialization finished with issues: {statuses}")
         
     except Exception as e:
         logger.error(f"❌ Background initialization error: {e}")
@@ -174,6 +188,20 @@ async def lifespan(app: FastAPI):
     except:
         pass
     
+    # Close download client
+    try:
+        from clients.download_client import download_client
+        await download_client.close()
+    except:
+        pass
+    
+    # Shut down build executor pool
+    try:
+        from services.build_executor import build_executor
+        build_executor.shutdown()
+    except:
+        pass
+    
     logger.info("Shutting down Beymetal Chat API...")
 
 
@@ -209,18 +237,50 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint - always returns healthy for quick startup"""
+    """Health check endpoint - her zaman 200 döner, servis bazında hazır olma durumunu içerir"""
     try:
         from services.excel_service import excel_service
         from services.embedding_service import embedding_service
+        from services.catalog_service import catalog_service
+        from services.connection_service import connection_service
+        from services.image_service import image_service
+        from services.similarity_service import similarity_service
         from services.llm_service import llm_service
+        from services.init_orchestrator import init_orchestrator
+        from services.build_executor import build_executor
+        from services.response_cache import catalog_response_cache
         
         stats = excel_service.get_stats()
         emb_stats = embedding_service.get_stats()
         llm_stats = llm_service.get_stats() if llm_service else {"is_enabled": False}
+        init_status = init_orchestrator.get_status()
+        
+        # Gerçek servis durumu (warm start'ta init bitmeden de hazır olabilir)
+        services = {
+            "excel": stats["total_profiles"] > 0,
+            "embeddings": emb_stats["is_ready"],
+            "catalog": catalog_service.is_ready,
+            "connections": connection_service.is_ready,
+            "images": image_service.is_ready,
+            "similarity": similarity_service.available,
+            "llm": llm_service is not None
+        }
+        critical_ready = all(services[name] for name in ("excel", "embeddings", "catalog", "connections", "llm"))
+        
+        if critical_ready:
+            status = "healthy"
+        elif init_status["status"] == "initializing":
+            status = "initializing"
+        else:
+            status = "degraded"
         
         return {
-            "status": "healthy",
+            "status": status,
+            "ready": critical_ready,
+            "services": services,
+            "init": init_status,
+            "build_executor": build_executor.get_stats(),
+            "response_cache": catalog_response_cache.get_stats(),
             "llm_enabled": llm_stats.get("is_enabled", False),
             "llm_stats": llm_stats,
             "vector_db_ready": emb_stats["is_ready"],
@@ -233,7 +293,7 @@ async def health_check():
         # During startup, services might not be ready yet
         logger.warning(f"Health check: services initializing... {e}")
         return {
-            "status": "healthy",
+            "status": "initializing",
             "message": "Services are initializing in background",
             "ready": False
         }
@@ -248,25 +308,34 @@ async def refresh_data():
     try:
         # Excel'i yeniden indir
         logger.info("Excel yenileniyor...")
+        previous_generation = excel_service.data_generation
         success = await excel_service.refresh_data()
         
         if not success:
             raise HTTPException(status_code=500, detail="Excel yenileme başarısız")
         
-        # Embedding'leri yeniden oluştur
-        logger.info("Embedding'ler yeniden oluşturuluyor...")
-        profiles = excel_service.get_profiles()
-        emb_success = await embedding_service.initialize(profiles)
+        # Embedding'leri sadece veri değiştiyse yeniden oluştur
+        data_changed = excel_service.data_generation != previous_generation
+        rebuild_embeddings = data_changed or not embedding_service.is_ready
         
-        if not emb_success:
-            raise HTTPException(status_code=500, detail="Embedding yenileme başarısız")
+        if rebuild_embeddings:
+            logger.info("Embedding'ler yeniden oluşturuluyor...")
+            profiles = excel_service.get_profiles()
+            emb_success = await embedding_service.initialize(profiles)
+            
+            if not emb_success:
+                raise HTTPException(status_code=500, detail="Embedding yenileme başarısız")
+        else:
+            logger.info("Excel değişmemiş, embedding yenileme atlandı")
         
         stats = excel_service.get_stats()
         return {
             "status": "success",
             "profiles_updated": stats["total_profiles"],
             "last_update": stats["last_update"],
-            "embeddings_rebuilt": True
+            "data_changed": data_changed,
+            "data_generation": stats["data_generation"],
+            "embeddings_rebuilt": rebuild_embeddings
         }
             
     except Exception as e:
@@ -586,6 +655,7 @@ async def get_categories(companies: str = None):
         companies: Virgülle ayrılmış şirket listesi (örn: "linearossa,beymetal,alfore")
     """
     from services.catalog_service import catalog_service
+    from services.response_cache import catalog_response_cache
     
     try:
         # Şirket listesini parse et
@@ -593,14 +663,19 @@ async def get_categories(companies: str = None):
         if companies:
             company_list = [c.strip() for c in companies.split(',') if c.strip()]
         
-        categories = catalog_service.get_categories(companies=company_list)
-        stats = catalog_service.get_stats()
+        def build():
+            return {
+                "categories": catalog_service.get_categories(companies=company_list),
+                "stats": catalog_service.get_stats(),
+                "filtered_companies": company_list
+            }
         
-        return {
-            "categories": categories,
-            "stats": stats,
-            "filtered_companies": company_list
-        }
+        body = catalog_response_cache.get_or_build(
+            catalog_service.data_generation,
+            ("categories", tuple(company_list) if company_list else None),
+            build
+        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Categories error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -610,13 +685,23 @@ async def get_categories(companies: str = None):
 async def get_all_profiles(limit: int = 100):
     """Tüm profilleri getir"""
     from services.catalog_service import catalog_service
+    from services.response_cache import catalog_response_cache
     
     try:
-        profiles = catalog_service.get_all_profiles()
-        return {
-            "profiles": profiles[:limit],
-            "total": len(profiles)
-        }
+        def build():
+            profiles = catalog_service.profiles
+            return {
+                "profiles": [p.to_dict() for p in profiles[:limit]],
+                "total": len(profiles)
+            }
+        
+        body = catalog_response_cache.get_or_build(
+            catalog_service.data_generation,
+            ("profiles", limit),
+            build,
+            scope=("head", limit)
+        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Get profiles error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -641,6 +726,92 @@ async def get_profile(profile_no: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/catalog/codes")
+async def get_catalog_codes(prefix: str = "", limit: int = 50):
+    """
+    Kod önekine göre profil numaraları (otomatik tamamlama)
+    
+    Args:
+        prefix: Kod öneki (örn: "LR3101", "lr-3101", "GLR64")
+        limit: Maksimum kod sayısı
+    """
+    from services.catalog_service import catalog_service
+    from services.response_cache import catalog_response_cache
+    
+    try:
+        def build():
+            result = catalog_service.get_codes_by_prefix(prefix, limit=limit)
+            return {
+                "prefix": prefix,
+                "codes": result['codes'],
+                "count": len(result['codes']),
+                "total": result['total']
+            }
+        
+        body = catalog_response_cache.get_or_build(
+            catalog_service.data_generation,
+            ("codes", prefix, limit),
+            build,
+            scope=("codes", prefix)
+        )
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error(f"Get catalog codes error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/catalog/facets")
+async def get_catalog_facets(
+    categories: str = None,
+    companies: str = None,
+    standard: bool = None,
+    has_mold: bool = None
+):
+    """
+    Filtre paneli için facet sayımları (kategori, şirket, standart/özel, kalıp)
+    
+    Args:
+        categories: Virgülle ayrılmış kategoriler (profil hepsinde bulunmalı)
+        companies: Virgülle ayrılmış şirket listesi
+        standard: Sadece standart (true) veya özel (false) profiller
+        has_mold: Sadece kalıbı olan (true) veya olmayan (false) profiller
+    """
+    from services.catalog_service import catalog_service
+    from services.response_cache import catalog_response_cache
+    
+    try:
+        category_list = [c.strip() for c in categories.split(',') if c.strip()] if categories else None
+        company_list = [c.strip() for c in companies.split(',') if c.strip()] if companies else None
+        
+        def build():
+            return {
+                "filters": {
+                    "categories": category_list,
+                    "companies": company_list,
+                    "standard": standard,
+                    "has_mold": has_mold
+                },
+                "facets": catalog_service.get_facets(category_list, company_list, standard, has_mold),
+                "data_generation": catalog_service.data_generation
+            }
+        
+        body = catalog_response_cache.get_or_build(
+            catalog_service.data_generation,
+            (
+                "facets",
+                tuple(category_list) if category_list else None,
+                tuple(company_list) if company_list else None,
+                standard,
+                has_mold
+            ),
+            build
+        )
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error(f"Get facets error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/catalog/category/{category}")
 async def get_profiles_by_category(category: str, companies: str = None):
     """
@@ -651,6 +822,7 @@ async def get_profiles_by_category(category: str, companies: str = None):
         companies: Virgülle ayrılmış şirket listesi
     """
     from services.catalog_service import catalog_service
+    from services.response_cache import catalog_response_cache
     
     try:
         # Şirket listesini parse et
@@ -658,31 +830,39 @@ async def get_profiles_by_category(category: str, companies: str = None):
         if companies:
             company_list = [c.strip() for c in companies.split(',') if c.strip()]
         
-
-        profiles = catalog_service.get_profiles_by_category(category, companies=company_list)
+        def build():
+            profiles = catalog_service.get_profiles_by_category(category, companies=company_list)
+            return {
+                "category": category,
+                "profiles": profiles,
+                "count": len(profiles)
+            }
         
-        return {
-            "category": category,
-            "profiles": profiles,
-            "count": len(profiles)
-        }
+        body = catalog_response_cache.get_or_build(
+            catalog_service.data_generation,
+            ("category", category, tuple(company_list) if company_list else None),
+            build,
+            scope=("category", category)
+        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Get category profiles error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/catalog/search")
-async def search_catalog(q: str, limit: int = 20):
-    """Katalogda ara"""
+async def search_catalog(q: str, limit: int = 20, offset: int = 0):
+    """Katalogda ara (alan ağırlığına göre sıralı, offset/limit ile sayfalı)"""
     from services.catalog_service import catalog_service
     
     try:
-        results = catalog_service.search_profiles(q, limit=limit)
+        results = catalog_service.search_profiles(q, limit=limit, offset=offset)
         
         return {
             "query": q,
             "results": results,
-            "count": len(results)
+            "count": len(results),
+            "offset": offset
         }
     except Exception as e:
         logger.error(f"Search catalog error: {e}")
@@ -787,6 +967,41 @@ async def get_profile_connection(profile_code: str):
         }
 
 
+@app.get("/api/connections/graph/{code}")
+async def get_connection_graph(code: str, depth: int = 2):
+    """
+    Birleşim uyumluluk grafında bir kodun komşuluğu
+
+    Args:
+        code: Birleşim kodu (LR-3101), profil kodu (LR-3101-1), fitil kodu
+              (P148000) veya sistem adı
+        depth: Adım sayısı (örn. profil -> birleşim -> fitil için 2, en fazla 4)
+    """
+    from services.connection_service import connection_service
+
+    try:
+        graph = connection_service.get_connection_graph(code, depth)
+
+        if graph is None:
+            return {
+                "success": False,
+                "error": f"Kod bulunamadı: {code}"
+            }
+
+        return {
+            "success": True,
+            "code": code,
+            "data": graph,
+            "count": len(graph['nodes'])
+        }
+    except Exception as e:
+        logger.error(f"Get connection graph error: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
 @app.get("/api/connections/search")
 async def search_connections(query: str):
     """Birleşim verilerinde arama yap"""
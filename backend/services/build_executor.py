@@ -0,0 +1,157 @@
+"""
+Build executor - CPU ağırlıklı parse ve index işlerini event loop dışında çalıştırır
+
+Excel parse, kategori gruplama, TF-IDF fit gibi işler uvicorn event loop'unda
+çalıştığında /api/chat ve katalog endpoint'leri bekliyordu. Bu servis işleri
+yönetilen bir process veya thread pool'a gönderir ve sonucu await edilebilir
+olarak döner. Kuyruk derinliği ve iş bazında süre metrikleri tutulur.
+
+Process modunda gönderilen fonksiyon ve argümanlar picklable olmalıdır
+(modül seviyesinde fonksiyonlar); sonuç yeni bir nesne olarak döner.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BuildStats:
+    """Bir iş türü için süre metrikleri"""
+    
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms: Optional[float] = None
+    
+    def record(self, duration_ms: float, success: bool) -> None:
+        self.count += 1
+        if not success:
+            self.failures += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.last_ms = duration_ms
+    
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'last_ms': round(self.last_ms, 1) if self.last_ms is not None else None,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else None,
+            'max_ms': round(self.max_ms, 1)
+        }
+
+
+class BuildExecutor:
+    """Process veya thread pool üzerinde build işleri çalıştıran executor"""
+    
+    def __init__(self, mode: str = "process", max_workers: int = 2):
+        """
+        Initialize build executor
+        
+        Args:
+            mode: "process" veya "thread"
+            max_workers: Pool boyutu
+        """
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Geçersiz build executor modu: {mode}")
+        
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+        
+        # Metrikler
+        self.submitted = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stats: Dict[str, BuildStats] = {}
+        
+        logger.info(f"BuildExecutor initialized (mode: {self.mode}, workers: {self.max_workers})")
+    
+    def _ensure_executor(self) -> Executor:
+        """Pool'u ilk kullanımda oluştur"""
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn: event loop ve açık bağlantılar çocuk process'e kopyalanmaz
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="build"
+                )
+        return self._executor
+    
+    async def run(self, name: str, func: Callable[..., Any], *args) -> Any:
+        """
+        İşi pool'da çalıştır ve sonucu bekle
+        
+        Args:
+            name: İş adı (metrikler için, örn. "catalog")
+            func: Çalıştırılacak fonksiyon (process modunda modül seviyesinde olmalı)
+            *args: Fonksiyon argümanları
+        
+        Returns:
+            Fonksiyonun sonucu
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        start_time = time.perf_counter()
+        success = False
+        
+        try:
+            result = await loop.run_in_executor(executor, func, *args)
+            success = True
+            return result
+        except Exception as e:
+            logger.error(f"Build '{name}' hatası: {e!r}")
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self.in_flight -= 1
+            self.stats.setdefault(name, BuildStats()).record(duration_ms, success)
+            logger.info(f"Build '{name}' {'tamamlandı' if success else 'başarısız'}: {duration_ms:.0f} ms ({self.mode})")
+    
+    @property
+    def queue_depth(self) -> int:
+        """Worker bekleyen iş sayısı"""
+        return max(0, self.in_flight - self.max_workers)
+    
+    def get_stats(self) -> Dict:
+        """Executor metrikleri"""
+        return {
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'submitted': self.submitted,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'max_in_flight': self.max_in_flight,
+            'builds': {name: stats.to_dict() for name, stats in self.stats.items()}
+        }
+    
+    def shutdown(self) -> None:
+        """Pool'u kapat"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.debug("BuildExecutor shut down")
+
+
+# Global instance
+build_executor = BuildExecutor(
+    mode=settings.build_executor_mode,
+    max_workers=settings.build_executor_workers
+)
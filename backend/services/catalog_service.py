@@ -1,26 +1,272 @@
 """
 Katalog servisi - Tüm profil kataloğunu yönetir
 """
-import gdown
+import asyncio
 import os
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 import logging
 
-from utils.catalog_parser import parse_catalog_excel, group_by_categories, CatalogProfile
+import numpy as np
+
+from clients.download_client import download_client
+from services.build_executor import build_executor
+from services.response_cache import catalog_response_cache
+from utils.catalog_bitmap import CatalogBitmapIndex
+from utils.catalog_diff import (
+    CatalogDiff, CatalogUpdate, PositionsDelta, RowKey, apply_catalog_rows, positions_delta
+)
+from utils.catalog_parser import CatalogProfile, CatalogRow, read_catalog_rows
+from utils.catalog_search import CatalogSearchIndex
+from utils.code_registry import CodePrefixIndex, CodeRegistry, normalize_code
+from utils.fingerprint import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class CatalogState:
+    """
+    Katalog servisinin yayınlanmış durumu
+    
+    Profiller ve gruplar birlikte üretilir ve tek referans değişimiyle
+    yayınlanır; yayınlandıktan sonra değiştirilmez. keys/rows bir sonraki
+    yenilemede satır bazlı diff için saklanır; code_registry profil
+    numarası yazımlarını profile çözer, code_index kod öneki aramasıdır,
+    search_index serbest metin aramasıdır, bitmap_index kategori/şirket/
+    standart/kalıp facet bitset'leridir.
+    """
+    profiles: List[CatalogProfile]
+    grouped_profiles: Dict
+    source_hash: Optional[str] = None
+    generation: int = 0
+    is_ready: bool = False
+    keys: List[RowKey] = field(default_factory=list)
+    rows: Dict[RowKey, CatalogRow] = field(default_factory=dict)
+    last_diff: Optional[CatalogDiff] = None
+    code_registry: CodeRegistry[CatalogProfile] = field(default_factory=lambda: CodeRegistry([]))
+    code_index: CodePrefixIndex = field(default_factory=lambda: CodePrefixIndex([]))
+    search_index: CatalogSearchIndex = field(default_factory=lambda: CatalogSearchIndex([]))
+    bitmap_index: CatalogBitmapIndex = field(default_factory=lambda: CatalogBitmapIndex([]))
+
+
 class CatalogService:
     """Katalog yönetim servisi"""
     
     def __init__(self):
-        self.profiles: List[CatalogProfile] = []
-        self.grouped_profiles: Dict = {}
         self.cache_dir = Path("data/cache")
         self.catalog_file = self.cache_dir / "catalog.xlsx"
-        self.is_ready = False
+        
+        # Yayınlanmış durum (profiller, gruplar, kaynak hash'i ve veri nesli)
+        self._state = CatalogState(profiles=[], grouped_profiles={})
+    
+    @property
+    def state(self) -> CatalogState:
+        """Yayınlanmış durum (okuyucular istek boyunca bu nesneyi tutar)"""
+        return self._state
+    
+    @property
+    def profiles(self) -> List[CatalogProfile]:
+        return self._state.profiles
+    
+    @property
+    def grouped_profiles(self) -> Dict:
+        return self._state.grouped_profiles
+    
+    @property
+    def source_hash(self) -> Optional[str]:
+        return self._state.source_hash
+    
+    @property
+    def data_generation(self) -> int:
+        return self._state.generation
+    
+    @property
+    def is_ready(self) -> bool:
+        return self._state.is_ready
+    
+    @staticmethod
+    def _build_state(
+        profiles: List[CatalogProfile],
+        grouped_profiles: Dict,
+        source_hash: Optional[str],
+        keys: List[RowKey],
+        rows: Dict[RowKey, CatalogRow],
+        last_diff: Optional[CatalogDiff] = None
+    ) -> CatalogState:
+        """
+        Profilleri kod, arama ve bitmap indeksleriyle birlikte yeni duruma çevir
+        
+        Event loop dışında (thread'de) çağrılır; arama indeksi de burada
+        kurulur, böylece yayından sonraki ilk arama indeks kurulumunu beklemez.
+        """
+        search_index = CatalogSearchIndex(profiles)
+        search_index.warm()
+        return CatalogState(
+            profiles=profiles,
+            grouped_profiles=grouped_profiles,
+            source_hash=source_hash,
+            is_ready=True,
+            keys=keys,
+            rows=rows,
+            last_diff=last_diff,
+            code_registry=CodeRegistry((profile.profile_no, profile) for profile in profiles),
+            code_index=CodePrefixIndex(profile.profile_no for profile in profiles),
+            search_index=search_index,
+            bitmap_index=CatalogBitmapIndex(profiles)
+        )
+    
+    def _publish(self, state: CatalogState) -> None:
+        """Kurulmuş durumu tek referans değişimiyle yayınla (veri nesli burada artar)"""
+        self._state = replace(state, generation=self._state.generation + 1)
+    
+    @staticmethod
+    def _patch_state(
+        previous: CatalogState,
+        update: CatalogUpdate,
+        delta: PositionsDelta,
+        source_hash: Optional[str]
+    ) -> CatalogState:
+        """
+        Önceki durumun indekslerini sadece değişen profillerle güncelle
+        
+        Kod kaydı, önek indeksi, bitmap ve arama indeksi kopyalanıp sadece
+        silinen/değişen/eklenen profillerin girişleri yazılır; kalan
+        profiller yeniden işlenmez, sadece pozisyonları yeniden numaralanır.
+        """
+        profiles = update.profiles
+        code_index = previous.code_index.updated(
+            delta.remap,
+            ((position, profiles[position].profile_no) for position in delta.added)
+        )
+        code_registry = previous.code_registry.updated(
+            [profile.profile_no for profile in (*update.old_profiles, *update.new_profiles)],
+            lambda key: (
+                (profiles[position].profile_no, profiles[position])
+                for position in code_index.key_positions(key)
+            )
+        )
+        search_index = previous.search_index.updated(profiles, delta.remap, list(delta.added))
+        search_index.warm()
+        
+        return CatalogState(
+            profiles=profiles,
+            grouped_profiles=update.grouped_profiles,
+            source_hash=source_hash,
+            is_ready=True,
+            keys=update.keys,
+            rows=update.rows,
+            last_diff=update.diff,
+            code_registry=code_registry,
+            code_index=code_index,
+            search_index=search_index,
+            bitmap_index=previous.bitmap_index.updated(profiles, delta.remap, list(delta.added))
+        )
+    
+    @staticmethod
+    def _stale_scopes(update: CatalogUpdate, delta: Optional[PositionsDelta]) -> Callable[[Hashable], bool]:
+        """
+        Response cache kapsamlarından diff'ten etkilenenleri bulan fonksiyon
+        
+        Kapsamlar: ('category', ad), ('codes', önek), ('head', adet).
+        Tam kurulum veya sıra değişikliğinde (delta None) hepsi etkilenir.
+        """
+        if delta is None:
+            return lambda scope: True
+        
+        touched = (*update.old_profiles, *update.new_profiles)
+        categories = {category for profile in touched for category in profile.categories}
+        codes = [normalize_code(profile.profile_no) for profile in touched]
+        
+        # Listelemenin başında değişen ilk pozisyon (eski veya yeni sırada)
+        removed = np.flatnonzero(delta.remap < 0)
+        first_change = min(
+            int(removed[0]) if len(removed) else len(update.profiles),
+            delta.added[0] if delta.added else len(update.profiles)
+        )
+        resized = len(delta.remap) != len(update.profiles)
+        
+        def is_stale(scope: Hashable) -> bool:
+            kind, value = scope
+            if kind == 'category':
+                return value in categories
+            if kind == 'codes':
+                prefix = normalize_code(value)
+                return any(code.startswith(prefix) for code in codes)
+            if kind == 'head':
+                return resized or first_change < value
+            return True
+        
+        return is_stale
+    
+    def _prepare_update(
+        self,
+        previous: CatalogState,
+        rows: List[CatalogRow],
+        source_hash: Optional[str]
+    ) -> Tuple[CatalogDiff, Optional[CatalogState], Callable[[Hashable], bool]]:
+        """
+        Yeni satırları önceki durumla diff'leyip yayınlanacak durumu kur
+        
+        Thread'de çalışır; event loop'ta sadece referans değişimi kalır.
+        Sıra değişmediyse indeksler sadece değişen profillerle güncellenir,
+        aksi halde baştan kurulur.
+        
+        Returns:
+            (diff, yeni durum veya diff boşsa None, response cache kapsam kontrolü)
+        """
+        if previous.is_ready:
+            update = apply_catalog_rows(
+                rows,
+                previous.rows,
+                dict(zip(previous.keys, previous.profiles)),
+                previous.grouped_profiles
+            )
+        else:
+            update = apply_catalog_rows(rows)
+        
+        if update.diff.is_empty:
+            return update.diff, None, lambda scope: False
+        
+        if update.diff.full_rebuild or update.diff.reordered:
+            state = self._build_state(
+                update.profiles, update.grouped_profiles, source_hash, update.keys, update.rows, update.diff
+            )
+            return update.diff, state, self._stale_scopes(update, None)
+        
+        delta = positions_delta(previous.keys, update)
+        state = self._patch_state(previous, update, delta, source_hash)
+        return update.diff, state, self._stale_scopes(update, delta)
+    
+    async def _apply_rows(self, rows: List[CatalogRow], source_hash: Optional[str]) -> CatalogDiff:
+        """
+        Yeni satırları önceki durumla karşılaştırıp uygula
+        
+        Değişmeyen profiller yeniden kullanılır; sadece eklenen/değişen
+        satırlar için profil oluşturulur, kategori grupları ve indeksler
+        sadece etkilenen girişlerle güncellenir ve response cache'te
+        etkilenmeyen cevaplar korunur. Diff ve indeks güncellemesi thread'de
+        yapılır.
+        
+        Args:
+            rows: read_catalog_rows() çıktısı
+            source_hash: Dosya hash'i
+            
+        Returns:
+            Uygulanan diff
+        """
+        previous = self._state
+        diff, state, is_stale = await asyncio.to_thread(self._prepare_update, previous, rows, source_hash)
+        
+        if state is None:
+            # Hash değişti ama satırlar aynı (örn. biçim değişikliği) - veri nesli artmaz
+            self._state = replace(self._state, source_hash=source_hash)
+        else:
+            catalog_response_cache.advance(previous.generation, previous.generation + 1, is_stale)
+            self._publish(state)
+        
+        return diff
     
     async def initialize(self, file_id: str = "1FFFwzkP26v9ooQI3w49wBD1SmJpAvCixUmC3tuI-m1o"):
         """
@@ -41,14 +287,20 @@ class CatalogService:
                 logger.error("Katalog indirilemedi!")
                 return False
             
-            # Parse et
-            self.profiles = parse_catalog_excel(str(self.catalog_file))
+            # İçerik değişmediyse parse ve gruplama yapma
+            file_hash = compute_file_hash(self.catalog_file)
+            if self.is_ready and file_hash and file_hash == self.source_hash:
+                logger.info("Katalog içeriği değişmemiş, yeniden yükleme atlanıyor")
+                return True
             
-            # Kategorilere göre grupla
-            self.grouped_profiles = group_by_categories(self.profiles)
+            # Satırları oku (event loop dışında), önceki sürümle diff'leyip uygula
+            rows = await build_executor.run('catalog', read_catalog_rows, str(self.catalog_file))
+            diff = await self._apply_rows(rows, file_hash)
             
-            self.is_ready = True
-            logger.info(f"Katalog servisi hazır: {len(self.profiles)} profil")
+            logger.info(
+                f"Katalog servisi hazır: {len(self.profiles)} profil "
+                f"(nesil: {self.data_generation}, diff: {diff.to_dict()})"
+            )
             return True
             
         except Exception as e:
@@ -62,10 +314,11 @@ class CatalogService:
             
             url = f"https://docs.google.com/spreadsheets/d/{file_id}/export?format=xlsx"
             
-            gdown.download(url, str(self.catalog_file), quiet=False, fuzzy=True)
+            changed = await download_client.download(url, self.catalog_file)
             
             if self.catalog_file.exists():
-                logger.info(f"Dosya başarıyla indirildi: {self.catalog_file}")
+                if changed:
+                    logger.info(f"Dosya başarıyla indirildi: {self.catalog_file}")
                 return True
             else:
                 logger.error("Dosya indirilemedi!")
@@ -75,41 +328,85 @@ class CatalogService:
             logger.error(f"Google Drive indirme hatası: {e}")
             return False
     
+    def export_state(self) -> Dict:
+        """Snapshot için türetilmiş durumu döner"""
+        state = self._state
+        return {
+            'profiles': state.profiles,
+            'grouped_profiles': state.grouped_profiles,
+            'source_hash': state.source_hash,
+            'keys': state.keys,
+            'rows': state.rows
+        }
+    
+    def restore_state(self, state: Dict) -> None:
+        """Snapshot'tan durumu geri yükle"""
+        # Snapshot yüklemesi thread'de çalışır; indeksler (arama dahil) burada kurulur
+        self._publish(self._build_state(
+            state['profiles'],
+            state['grouped_profiles'],
+            state['source_hash'],
+            state['keys'],
+            state['rows']
+        ))
+    
     def get_all_profiles(self) -> List[Dict]:
         """Tüm profilleri getir"""
         return [p.to_dict() for p in self.profiles]
     
     def get_profile_by_no(self, profile_no: str) -> Optional[Dict]:
-        """Profil numarasına göre profil getir"""
-        for profile in self.profiles:
-            if profile.profile_no == profile_no:
-                return profile.to_dict()
-        return None
+        """Profil numarasına göre profil getir (LR-3101-1, LR3101-1, lr3101-1 gibi yazımlar da çözülür)"""
+        profile = self._state.code_registry.get(profile_no)
+        return profile.to_dict() if profile is not None else None
     
-    def search_profiles(self, query: str, limit: int = 20) -> List[Dict]:
+    def get_profiles_by_code_prefix(self, prefix: str) -> List[Dict]:
         """
-        Profil ara
+        Kod öneki ile başlayan profiller (kod ailesi: LR3101 -> LR3101-1, LR3101-2)
         
         Args:
-            query: Arama sorgusu
-            limit: Maksimum sonuç sayısı
+            prefix: Kod öneki; büyük/küçük harf, boşluk ve tire farkları önemsiz
+            
+        Returns:
+            Profil dict listesi, katalog sırasıyla
+        """
+        state = self._state
+        positions = sorted(state.code_index.positions(prefix))
+        return [state.profiles[position].to_dict() for position in positions]
+    
+    def get_codes_by_prefix(self, prefix: str, limit: int = 50) -> Dict:
         """
-        query_lower = query.lower()
-        results = []
+        Kod öneki ile başlayan profil numaraları (otomatik tamamlama için)
         
-        for profile in self.profiles:
-            # Profil no, müşteri, açıklama veya kategorilerde ara
-            if (query_lower in profile.profile_no.lower() or
-                query_lower in profile.customer.lower() or
-                query_lower in profile.description.lower() or
-                any(query_lower in cat.lower() for cat in profile.categories)):
-                
-                results.append(profile.to_dict())
-                
-                if len(results) >= limit:
-                    break
+        Args:
+            prefix: Kod öneki
+            limit: Maksimum kod sayısı
+            
+        Returns:
+            {'codes': normalize kod sırasıyla profil numaraları, 'total': toplam eşleşme}
+        """
+        state = self._state
+        positions = state.code_index.positions(prefix)
+        return {
+            'codes': [state.profiles[position].profile_no for position in positions[:limit]],
+            'total': len(positions)
+        }
+    
+    def search_profiles(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Profil ara
         
-        return results
+        Profil no, müşteri, açıklama veya kategorilerde alt dize olarak geçen
+        profiller, katalog arama indeksinden alan ağırlığına göre sıralı döner
+        (profil no > kategori > müşteri > açıklama).
+        
+        Args:
+            query: Arama sorgusu (Türkçe karakter ve büyük/küçük harf farkı önemsiz)
+            limit: Maksimum sonuç sayısı
+            offset: Atlanacak sonuç sayısı (sayfalama)
+        """
+        state = self._state
+        positions = state.search_index.search(query, offset=offset, limit=limit)
+        return [state.profiles[position].to_dict() for position in positions]
     
     def get_categories(self, companies: List[str] = None) -> Dict:
         """
@@ -126,43 +423,41 @@ class CatalogService:
                 'sector': ['Pencere', 'Kapı', ...]
             }
         """
+        state = self._state
+        grouped_profiles = state.grouped_profiles
+        
         if companies:
-            # Şirket filtrelemeli kategoriler
-            filtered_grouped = self._filter_by_companies(companies)
+            # Şirket filtrelemeli kategoriler: şirket bitset'iyle kesişen kategoriler
             return {
-                'standard': list(filtered_grouped.get('standard', {}).keys()),
-                'shape': list(filtered_grouped.get('shape', {}).keys()),
-                'sector': list(filtered_grouped.get('sector', {}).keys())
+                cat_type: self._categories_for_companies(state, grouped_profiles.get(cat_type, {}), companies)
+                for cat_type in ('standard', 'shape', 'sector')
             }
         
         return {
-            'standard': list(self.grouped_profiles.get('standard', {}).keys()),
-            'shape': list(self.grouped_profiles.get('shape', {}).keys()),
-            'sector': list(self.grouped_profiles.get('sector', {}).keys())
+            'standard': list(grouped_profiles.get('standard', {}).keys()),
+            'shape': list(grouped_profiles.get('shape', {}).keys()),
+            'sector': list(grouped_profiles.get('sector', {}).keys())
         }
     
-    def _filter_by_companies(self, companies: List[str]) -> Dict:
-        """Profilleri şirketlere göre filtrele ve grupla"""
-        filtered_grouped = {
-            'standard': {},
-            'shape': {},
-            'sector': {}
-        }
+    @staticmethod
+    def _categories_for_companies(state: CatalogState, categories: Dict, companies: List[str]) -> List[str]:
+        """
+        Şirketlerin profillerinde geçen kategoriler
         
-        # Filtrelenmiş profilleri al
-        filtered_profiles = [p for p in self.profiles if p.company in companies]
+        Sıra, katalog sadece bu şirketlerin profilleriyle gruplanmış gibidir:
+        kategorinin ilk filtrelenmiş profilinin sırası, aynı profilde sütun sırası.
+        """
+        index = state.bitmap_index
+        company_bits = index.mask(companies=companies)
         
-        # Kategorilere göre grupla
-        for profile in filtered_profiles:
-            for category in profile.categories:
-                cat_type = profile.get_category_type(category)
-                
-                if category not in filtered_grouped[cat_type]:
-                    filtered_grouped[cat_type][category] = []
-                
-                filtered_grouped[cat_type][category].append(profile)
+        firsts = []
+        for category in categories:
+            first = index.first(index.category_bits(category) & company_bits)
+            if first is not None:
+                firsts.append((first, state.profiles[first].categories.index(category), category))
         
-        return filtered_grouped
+        firsts.sort()
+        return [category for _, _, category in firsts]
     
     def get_profiles_by_category(self, category: str, companies: List[str] = None) -> List[Dict]:
         """
@@ -172,10 +467,12 @@ class CatalogService:
             category: Kategori adı
             companies: Filtrelenecek şirketler listesi
         """
+        grouped_profiles = self._state.grouped_profiles
+        
         # Hangi tipte olduğunu bul
         for cat_type in ['standard', 'shape', 'sector']:
-            if category in self.grouped_profiles.get(cat_type, {}):
-                profiles = self.grouped_profiles[cat_type][category]
+            if category in grouped_profiles.get(cat_type, {}):
+                profiles = grouped_profiles[cat_type][category]
                 
                 # Şirket filtresi uygula
                 if companies:
@@ -185,18 +482,87 @@ class CatalogService:
         
         return []
     
+    def find_profiles(
+        self,
+        categories: Optional[List[str]] = None,
+        companies: Optional[List[str]] = None,
+        standard: Optional[bool] = None,
+        has_mold: Optional[bool] = None
+    ) -> List[Dict]:
+        """
+        Facet kombinasyonuna uyan profiller (bitmap indeksi ile)
+        
+        Args:
+            categories: Profilin hepsinde bulunduğu kategoriler (büyük/küçük harf duyarsız)
+            companies: Şirketlerden biri
+            standard: Standart bayrağı
+            has_mold: Kalıp durumu
+            
+        Returns:
+            Profil dict listesi, katalog sırasıyla
+        """
+        state = self._state
+        index = state.bitmap_index
+        bits = index.mask(categories, companies, standard, has_mold)
+        return [state.profiles[position].to_dict() for position in index.positions(bits)]
+    
+    def count_profiles(
+        self,
+        categories: Optional[List[str]] = None,
+        companies: Optional[List[str]] = None,
+        standard: Optional[bool] = None,
+        has_mold: Optional[bool] = None
+    ) -> int:
+        """Facet kombinasyonuna uyan profil sayısı (find_profiles ile aynı filtreler)"""
+        index = self._state.bitmap_index
+        return index.count(index.mask(categories, companies, standard, has_mold))
+    
+    def get_facets(
+        self,
+        categories: Optional[List[str]] = None,
+        companies: Optional[List[str]] = None,
+        standard: Optional[bool] = None,
+        has_mold: Optional[bool] = None
+    ) -> Dict:
+        """
+        Filtreye uyan profiller için kategori, şirket, standart/özel ve kalıp sayımları
+        
+        Filtresiz sayımlar veri neslinde bir kez hesaplanır; filtreli sayımlar
+        bitmap indeksinin facet matrisi üzerinde tek adımdır.
+        
+        Args:
+            categories: Profilin hepsinde bulunduğu kategoriler
+            companies: Şirketlerden biri
+            standard: Standart bayrağı
+            has_mold: Kalıp durumu
+            
+        Returns:
+            CatalogBitmapIndex.facet_counts() formatında sayımlar
+        """
+        index = self._state.bitmap_index
+        if not categories and not companies and standard is None and has_mold is None:
+            return index.facet_counts()
+        return index.facet_counts(index.mask(categories, companies, standard, has_mold))
+    
     def get_stats(self) -> Dict:
         """İstatistikleri getir"""
-        standard_count = sum(1 for p in self.profiles if p.is_standard)
-        mold_count = sum(1 for p in self.profiles if p.has_mold)
+        state = self._state
+        facets = state.bitmap_index.facet_counts()
+        standard_count = facets['standard']['standard']
+        mold_count = facets['mold']['with_mold']
         
         return {
-            'total_profiles': len(self.profiles),
+            'total_profiles': len(state.profiles),
             'standard_profiles': standard_count,
-            'custom_profiles': len(self.profiles) - standard_count,
+            'custom_profiles': len(state.profiles) - standard_count,
             'profiles_with_mold': mold_count,
-            'categories': self.get_categories(),
-            'is_ready': self.is_ready
+            'categories': {
+                cat_type: list(state.grouped_profiles.get(cat_type, {}).keys())
+                for cat_type in ('standard', 'shape', 'sector')
+            },
+            'is_ready': state.is_ready,
+            'data_generation': state.generation,
+            'last_diff': state.last_diff.to_dict() if state.last_diff else None
         }
 
 
@@ -1,11 +1,19 @@
+import asyncio
 import os
 import logging
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
-import requests
 from pathlib import Path
 
+from clients.download_client import download_client, DownloadError
+from services.build_executor import build_executor
+from utils.code_registry import CodeRegistry, normalize_code
+from utils.connection_graph import ConnectionGraph, PROFILE_ROLES
+from utils.connection_search import ConnectionSearchIndex, normalize_turkish
+from utils.fingerprint import compute_file_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +32,36 @@ class ParseError(ConnectionServiceError):
     pass
 
 
+@dataclass(frozen=True)
+class ConnectionUsage:
+    """Bir profilin kullanıldığı birleşim"""
+    system: str
+    connection_code: str
+    name: Optional[str]
+    role: str  # inner_profile / middle_profile / outer_profile
+
+
+@dataclass(frozen=True)
+class ConnectionState:
+    """
+    Birleşim servisinin yayınlanmış durumu
+    
+    Parse edilmiş veri yan tarafta hazırlanır ve tek referans değişimiyle
+    yayınlanır; yayınlandıktan sonra değiştirilmez. code_registry birleşim
+    kodu yazımlarını {'system', 'profile'} kaydına çözer; profile_usages
+    normalize profil kodu -> kullanıldığı birleşimler ters indeksidir;
+    search_index serbest metin aramasının n-gram indeksidir; graph sistem /
+    birleşim / profil / fitil uyumluluk grafıdır.
+    """
+    data: Optional[Dict] = None
+    source_hash: Optional[str] = None
+    generation: int = 0
+    code_registry: CodeRegistry[Dict] = field(default_factory=lambda: CodeRegistry([]))
+    profile_usages: Dict[str, Tuple[ConnectionUsage, ...]] = field(default_factory=dict)
+    search_index: ConnectionSearchIndex = field(default_factory=lambda: ConnectionSearchIndex(None))
+    graph: ConnectionGraph = field(default_factory=lambda: ConnectionGraph(None))
+
+
 class ConnectionService:
     """Profil birleşim sistemlerini yöneten servis"""
     
@@ -38,8 +76,10 @@ class ConnectionService:
         self.cache_dir = Path("data/cache")
         self.cache_file = self.cache_dir / "connections.xlsx"
         
-        # In-memory cache
-        self._data: Optional[Dict] = None
+        # Yayınlanmış durum (veri, kaynak hash'i ve veri nesli)
+        self._state = ConnectionState()
+        
+        # Cache tazeliği (son indirme kontrolü zamanı)
         self._last_update: Optional[datetime] = None
         
         # Cache expiration (24 saat)
@@ -47,6 +87,97 @@ class ConnectionService:
         
         logger.info("ConnectionService initialized")
     
+    @property
+    def state(self) -> ConnectionState:
+        """Yayınlanmış durum (okuyucular istek boyunca bu nesneyi tutar)"""
+        return self._state
+    
+    @property
+    def _data(self) -> Optional[Dict]:
+        return self._state.data
+    
+    @property
+    def source_hash(self) -> Optional[str]:
+        return self._state.source_hash
+    
+    @property
+    def data_generation(self) -> int:
+        return self._state.generation
+    
+    @property
+    def is_ready(self) -> bool:
+        """Veri yüklendi mi"""
+        return self._state.data is not None
+    
+    def _build_state(self, data: Dict, source_hash: Optional[str]) -> ConnectionState:
+        """
+        Veriyi indeksleriyle birlikte yeni duruma çevir
+        
+        Kod kaydı, kullanım indeksi, arama indeksi ve graf burada kurulur;
+        event loop dışında (thread'de) çağrılır.
+        """
+        return ConnectionState(
+            data=data,
+            source_hash=source_hash,
+            code_registry=self._build_code_registry(data),
+            profile_usages=self._build_profile_usages(data),
+            search_index=ConnectionSearchIndex(data),
+            graph=ConnectionGraph(data)
+        )
+    
+    def _publish(self, state: ConnectionState) -> None:
+        """Kurulmuş durumu tek referans değişimiyle yayınla (veri nesli burada artar)"""
+        self._state = replace(state, generation=self._state.generation + 1)
+    
+    @staticmethod
+    def _build_code_registry(data: Dict) -> CodeRegistry[Dict]:
+        """
+        Birleşim kodu -> {'system', 'profile'} kaydı
+        
+        Args:
+            data: Parse edilmiş birleşim verisi
+            
+        Returns:
+            Sistem sırasıyla kurulmuş kod kaydı
+        """
+        return CodeRegistry(
+            (profile.get('connection_code', ''), {'system': system.get('name'), 'profile': profile})
+            for system in data.get('systems', [])
+            for profile in system.get('profiles', [])
+        )
+    
+    @staticmethod
+    def _build_profile_usages(data: Dict) -> Dict[str, Tuple[ConnectionUsage, ...]]:
+        """
+        Profil kodu -> kullanıldığı birleşimler (iç/orta/dış profil olarak)
+        
+        Args:
+            data: Parse edilmiş birleşim verisi
+            
+        Returns:
+            normalize_code() anahtarlı sözlük; birleşimler sistem ve satır sırasıyla,
+            bir birleşim satırı profil başına bir kez (ilk rolüyle)
+        """
+        usages: Dict[str, List[ConnectionUsage]] = {}
+        for system in data.get('systems', []):
+            for profile in system.get('profiles', []):
+                seen = set()
+                for role in PROFILE_ROLES:
+                    code = profile.get(role)
+                    if not code or not isinstance(code, str):
+                        continue
+                    key = normalize_code(code)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    usages.setdefault(key, []).append(ConnectionUsage(
+                        system=system.get('name'),
+                        connection_code=profile.get('connection_code'),
+                        name=profile.get('name'),
+                        role=role
+                    ))
+        return {key: tuple(entries) for key, entries in usages.items()}
+    
     async def initialize(self) -> None:
         """
         Servisi başlat ve verileri yükle
@@ -86,31 +217,27 @@ class ConnectionService:
         logger.info("Loading data from Google Sheets...")
         
         try:
-            # Google Sheets'ten indir
-            response = requests.get(self.sheet_url, timeout=30)
-            response.raise_for_status()
+            # Google Sheets'ten indir (koşullu, atomik yazma)
+            changed = await download_client.download(self.sheet_url, self.cache_file)
             
-            # Dosyayı kaydet
-            with open(self.cache_file, 'wb') as f:
-                f.write(response.content)
-            
-            logger.info(f"Downloaded Excel file to {self.cache_file}")
+            if changed:
+                logger.info(f"Downloaded Excel file to {self.cache_file}")
+            else:
+                logger.info("Connection sheet not modified on server")
             
-            # Parse et
-            self._data = self.parse_excel(str(self.cache_file))
-            self._last_update = datetime.now()
+            # Parse et (içerik değiştiyse)
+            await self._load_from_file()
             
             logger.info(f"Data loaded successfully. Systems: {len(self._data.get('systems', []))}")
             
-        except requests.RequestException as e:
+        except DownloadError as e:
             logger.error(f"Failed to download from Google Sheets: {e}")
             
             # Fallback: Cache'lenmiş dosyayı kullan
             if self.cache_file.exists():
                 logger.warning("Using cached file as fallback")
                 try:
-                    self._data = self.parse_excel(str(self.cache_file))
-                    self._last_update = datetime.now()
+                    await self._load_from_file()
                     logger.info("Loaded data from cached file")
                 except Exception as parse_error:
                     logger.error(f"Failed to parse cached file: {parse_error}")
@@ -122,6 +249,53 @@ class ConnectionService:
             logger.error(f"Unexpected error while loading data: {e}")
             raise DataLoadError(f"Failed to load data: {e}")
     
+    async def _load_from_file(self) -> bool:
+        """
+        Cache dosyasını parse et - içerik hash'i değişmediyse parse atlanır
+        
+        Parse işlemi build executor'da (event loop dışında) çalışır.
+        
+        Returns:
+            Veri değiştiyse (yeniden parse edildiyse) True
+        """
+        file_hash = compute_file_hash(self.cache_file)
+        
+        if self._data is not None and file_hash and file_hash == self.source_hash:
+            logger.info("Connection sheet unchanged, skipping parse")
+            self._last_update = datetime.now()
+            return False
+        
+        data = await build_executor.run('connections', parse_connection_file, str(self.cache_file))
+        self._publish(await asyncio.to_thread(self._build_state, data, file_hash))
+        self._last_update = datetime.now()
+        
+        logger.info(f"Connection data generation: {self.data_generation}")
+        return True
+    
+    def export_state(self) -> Dict:
+        """
+        Snapshot için türetilmiş durumu döner
+        
+        Returns:
+            Parse edilmiş veri ve kaynak bilgisi
+        """
+        state = self._state
+        return {
+            'data': state.data,
+            'last_update': self._last_update,
+            'source_hash': state.source_hash
+        }
+    
+    def restore_state(self, state: Dict) -> None:
+        """
+        Snapshot'tan durumu geri yükle
+        
+        Args:
+            state: export_state() çıktısı
+        """
+        self._publish(self._build_state(state['data'], state['source_hash']))
+        self._last_update = state['last_update']
+    
     def _is_cache_valid(self) -> bool:
         """
         Cache'in hala geçerli olup olmadığını kontrol et
@@ -140,10 +314,15 @@ class ConnectionService:
         
         return is_valid
     
-    def parse_excel(self, file_path: str) -> Dict:
+    @staticmethod
+    def parse_excel(file_path: str) -> Dict:
         """
         Excel dosyasını parse et
         
+        Satır satır iterrows() yerine kolon bazlı çalışır: SİSTEMLER kolonu
+        forward-fill edilir, sayısal kolonlar toplu pd.to_numeric ile çevrilir
+        ve sistem/profil yapısı tek bir groupby ile kurulur.
+        
         Args:
             file_path: Excel dosya yolu
             
@@ -168,44 +347,7 @@ class ConnectionService:
             data_df = df.iloc[2:].copy()
             data_df.columns = headers
             
-            # Sistemleri parse et
-            systems = []
-            current_system = None
-            
-            for idx, row in data_df.iterrows():
-                system_name = row.get('SİSTEMLER')
-                
-                # Yeni sistem başlıyor mu?
-                if pd.notna(system_name) and system_name.strip():
-                    # Önceki sistemi kaydet
-                    if current_system and current_system.get('profiles'):
-                        systems.append(current_system)
-                    
-                    # Yeni sistem oluştur (newline karakterlerini temizle)
-                    clean_name = str(system_name).strip().replace('\n', ' ').replace('  ', ' ')
-                    current_system = {
-                        'name': clean_name,
-                        'profiles': []
-                    }
-                    logger.debug(f"New system: {current_system['name']}")
-                
-                # Profil bilgisi var mı?
-                profile_name = row.get('PROFİL ADI')
-                connection_code = row.get('PROFİL BİRLEŞİM\n KODU')
-                
-                if pd.notna(profile_name) and pd.notna(connection_code):
-                    if current_system is None:
-                        logger.warning(f"Profile without system at row {idx}")
-                        continue
-                    
-                    # Profil oluştur
-                    profile = self._parse_profile_row(row)
-                    current_system['profiles'].append(profile)
-                    logger.debug(f"  Profile: {profile['connection_code']}")
-            
-            # Son sistemi ekle
-            if current_system and current_system.get('profiles'):
-                systems.append(current_system)
+            systems = ConnectionService._build_systems(data_df)
             
             data = {
                 "systems": systems,
@@ -220,66 +362,164 @@ class ConnectionService:
             logger.error(f"Failed to parse Excel: {e}", exc_info=True)
             raise ParseError(f"Excel parse failed: {e}")
     
-    def _parse_profile_row(self, row: pd.Series) -> Dict:
+    @staticmethod
+    def _build_systems(data_df: pd.DataFrame) -> List[Dict]:
         """
-        Tek bir profil satırını parse et
+        Veri satırlarından sistem listesini kolon bazlı oluştur
         
         Args:
-            row: Pandas Series (Excel satırı)
+            data_df: Header'ları atanmış veri DataFrame'i
             
         Returns:
-            Profil dictionary'si
-        """
-        def safe_get(key, default=None):
-            """Güvenli değer alma (NaN kontrolü)"""
-            val = row.get(key)
-            if pd.isna(val):
-                return default
-            return val
-        
-        def safe_float(key, default=None):
-            """Güvenli float dönüşümü"""
-            val = safe_get(key)
-            if val is None:
-                return default
-            try:
-                return float(val)
-            except (ValueError, TypeError):
-                return default
-        
-        profile = {
-            'name': str(safe_get('PROFİL ADI', '')).strip(),
-            'name_eng': str(safe_get('PROFİL ADI (İNG.)', '')).strip() or None,
-            'connection_code': str(safe_get('PROFİL BİRLEŞİM\n KODU', '')).strip(),
-            'inner_profile': str(safe_get('İÇ\n PROFİL A', '')).strip() or None,
-            'middle_profile': str(safe_get('ORTA\n PROFİL B', '')).strip() or None,
-            'outer_profile': str(safe_get('DIŞ\n PROFİL C', '')).strip() or None,
-            'gaskets': {
-                'barrier_ab_bottom': str(safe_get('BARİYER A-B ALT', '')).strip() or None,
-                'barrier_ab_top': str(safe_get('BARİYER A-B ÜST', '')).strip() or None,
-                'barrier_bc_bottom': str(safe_get('BARİYER B-C ALT', '')).strip() or None,
-                'barrier_bc_top': str(safe_get('BARİYER B-C ÜST', '')).strip() or None,
-                'barrier_ac_bottom': str(safe_get('BARİYER A-C ALT', '')).strip() or None,
-                'barrier_ac_top': str(safe_get('BARİYER A-C ÜST', '')).strip() or None,
-            },
-            'weights': {
-                'inner_profile': safe_float('İÇ PROFİL\n AĞIRLIK kg/m'),
-                'middle_profile': safe_float('ORTA PROFİL\n AĞIRLIK kg/m'),
-                'outer_profile': safe_float('DIŞ PROFİL\n AĞIRLIK kg/m'),
-                'gasket': safe_float('BARİYER AĞIRLIK kg/m'),
-                'total_profile': safe_float('PROFİL\n AĞIRLIK kg/m'),
-                'total_logical': safe_float('LOGIKAL\n AĞIRLIK kg/m'),
-            },
-            'mechanical': {
-                'jx': safe_float('Jx.\n Cm4'),
-                'jy': safe_float('Jy.\n Cm4'),
-                'wx': safe_float('Wx\n cm3'),
-                'wy': safe_float('Wy\n cm3'),
-            },
-            'notes': str(safe_get('NOTLAR', '')).strip() or None
-        }
+            Sistem listesi (her sistem: {'name', 'profiles'})
+        """
+        # Yeni sistem başlatan satırlar: SİSTEMLER dolu ve boş değil
+        system_names = ConnectionService._text_column(data_df, 'SİSTEMLER')
+        starts_system = system_names != ''
+        
+        # Her satırı ait olduğu sistem bloğuna bağla (forward-fill)
+        # Aynı isim iki kez geçse bile ayrı sistem olarak kalır
+        system_block = starts_system.cumsum()
+        clean_names = (
+            system_names.where(starts_system)
+            .str.replace('\n', ' ', regex=False)
+            .str.replace('  ', ' ', regex=False)
+            .ffill()
+        )
+        
+        # Profil satırları: PROFİL ADI ve birleşim kodu dolu olmalı
+        has_profile = (
+            ConnectionService._notna_column(data_df, 'PROFİL ADI')
+            & ConnectionService._notna_column(data_df, 'PROFİL BİRLEŞİM\n KODU')
+        )
+        orphan_rows = has_profile & (system_block == 0)
+        if orphan_rows.any():
+            logger.warning(f"{int(orphan_rows.sum())} profile rows without system skipped")
+        
+        profile_mask = has_profile & (system_block > 0)
+        if not profile_mask.any():
+            return []
         
-        return profile
+        profiles_df = data_df[profile_mask]
+        profiles = ConnectionService._build_profiles(profiles_df)
+        
+        # Sistem yapısını tek groupby ile kur (ilk görülme sırası korunur)
+        block_ids = system_block[profile_mask].to_numpy()
+        block_names = clean_names[profile_mask].to_numpy()
+        
+        systems = []
+        for block_id, positions in pd.Series(block_ids).groupby(block_ids, sort=False).indices.items():
+            systems.append({
+                'name': block_names[positions[0]],
+                'profiles': [profiles[i] for i in positions]
+            })
+            logger.debug(f"System: {block_names[positions[0]]} ({len(positions)} profiles)")
+        
+        return systems
+    
+    @staticmethod
+    def _build_profiles(profiles_df: pd.DataFrame) -> List[Dict]:
+        """
+        Profil satırlarını kolon bazlı dönüştürüp profil dictionary'lerine çevir
+        
+        Args:
+            profiles_df: Sadece profil satırlarını içeren DataFrame
+            
+        Returns:
+            Profil dictionary listesi (satır sırasıyla)
+        """
+        def text(key):
+            """Metin kolonu - boş değerler None"""
+            return [value or None for value in ConnectionService._text_column(profiles_df, key).tolist()]
+        
+        def number(key):
+            """Sayısal kolon - çevrilemeyen değerler None"""
+            if key not in profiles_df.columns:
+                return [None] * len(profiles_df)
+            values = pd.to_numeric(profiles_df[key], errors='coerce').astype(float)
+            return [None if pd.isna(v) else v for v in values.tolist()]
+        
+        names = ConnectionService._text_column(profiles_df, 'PROFİL ADI').tolist()
+        connection_codes = ConnectionService._text_column(profiles_df, 'PROFİL BİRLEŞİM\n KODU').tolist()
+        
+        columns = zip(
+            names,
+            text('PROFİL ADI (İNG.)'),
+            connection_codes,
+            text('İÇ\n PROFİL A'),
+            text('ORTA\n PROFİL B'),
+            text('DIŞ\n PROFİL C'),
+            text('BARİYER A-B ALT'),
+            text('BARİYER A-B ÜST'),
+            text('BARİYER B-C ALT'),
+            text('BARİYER B-C ÜST'),
+            text('BARİYER A-C ALT'),
+            text('BARİYER A-C ÜST'),
+            number('İÇ PROFİL\n AĞIRLIK kg/m'),
+            number('ORTA PROFİL\n AĞIRLIK kg/m'),
+            number('DIŞ PROFİL\n AĞIRLIK kg/m'),
+            number('BARİYER AĞIRLIK kg/m'),
+            number('PROFİL\n AĞIRLIK kg/m'),
+            number('LOGIKAL\n AĞIRLIK kg/m'),
+            number('Jx.\n Cm4'),
+            number('Jy.\n Cm4'),
+            number('Wx\n cm3'),
+            number('Wy\n cm3'),
+            text('NOTLAR'),
+        )
+        
+        return [
+            {
+                'name': name,
+                'name_eng': name_eng,
+                'connection_code': connection_code,
+                'inner_profile': inner,
+                'middle_profile': middle,
+                'outer_profile': outer,
+                'gaskets': {
+                    'barrier_ab_bottom': ab_bottom,
+                    'barrier_ab_top': ab_top,
+                    'barrier_bc_bottom': bc_bottom,
+                    'barrier_bc_top': bc_top,
+                    'barrier_ac_bottom': ac_bottom,
+                    'barrier_ac_top': ac_top,
+                },
+                'weights': {
+                    'inner_profile': w_inner,
+                    'middle_profile': w_middle,
+                    'outer_profile': w_outer,
+                    'gasket': w_gasket,
+                    'total_profile': w_total,
+                    'total_logical': w_logical,
+                },
+                'mechanical': {
+                    'jx': jx,
+                    'jy': jy,
+                    'wx': wx,
+                    'wy': wy,
+                },
+                'notes': notes
+            }
+            for (name, name_eng, connection_code, inner, middle, outer,
+                 ab_bottom, ab_top, bc_bottom, bc_top, ac_bottom, ac_top,
+                 w_inner, w_middle, w_outer, w_gasket, w_total, w_logical,
+                 jx, jy, wx, wy, notes) in columns
+        ]
+    
+    @staticmethod
+    def _notna_column(df: pd.DataFrame, key: str) -> pd.Series:
+        """Kolon dolu mu maskesi (kolon yoksa hepsi False)"""
+        if key not in df.columns:
+            return pd.Series(False, index=df.index)
+        return df[key].notna()
+    
+    @staticmethod
+    def _text_column(df: pd.DataFrame, key: str) -> pd.Series:
+        """Kolonu strip edilmiş string'e çevir (NaN ve eksik kolon → '')"""
+        if key not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        col = df[key]
+        return col.where(col.notna(), '').astype(str).str.strip()
     
     def get_all_systems(self) -> List[Dict]:
         """
@@ -288,11 +528,12 @@ class ConnectionService:
         Returns:
             Sistem listesi
         """
-        if self._data is None:
+        data = self._state.data
+        if data is None:
             logger.warning("No data loaded")
             return []
         
-        return self._data.get('systems', [])
+        return data.get('systems', [])
     
     def get_system_by_name(self, system_name: str) -> Optional[Dict]:
         """
@@ -318,25 +559,83 @@ class ConnectionService:
         Belirli bir profilin birleşim bilgilerini getir
         
         Args:
-            profile_code: Profil kodu (örn: LR-3101)
+            profile_code: Profil kodu (örn: LR-3101, LR3101, lr-3101)
             
         Returns:
             Profil birleşim bilgileri veya None
         """
-        systems = self.get_all_systems()
+        connection = self.find_connection(profile_code)
+        if connection is None:
+            logger.warning(f"Profile not found: {profile_code}")
+        return connection
+    
+    def find_connection(self, connection_code: str) -> Optional[Dict]:
+        """
+        Birleşim koduna ait kayıt (bulunamazsa log yazmaz)
         
-        profile_code_upper = profile_code.upper()
+        Args:
+            connection_code: Birleşim kodu (örn: LR-3101, LR3101, GLR64-05)
+            
+        Returns:
+            {'system': sistem adı, 'profile': birleşim satırı} veya None
+        """
+        connection = self._state.code_registry.get(connection_code)
+        if connection is None:
+            return None
+        # Kayıt istekler arasında paylaşılır; çağıran tarafın değişikliği kayda yansımasın
+        return dict(connection)
+    
+    def get_profile_usages(self, profile_code: str) -> List[ConnectionUsage]:
+        """
+        Profilin iç/orta/dış profil olarak kullanıldığı birleşimler
         
-        for system in systems:
-            for profile in system.get('profiles', []):
-                if profile.get('connection_code', '').upper() == profile_code_upper:
-                    return {
-                        'system': system.get('name'),
-                        'profile': profile
-                    }
+        Args:
+            profile_code: Profil kodu (LR-3101-1, LR3101-1, GLR33-07 gibi yazımlar)
+            
+        Returns:
+            ConnectionUsage listesi (sistem ve satır sırasıyla)
+        """
+        if not profile_code:
+            return []
+        return list(self._state.profile_usages.get(normalize_code(profile_code), ()))
+    
+    def get_connection_graph(self, code: str, depth: int = 2) -> Optional[Dict]:
+        """
+        Kodun uyumluluk grafındaki komşuluğu
         
-        logger.warning(f"Profile not found: {profile_code}")
-        return None
+        Args:
+            code: Birleşim kodu, profil kodu, fitil kodu veya sistem adı
+            depth: Adım sayısı (örn. profil -> birleşim -> fitil için 2)
+            
+        Returns:
+            {'depth', 'roots', 'nodes', 'edges'} veya kod grafta yoksa None
+        """
+        return self._state.graph.neighborhood(code, depth)
+    
+    def get_compatible_gaskets(self, code: str) -> List[str]:
+        """
+        Birleşim veya profille kullanılan fitil kodları
+        
+        Args:
+            code: Birleşim kodu (LR-3101) veya profil kodu (LR-3101-1)
+            
+        Returns:
+            Fitil kodları (birleşim için kendi fitilleri, profil için
+            kullanıldığı birleşimlerin fitilleri)
+        """
+        return self._state.graph.reachable(code, 'gasket', depth=2)
+    
+    def get_profile_systems(self, profile_code: str) -> List[str]:
+        """
+        Profili (veya birleşimi) içeren sistemler
+        
+        Args:
+            profile_code: Profil kodu (örn. ortak dış profil) veya birleşim kodu
+            
+        Returns:
+            Sistem adları
+        """
+        return self._state.graph.reachable(profile_code, 'system', depth=2)
     
     def _normalize_turkish(self, text: str) -> str:
         """
@@ -348,35 +647,16 @@ class ConnectionService:
         Returns:
             Normalize edilmiş metin
         """
-        if not text:
-            return ""
-        
-        # Önce büyük harfleri değiştir
-        text = text.replace('İ', 'i')
-        text = text.replace('I', 'ı')
-        
-        # Lowercase yap
-        text = text.lower()
-        
-        # Türkçe karakterleri normalize et
-        replacements = {
-            'ı': 'i',
-            'ş': 's',
-            'ğ': 'g',
-            'ü': 'u',
-            'ö': 'o',
-            'ç': 'c'
-        }
-        
-        for tr_char, en_char in replacements.items():
-            text = text.replace(tr_char, en_char)
-        
-        return text
+        return normalize_turkish(text)
     
     def search_connections(self, query: str) -> List[Dict]:
         """
         Birleşim verilerinde arama yap
         
+        Sistem adı, profil adı (TR/EN), birleşim kodu ve fitil kodları
+        yüklemede normalize edilip n-gram indeksine alınır; arama her sorguda
+        tüm satırları taramak yerine posting list kesişimidir.
+        
         Args:
             query: Arama sorgusu
             
@@ -386,59 +666,32 @@ class ConnectionService:
         if not query:
             return []
         
-        query_lower = query.lower()
-        query_normalized = self._normalize_turkish(query)
-        results = []
-        systems = self.get_all_systems()
+        state = self._state
+        if state.data is None:
+            logger.warning("No data loaded")
+            return []
         
-        for system in systems:
-            system_name = system.get('name', '')
-            system_name_lower = system_name.lower()
-            system_name_normalized = self._normalize_turkish(system_name)
-            
-            # Sistem adında ara (hem normal hem normalized)
-            if query_lower in system_name_lower or query_normalized in system_name_normalized:
-                results.append({
-                    'type': 'system',
-                    'system': system_name,
-                    'match': 'system_name'
-                })
-            
-            # Profillerde ara
-            for profile in system.get('profiles', []):
-                profile_name = profile.get('name', '')
-                profile_name_lower = profile_name.lower()
-                profile_name_normalized = self._normalize_turkish(profile_name)
-                
-                connection_code = profile.get('connection_code', '')
-                connection_code_lower = connection_code.lower()
-                connection_code_normalized = self._normalize_turkish(connection_code)
-                
-                # Profil adında veya birleşim kodunda ara
-                match_in_name = query_lower in profile_name_lower or query_normalized in profile_name_normalized
-                match_in_code = query_lower in connection_code_lower or query_normalized in connection_code_normalized
-                
-                # Fitil kodlarında ara
-                match_in_gasket = False
-                gaskets = profile.get('gaskets', {})
-                for gasket_key, gasket_value in gaskets.items():
-                    if gasket_value and query_lower in str(gasket_value).lower():
-                        match_in_gasket = True
-                        break
-                
-                if match_in_name or match_in_code or match_in_gasket:
-                    match_type = 'profile_name' if match_in_name else ('connection_code' if match_in_code else 'gasket')
-                    
-                    results.append({
-                        'type': 'profile',
-                        'system': system_name,
-                        'profile': profile,
-                        'match': match_type
-                    })
+        results = state.search_index.search(query)
         
         logger.info(f"Search '{query}' found {len(results)} results")
         return results
 
-
 # Global instance
 connection_service = ConnectionService()
+
+
+def parse_connection_file(file_path: str) -> Dict:
+    """
+    Connection Excel'ini parse et (build executor giriş noktası)
+    
+    Process pool'a bound method yerine modül seviyesindeki bu fonksiyon
+    gönderilir; parse statik metotlarla yapılır, worker global servis
+    nesnesine ve yüklü veriye bağlı değildir.
+    
+    Args:
+        file_path: Excel dosya yolu
+        
+    Returns:
+        Yapılandırılmış veri dictionary'si
+    """
+    return ConnectionService.parse_excel(file_path)
@@ -1,40 +1,127 @@
-import pickle
+import asyncio
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 import numpy as np
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 from config import settings
 from models.profile import Profile
+from services.build_executor import build_executor
+from utils.fingerprint import compute_text_hash
+from utils.tfidf_artifacts import load_tfidf_artifacts, save_tfidf_artifacts
 
 logger = logging.getLogger(__name__)
 
 
+def fit_tfidf(vectorizer: TfidfVectorizer, texts: List[str]) -> Tuple[TfidfVectorizer, object]:
+    """
+    TF-IDF vectorizer'ı fit et (build executor giriş noktası)
+    
+    Args:
+        vectorizer: Fit edilmemiş vectorizer
+        texts: Profil metinleri
+        
+    Returns:
+        (fit edilmiş vectorizer, sparse embedding matrisi)
+    """
+    embeddings = vectorizer.fit_transform(texts)
+    return vectorizer, embeddings
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    En yüksek k skorun indeksleri (tam sıralama yerine partition)
+    
+    k. skora eşit olanlar sınırda keyfi seçilmez: k. skordan büyükler ve
+    eşitlerden indeksi küçük olanlar alınır, yani sonuç tam stable sıralamanın
+    ilk k elemanıyla aynıdır.
+    
+    Args:
+        scores: Skor vektörü
+        k: Sonuç sayısı
+        
+    Returns:
+        İndeksler, skora göre azalan (eşitlikte küçük indeks önce)
+    """
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth_score = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+        candidates = np.concatenate((above, ties))
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+@dataclass(frozen=True)
+class EmbeddingState:
+    """
+    Embedding servisinin yayınlanmış durumu
+    
+    Profiller, vectorizer ve matris birlikte üretilir ve tek referans
+    değişimiyle yayınlanır; yayınlandıktan sonra değiştirilmez. text_hash
+    matrisin üretildiği profil metinlerinin hash'idir.
+    """
+    profiles: List[Profile]
+    vectorizer: TfidfVectorizer
+    embeddings: Optional[Any] = None
+    text_hash: Optional[str] = None
+
+
 class EmbeddingService:
     """TF-IDF tabanlı embedding servisi"""
     
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
+        # Fit edilmemiş şablon - her build bunun bir kopyasını fit eder
+        self._vectorizer_template = TfidfVectorizer(
             max_features=500,
             ngram_range=(1, 2),
             min_df=1
         )
-        self.profiles: List[Profile] = []
-        self.embeddings = None
-        self.is_ready = False
+        self._state = EmbeddingState(profiles=[], vectorizer=self._vectorizer_template)
+        
+        # Vectorizer parametreleri metin hash'ine katılır (parametre değişince artefaktlar geçersiz)
+        self._vectorizer_params = repr(sorted(self._vectorizer_template.get_params().items()))
         
         # Persist klasörünü oluştur
         self.persist_dir = Path(settings.chroma_persist_dir)
         self.persist_dir.mkdir(parents=True, exist_ok=True)
-        self.vectorizer_path = self.persist_dir / "vectorizer.pkl"
-        self.embeddings_path = self.persist_dir / "embeddings.pkl"
+        self.artifacts_dir = self.persist_dir / "tfidf"
+    
+    @property
+    def state(self) -> EmbeddingState:
+        """Yayınlanmış durum (okuyucular istek boyunca bu nesneyi tutar)"""
+        return self._state
+    
+    @property
+    def profiles(self) -> List[Profile]:
+        return self._state.profiles
+    
+    @property
+    def vectorizer(self) -> TfidfVectorizer:
+        return self._state.vectorizer
+    
+    @property
+    def embeddings(self):
+        return self._state.embeddings
+    
+    @property
+    def is_ready(self) -> bool:
+        return self._state.embeddings is not None
     
     async def initialize(self, profiles: List[Profile]) -> bool:
         """
         Embedding servisini başlat
         
+        Profil metinleri değişmemişse mevcut matris kullanılır; diskte aynı
+        metin hash'ine ait artefakt varsa oradan yüklenir; ikisi de yoksa
+        vectorizer yeniden fit edilir ve artefaktlar yazılır.
+        
         Args:
             profiles: Profile listesi
             
@@ -44,20 +131,55 @@ class EmbeddingService:
         logger.info("Embedding servisi başlatılıyor...")
         
         try:
-            self.profiles = profiles
-            
             # Profilleri text'e çevir
             texts = [p.to_embedding_text() for p in profiles]
+            text_hash = compute_text_hash(texts, self._vectorizer_params)
             
-            # TF-IDF embeddings oluştur
+            # Metinler aynıysa (örn. snapshot'tan gelen durum) yeniden fit etme
+            state = self._state
+            if state.embeddings is not None and state.text_hash == text_hash:
+                self._state = EmbeddingState(
+                    profiles=profiles,
+                    vectorizer=state.vectorizer,
+                    embeddings=state.embeddings,
+                    text_hash=text_hash
+                )
+                logger.info("Profil metinleri değişmemiş, embedding yeniden oluşturulmadı")
+                return True
+            
+            # Diskte aynı metinlere ait artefakt varsa yükle
+            artifacts = await asyncio.to_thread(
+                load_tfidf_artifacts, self.artifacts_dir, self._vectorizer_template, text_hash
+            )
+            if artifacts is not None:
+                vectorizer, embeddings = artifacts
+                self._state = EmbeddingState(
+                    profiles=profiles,
+                    vectorizer=vectorizer,
+                    embeddings=embeddings,
+                    text_hash=text_hash
+                )
+                logger.info(f"Embedding servisi hazır (diskten): {embeddings.shape}")
+                return True
+            
+            # TF-IDF embeddings oluştur (event loop dışında, fit edilmemiş bir kopya üzerinde)
             logger.info(f"{len(texts)} profil için embedding oluşturuluyor...")
-            self.embeddings = self.vectorizer.fit_transform(texts)
+            vectorizer, embeddings = await build_executor.run(
+                'embeddings', fit_tfidf, clone(self._vectorizer_template), texts
+            )
+            
+            # Yeni durumu tek referans değişimiyle yayınla
+            self._state = EmbeddingState(
+                profiles=profiles,
+                vectorizer=vectorizer,
+                embeddings=embeddings,
+                text_hash=text_hash
+            )
             
             # Kaydet
-            self._save_to_disk()
+            await asyncio.to_thread(self._save_artifacts)
             
-            self.is_ready = True
-            logger.info(f"Embedding servisi hazır: {self.embeddings.shape}")
+            logger.info(f"Embedding servisi hazır: {embeddings.shape}")
             return True
             
         except Exception as e:
@@ -75,31 +197,56 @@ class EmbeddingService:
         Returns:
             (Profile, similarity_score) tuple listesi
         """
-        if not self.is_ready:
+        results = self.search_batch([query], top_k=top_k)
+        if not results:
+            return []
+        
+        logger.info(f"Arama: '{query[:50]}...' -> {len(results[0])} sonuç")
+        return results[0]
+    
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[Profile, float]]]:
+        """
+        Birden fazla sorguyu tek sparse çarpımla ara
+        
+        TF-IDF satırları L2 normalize olduğu için cosine similarity, sorgu
+        matrisi ile embedding matrisinin çarpımıdır; her sorgunun ilk top_k
+        sonucu tam sıralama yerine argpartition ile seçilir.
+        
+        Args:
+            queries: Arama sorguları
+            top_k: Sorgu başına döndürülecek sonuç sayısı
+            
+        Returns:
+            Her sorgu için (Profile, similarity_score) tuple listesi (sorgu sırasıyla);
+            servis hazır değilse veya hata olursa boş liste
+        """
+        # Refresh sırasında tutarlı kalmak için tek bir durum nesnesi kullan
+        state = self._state
+        if state.embeddings is None:
             logger.warning("Embedding servisi hazır değil")
             return []
         
+        if not queries:
+            return []
+        
         try:
-            # Query'yi embedding'e çevir
-            query_embedding = self.vectorizer.transform([query])
-            
-            # Cosine similarity hesapla
-            similarities = cosine_similarity(query_embedding, self.embeddings)[0]
-            
-            # En yüksek skorları bul
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Sorgular × profiller skor matrisi
+            query_embeddings = state.vectorizer.transform(queries)
+            similarities = (query_embeddings @ state.embeddings.T).toarray()
             
             # Threshold uygula
             threshold = settings.rag_similarity_threshold
-            results = []
+            batch_results = []
             
-            for idx in top_indices:
-                score = float(similarities[idx])
-                if score >= threshold:
-                    results.append((self.profiles[idx], score))
+            for scores in similarities:
+                results = []
+                for idx in top_k_indices(scores, top_k):
+                    score = float(scores[idx])
+                    if score >= threshold:
+                        results.append((state.profiles[idx], score))
+                batch_results.append(results)
             
-            logger.info(f"Arama: '{query[:50]}...' -> {len(results)} sonuç")
-            return results
+            return batch_results
             
         except Exception as e:
             logger.error(f"Arama hatası: {e}")
@@ -131,52 +278,42 @@ class EmbeddingService:
         query = f"Kategori: {category}"
         return self.search(query, top_k=10)
     
-    def _save_to_disk(self):
-        """Vectorizer ve embeddings'i diske kaydet"""
+    def _save_artifacts(self) -> None:
+        """Yayınlanmış vectorizer ve matrisi metin hash'iyle diske kaydet"""
+        state = self._state
         try:
-            # Vectorizer'ı kaydet
-            with open(self.vectorizer_path, 'wb') as f:
-                pickle.dump(self.vectorizer, f)
-            
-            # Embeddings'i kaydet
-            with open(self.embeddings_path, 'wb') as f:
-                pickle.dump(self.embeddings, f)
-            
-            logger.info("Embeddings diske kaydedildi")
-            
+            save_tfidf_artifacts(self.artifacts_dir, state.vectorizer, state.embeddings, state.text_hash)
         except Exception as e:
             logger.error(f"Diske kaydetme hatası: {e}")
     
-    def load_from_disk(self) -> bool:
-        """Vectorizer ve embeddings'i diskten yükle"""
-        try:
-            if not self.vectorizer_path.exists() or not self.embeddings_path.exists():
-                logger.warning("Disk'te kaydedilmiş embedding bulunamadı")
-                return False
-            
-            # Vectorizer'ı yükle
-            with open(self.vectorizer_path, 'rb') as f:
-                self.vectorizer = pickle.load(f)
-            
-            # Embeddings'i yükle
-            with open(self.embeddings_path, 'rb') as f:
-                self.embeddings = pickle.load(f)
-            
-            self.is_ready = True
-            logger.info("Embeddings diskten yüklendi")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Diskten yükleme hatası: {e}")
-            return False
+    def export_state(self) -> Dict:
+        """Snapshot için fit edilmiş vectorizer ve matrisi döner"""
+        state = self._state
+        return {
+            "profiles": state.profiles,
+            "vectorizer": state.vectorizer,
+            "embeddings": state.embeddings,
+            "text_hash": state.text_hash
+        }
+    
+    def restore_state(self, state: Dict) -> None:
+        """Snapshot'tan vectorizer ve matrisi geri yükle"""
+        self._state = EmbeddingState(
+            profiles=state["profiles"],
+            vectorizer=state["vectorizer"],
+            embeddings=state["embeddings"],
+            text_hash=state.get("text_hash")
+        )
     
     def get_stats(self) -> dict:
         """İstatistikleri döner"""
+        state = self._state
         return {
-            "is_ready": self.is_ready,
-            "total_profiles": len(self.profiles),
-            "embedding_shape": str(self.embeddings.shape) if self.embeddings is not None else None,
-            "vectorizer_features": self.vectorizer.max_features,
+            "is_ready": state.embeddings is not None,
+            "total_profiles": len(state.profiles),
+            "embedding_shape": str(state.embeddings.shape) if state.embeddings is not None else None,
+            "vectorizer_features": state.vectorizer.max_features,
+            "text_hash": state.text_hash,
             "persist_dir": str(self.persist_dir)
         }
 
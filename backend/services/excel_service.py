@@ -1,29 +1,104 @@
-import gdown
+import asyncio
 import os
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime
 
+from clients.download_client import download_client
 from config import settings
 from models.profile import Profile
-from utils.excel_parser import parse_excel_file, validate_profiles
+from services.build_executor import build_executor
+from utils.code_registry import CodeRegistry
+from utils.dimension_matrix import DimensionMatrix
+from utils.dimension_tree import DimensionTree
+from utils.excel_parser import build_profiles
+from utils.fingerprint import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ExcelState:
+    """
+    Standart profil servisinin yayınlanmış durumu
+    
+    Yeni veri yan tarafta hazırlanır ve tek referans değişimiyle yayınlanır;
+    yayınlandıktan sonra değiştirilmez. generation sadece içerik
+    değiştiğinde artar. dimension_matrix, dimension_tree ve code_registry
+    profillerle birlikte kurulur.
+    """
+    profiles: List[Profile]
+    last_update: Optional[datetime] = None
+    source_hash: Optional[str] = None
+    generation: int = 0
+    dimension_matrix: Optional[DimensionMatrix] = None
+    dimension_tree: Optional[DimensionTree] = None
+    code_registry: Optional[CodeRegistry[Profile]] = None
+
+
 class ExcelService:
     """Google Drive'dan Excel indirme ve yönetme servisi"""
     
     def __init__(self):
         self.file_id = settings.google_drive_file_id
         self.cache_path = Path(settings.excel_cache_path)
-        self.profiles: List[Profile] = []
-        self.last_update: Optional[datetime] = None
+        
+        # Yayınlanmış durum (profiller, ölçü matrisi, kaynak hash'i ve veri nesli)
+        matrix = DimensionMatrix([])
+        self._state = ExcelState(
+            profiles=[],
+            dimension_matrix=matrix,
+            dimension_tree=DimensionTree(matrix),
+            code_registry=CodeRegistry([])
+        )
         
         # Cache klasörünü oluştur
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
     
+    @property
+    def state(self) -> ExcelState:
+        """Yayınlanmış durum (okuyucular istek boyunca bu nesneyi tutar)"""
+        return self._state
+    
+    @property
+    def profiles(self) -> List[Profile]:
+        return self._state.profiles
+    
+    @property
+    def last_update(self) -> Optional[datetime]:
+        return self._state.last_update
+    
+    @property
+    def source_hash(self) -> Optional[str]:
+        return self._state.source_hash
+    
+    @property
+    def data_generation(self) -> int:
+        return self._state.generation
+    
+    @staticmethod
+    def _build_state(profiles: List[Profile], last_update: Optional[datetime], source_hash: Optional[str]) -> ExcelState:
+        """
+        Profilleri ölçü matrisi, ölçü ağacı ve kod kaydıyla birlikte yeni duruma çevir
+        
+        Event loop dışında (thread'de) çağrılır.
+        """
+        matrix = DimensionMatrix(profiles)
+        return ExcelState(
+            profiles=profiles,
+            last_update=last_update,
+            source_hash=source_hash,
+            dimension_matrix=matrix,
+            dimension_tree=DimensionTree(matrix),
+            code_registry=CodeRegistry((profile.code, profile) for profile in profiles)
+        )
+    
+    def _publish(self, state: ExcelState) -> None:
+        """Kurulmuş durumu tek referans değişimiyle yayınla (veri nesli burada artar)"""
+        self._state = replace(state, generation=self._state.generation + 1)
+    
     async def initialize(self) -> bool:
         """
         Servisi başlat: Excel'i indir ve parse et
@@ -85,13 +160,13 @@ class ExcelService:
             # Google Drive URL oluştur
             url = f"https://docs.google.com/spreadsheets/d/{self.file_id}/export?format=xlsx"
             
-            # İndir
-            output = str(self.cache_path)
-            gdown.download(url, output, quiet=False, fuzzy=True)
+            # İndir (koşullu - değişmediyse mevcut dosya korunur)
+            changed = await download_client.download(url, self.cache_path)
             
             # Dosyanın var olduğunu kontrol et
             if self.cache_path.exists() and self.cache_path.stat().st_size > 0:
-                logger.info(f"Dosya başarıyla indirildi: {output}")
+                if changed:
+                    logger.info(f"Dosya başarıyla indirildi: {self.cache_path}")
                 return True
             else:
                 logger.error("İndirilen dosya boş veya bulunamadı")
@@ -115,26 +190,36 @@ class ExcelService:
             logger.error("Cache dosyası bulunamadı")
             return None
     
-    async def load_profiles(self, excel_path: Path) -> None:
+    async def load_profiles(self, excel_path: Path, force: bool = False) -> bool:
         """
         Excel dosyasını parse et ve profilleri yükle
         
+        Dosyanın içerik hash'i son yüklenenle aynıysa parse atlanır.
+        
         Args:
             excel_path: Excel dosyasının yolu
+            force: True ise hash aynı olsa bile yeniden parse et
+            
+        Returns:
+            Veri değiştiyse (yeniden yüklendiyse) True
         """
         logger.info(f"Profiller yükleniyor: {excel_path}")
         
         try:
-            # Parse et
-            profiles = parse_excel_file(str(excel_path))
+            # İçerik değişmediyse parse etme
+            file_hash = compute_file_hash(excel_path)
+            if not force and self.profiles and file_hash and file_hash == self.source_hash:
+                logger.info("Excel içeriği değişmemiş, parse atlanıyor")
+                return False
             
-            # Validate et
-            self.profiles = validate_profiles(profiles)
+            # Parse ve validate et (event loop dışında)
+            profiles = await build_executor.run('standard', build_profiles, str(excel_path))
             
-            # Güncelleme zamanını kaydet
-            self.last_update = datetime.now()
+            # Profilleri, güncelleme zamanını ve parmak izini birlikte yayınla
+            self._publish(await asyncio.to_thread(self._build_state, profiles, datetime.now(), file_hash))
             
-            logger.info(f"{len(self.profiles)} profil başarıyla yüklendi")
+            logger.info(f"{len(self.profiles)} profil başarıyla yüklendi (nesil: {self.data_generation})")
+            return True
             
         except Exception as e:
             logger.error(f"Profil yükleme hatası: {e}")
@@ -144,6 +229,9 @@ class ExcelService:
         """
         Verileri yeniden indir ve yükle
         
+        İçerik değişmediyse profiller yeniden parse edilmez; değişiklik
+        data_generation üzerinden takip edilir.
+        
         Returns:
             Başarılı ise True
         """
@@ -166,6 +254,29 @@ class ExcelService:
             logger.error(f"Veri yenileme hatası: {e}")
             return False
     
+    def export_state(self) -> Dict:
+        """
+        Snapshot için türetilmiş durumu döner
+        
+        Returns:
+            Profil listesi ve kaynak bilgisi
+        """
+        state = self._state
+        return {
+            "profiles": state.profiles,
+            "last_update": state.last_update,
+            "source_hash": state.source_hash
+        }
+    
+    def restore_state(self, state: Dict) -> None:
+        """
+        Snapshot'tan durumu geri yükle
+        
+        Args:
+            state: export_state() çıktısı
+        """
+        self._publish(self._build_state(state["profiles"], state["last_update"], state["source_hash"]))
+    
     def get_profiles(self) -> List[Profile]:
         """
         Tüm profilleri döner
@@ -180,18 +291,12 @@ class ExcelService:
         Profil koduna göre profil döner
         
         Args:
-            code: Profil kodu
+            code: Profil kodu (büyük/küçük harf, boşluk ve tire farkları önemsiz)
             
         Returns:
             Profile veya None
         """
-        code_upper = code.upper().strip()
-        
-        for profile in self.profiles:
-            if profile.code.upper() == code_upper:
-                return profile
-        
-        return None
+        return self._state.code_registry.get(code)
     
     def get_profiles_by_category(self, category: str) -> List[Profile]:
         """
@@ -203,7 +308,34 @@ class ExcelService:
         Returns:
             Profile listesi
         """
-        return [p for p in self.profiles if category.upper() in p.category.upper()]
+        state = self._state
+        mask = state.dimension_matrix.category_contains(category)
+        return [state.profiles[i] for i in DimensionMatrix.positions(mask)]
+    
+    def nearest_profiles(
+        self,
+        dims: Dict[str, float],
+        category: Optional[str] = None,
+        k: Optional[int] = 10,
+        tolerance: Optional[float] = None
+    ) -> List[Tuple[Profile, float]]:
+        """
+        Verilen ölçülere en yakın profilleri döner (tek KD-tree sorgusu)
+        
+        Args:
+            dims: Aranan ölçüler (örn. {'A': 30, 'B': 30})
+            category: Tam kategori adı veya None
+            k: Maksimum sonuç sayısı (None: tolerans içindeki tümü)
+            tolerance: Her ölçüde izin verilen maksimum fark (mm)
+            
+        Returns:
+            (Profile, mesafe) listesi, en yakından uzağa
+        """
+        state = self._state
+        return [
+            (state.profiles[position], distance)
+            for position, distance in state.dimension_tree.nearest(dims, category, k, tolerance)
+        ]
     
     def get_stats(self) -> dict:
         """
@@ -212,14 +344,15 @@ class ExcelService:
         Returns:
             İstatistik dictionary
         """
-        categories = {}
-        for profile in self.profiles:
-            categories[profile.category] = categories.get(profile.category, 0) + 1
+        state = self._state
+        categories = state.dimension_matrix.category_counts()
         
         return {
-            "total_profiles": len(self.profiles),
+            "total_profiles": len(state.profiles),
             "categories": categories,
-            "last_update": self.last_update.isoformat() if self.last_update else None,
+            "last_update": state.last_update.isoformat() if state.last_update else None,
+            "data_generation": state.generation,
+            "source_hash": state.source_hash,
             "cache_file": str(self.cache_path),
             "cache_exists": self.cache_path.exists()
         }
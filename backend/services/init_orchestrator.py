@@ -0,0 +1,190 @@
+"""
+Init orchestrator - Servisleri bağımlılık sırasına göre eşzamanlı başlatır
+
+Her servis bir adım (InitStep) olarak kaydedilir. Bağımsız adımlar aynı anda
+çalışır; bir adım yalnızca bağımlı olduğu adımlar bittikten sonra başlar.
+Böylece tam hazır olma süresi tüm servislerin toplamı yerine en yavaş
+bağımlılık zincirine iner. Her adımın durumu ve süresi /api/health için tutulur.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Adım durumları
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class InitStep:
+    """
+    Başlatma adımı
+    
+    Attributes:
+        name: Adım adı (health çıktısında görünür)
+        func: Çalıştırılacak coroutine fonksiyonu; False dönerse adım başarısız sayılır
+        depends_on: Başarılı olması gereken adımlar (biri başarısızsa bu adım atlanır)
+        after: Sadece bitmesi beklenen adımlar (sonuçtan bağımsız sıralama)
+        critical: False ise başarısızlığı genel durumu "degraded" yapmaz
+    """
+    name: str
+    func: Callable[[], Awaitable[Optional[bool]]]
+    depends_on: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    critical: bool = True
+    status: str = PENDING
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+    _done: asyncio.Event = field(default=None, repr=False)
+
+
+class InitOrchestrator:
+    """Bağımlılık farkındalıklı eşzamanlı servis başlatıcı"""
+    
+    def __init__(self):
+        self.steps: Dict[str, InitStep] = {}
+        self.started_at: Optional[datetime] = None
+        self.total_duration_ms: Optional[float] = None
+        self.is_running = False
+    
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Optional[bool]]],
+        depends_on: Tuple[str, ...] = (),
+        after: Tuple[str, ...] = (),
+        critical: bool = True
+    ) -> None:
+        """
+        Başlatma adımı ekle
+        
+        Args:
+            name: Adım adı
+            func: Coroutine fonksiyonu
+            depends_on: Başarılı olması gereken adımlar
+            after: Bitmesi beklenen adımlar
+            critical: Genel sağlık durumunu etkiler mi
+        """
+        for dependency in (*depends_on, *after):
+            if dependency not in self.steps:
+                raise ValueError(f"Bilinmeyen bağımlılık: {name} -> {dependency}")
+        
+        self.steps[name] = InitStep(
+            name=name,
+            func=func,
+            depends_on=tuple(depends_on),
+            after=tuple(after),
+            critical=critical
+        )
+    
+    async def run(self) -> Dict[str, str]:
+        """
+        Tüm adımları bağımlılık sırasına göre eşzamanlı çalıştır
+        
+        Returns:
+            {adım adı: durum}
+        """
+        self.is_running = True
+        self.started_at = datetime.now()
+        start_time = time.perf_counter()
+        
+        for step in self.steps.values():
+            step.status = PENDING
+            step.error = None
+            step.duration_ms = None
+            step._done = asyncio.Event()
+        
+        try:
+            await asyncio.gather(*(self._run_step(step) for step in self.steps.values()))
+        finally:
+            self.total_duration_ms = (time.perf_counter() - start_time) * 1000
+            self.is_running = False
+        
+        logger.info(
+            f"Init tamamlandı: {self.total_duration_ms:.0f} ms "
+            f"(adımların toplamı: {sum(s.duration_ms or 0 for s in self.steps.values()):.0f} ms)"
+        )
+        return {name: step.status for name, step in self.steps.items()}
+    
+    async def _run_step(self, step: InitStep) -> None:
+        """Bağımlılıkları bekle ve adımı çalıştır"""
+        try:
+            for dependency in (*step.depends_on, *step.after):
+                await self.steps[dependency]._done.wait()
+            
+            failed = [d for d in step.depends_on if self.steps[d].status != READY]
+            if failed:
+                step.status = SKIPPED
+                step.error = f"Bağımlılık hazır değil: {', '.join(failed)}"
+                logger.warning(f"⏭️ {step.name} atlandı ({step.error})")
+                return
+            
+            step.status = RUNNING
+            step.started_at = datetime.now()
+            start_time = time.perf_counter()
+            
+            try:
+                result = await step.func()
+                if result is False:
+                    step.status = FAILED
+                    step.error = "Servis hazır değil"
+                else:
+                    step.status = READY
+            except Exception as e:
+                step.status = FAILED
+                step.error = str(e)
+            finally:
+                step.duration_ms = (time.perf_counter() - start_time) * 1000
+            
+            if step.status == READY:
+                logger.info(f"✅ {step.name} hazır ({step.duration_ms:.0f} ms)")
+            else:
+                logger.error(f"❌ {step.name} başlatılamadı ({step.duration_ms:.0f} ms): {step.error or '-'}")
+        
+        finally:
+            step._done.set()
+    
+    def get_status(self) -> Dict:
+        """
+        Adım bazında hazır olma durumu
+        
+        Returns:
+            Genel durum ("initializing", "ready", "degraded") ve adım detayları
+        """
+        critical_steps = [s for s in self.steps.values() if s.critical]
+        
+        if self.is_running or not self.started_at:
+            overall = "initializing"
+        elif all(s.status == READY for s in critical_steps):
+            overall = "ready"
+        else:
+            overall = "degraded"
+        
+        return {
+            "status": overall,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "total_duration_ms": round(self.total_duration_ms, 1) if self.total_duration_ms is not None else None,
+            "steps": {
+                name: {
+                    "status": step.status,
+                    "duration_ms": round(step.duration_ms, 1) if step.duration_ms is not None else None,
+                    "depends_on": list(step.depends_on),
+                    "critical": step.critical,
+                    "error": step.error
+                }
+                for name, step in self.steps.items()
+            }
+        }
+
+
+# Global instance
+init_orchestrator = InitOrchestrator()
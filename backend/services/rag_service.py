@@ -1,8 +1,11 @@
 from typing import List, Tuple, Dict, Optional
 import logging
+import re
 
 from models.profile import Profile
-from services.search_service import search_service
+from services.excel_service import excel_service
+from services.search_service import search_service, get_category_filter
+from utils.query_parser import CategoryMatcher, fold_turkish, parse_query
 from utils.text_formatter import (
     format_profiles_for_context,
     create_system_prompt,
@@ -12,6 +15,10 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Veri tarafındaki kod yazımları (sorgu değil): "LR-3101-1" → "LR3101-1", "LR3101-1" → "LR-3101-1"
+LEADING_DASH_PATTERN = re.compile(r'^([A-Z]+)-(\d+)')
+LR_GL_CODE_PATTERN = re.compile(r'([A-Z]{2})-?(\d{4})(-\d+)?', re.IGNORECASE)
+
 
 def is_small_talk(query: str) -> bool:
     """
@@ -23,90 +30,29 @@ def is_small_talk(query: str) -> bool:
     Returns:
         True ise genel sohbet
     """
-    query_lower = query.lower().strip()
-    
-    # Selamlaşma ve genel sohbet kelimeleri
-    greetings = [
-        'merhaba', 'selam', 'günaydın', 'iyi günler', 'hey', 'hi', 'hello',
-        'nasılsın', 'nasılsınız', 'naber', 'nasilsin', 'nasilsiniz',
-        'hoş geldin', 'hoşgeldin', 'hos geldin', 'hosgeldin'
-    ]
-    
-    farewells = [
-        'görüşürüz', 'hoşça kal', 'güle güle', 'bay', 'bye', 'görüşmek üzere',
-        'gorusuruz', 'hosca kal', 'gule gule', 'teşekkür', 'tesekkur', 'sağol', 'sagol'
-    ]
-    
-    questions_about_bot = [
-        'kimsin', 'kim sin', 'adın ne', 'adin ne', 'ne yaparsın', 'ne yaparsin',
-        'nasıl yardım', 'nasil yardim', 'ne işe yarar', 'ne ise yarar',
-        'sen kimsin', 'sen ne', 'nedir bu', 'ne bu', 'yardım et', 'yardim et'
-    ]
-    
-    general_chat = [
-        'nasıl gidiyor', 'nasil gidiyor', 'ne var ne yok', 'naber',
-        'iyi misin', 'iyi misiniz', 'keyifler nasıl', 'keyifler nasil'
-    ]
-    
-    # Tüm small talk kelimelerini birleştir
-    all_small_talk = greetings + farewells + questions_about_bot + general_chat
-    
-    # Sorgu çok kısa ve small talk kelimesi içeriyorsa
-    if len(query_lower.split()) <= 5:
-        for keyword in all_small_talk:
-            if keyword in query_lower:
-                logger.info(f"Small talk detected: '{keyword}' in query")
-                return True
-    
-    # Sadece selamlaşma ise (tek kelime veya çok kısa)
-    if query_lower in greetings or query_lower in farewells:
+    if parse_query(query).is_small_talk:
+        logger.info("Small talk detected")
         return True
-    
     return False
 
 
 def is_catalog_query(query: str) -> bool:
     """Sorgunun katalog araması olup olmadığını kontrol et"""
     from services.catalog_service import catalog_service
-    import re
     
-    query_lower = query.lower()
+    parsed = parse_query(query)
     
     # ÖNCE: Ölçü bilgisi varsa ASLA katalog araması yapma!
     # Örn: "30 a 30 kutu", "100x50 lama", "çap 28", "50 ye 50 köşebent", "6 lama"
-    dimension_patterns = [
-        r'\d+\s*[axye]\s*\d+',  # 30x30, 30 a 30, 50 ye 50
-        r'\d+\s*mm',            # 30mm
-        r'çap\s*\d+',           # çap 28
-        r'\d+\s*çap',           # 28 çap
-        r'kalınlık',            # kalınlık 2mm
-        r'et\s*kalınlığı',      # et kalınlığı
-        r'\d+\s+\w+\s+\d+',     # 30 a 30, 50 ye 50
-        r'^\d+\s+\w+',          # 6 lama, 100 kutu (başta sayı + kelime)
-    ]
-    for pattern in dimension_patterns:
-        if re.search(pattern, query_lower):
-            logger.info(f"Dimension pattern found: {pattern} - Using standard profile search")
-            return False  # Standart profil araması yap
-    
-    # 1. Şekilsel kategori kontrolü (L şeklinde, T şeklinde, U şeklinde gibi)
-    shape_pattern = r'[ltucfhvsdmkr]\s+(?:şekl|sekl)'
-    if re.search(shape_pattern, query_lower):
-        return True
-    
-    # 2. "daire" özel kontrolü
-    if 'daire' in query_lower or 'dairesel' in query_lower:
-        return True
+    if parsed.dimension_pattern:
+        logger.info(f"Dimension pattern found: {parsed.dimension_pattern} - Using standard profile search")
+        return False  # Standart profil araması yap
     
-    # 3. "küpeşte" özel kontrolü
-    if 'küpeşte' in query_lower or 'kupeşte' in query_lower or 'küpeste' in query_lower or 'kupeste' in query_lower:
+    # Şekilsel kategori (L şeklinde), "daire", "küpeşte" veya "kategorisinde" gibi açık kategori ifadeleri
+    if parsed.catalog_hint:
         return True
     
-    # 4. "kategorisinde/kategorisindeki" gibi açık kategori belirten kelimeler
-    if 'kategorisinde' in query_lower or 'kategorisindeki' in query_lower or 'kategoriden' in query_lower:
-        return True
-    
-    # 5. Tüm katalog kategorilerini kontrol et (dinamik)
+    # Tüm katalog kategorilerini kontrol et (dinamik)
     # AMA sadece kategori adı varsa, ölçü yoksa
     try:
         all_categories = catalog_service.get_categories()
@@ -115,26 +61,10 @@ def is_catalog_query(query: str) -> bool:
             categories = all_categories.get(cat_type, [])
             all_cats.extend(categories)
         
-        # Türkçe karakter normalizasyonu
-        def normalize_turkish(text):
-            replacements = {
-                'ı': 'i', 'İ': 'i', 'I': 'i',
-                'ş': 's', 'Ş': 's',
-                'ğ': 'g', 'Ğ': 'g',
-                'ü': 'u', 'Ü': 'u',
-                'ö': 'o', 'Ö': 'o',
-                'ç': 'c', 'Ç': 'c'
-            }
-            for tr_char, en_char in replacements.items():
-                text = text.replace(tr_char, en_char)
-            return text.lower()
-        
-        query_normalized = normalize_turkish(query_lower)
-        
-        # Normalize edilmiş kategori isimleriyle karşılaştır
+        # Türkçe karakterleri katlanmış isimlerle basit substring match
+        query_normalized = parsed.normalized
         for category in all_cats:
-            cat_normalized = normalize_turkish(category)
-            # Basit substring match
+            cat_normalized = fold_turkish(category)
             if cat_normalized in query_normalized or query_normalized in cat_normalized:
                 return True
     except:
@@ -147,6 +77,10 @@ def is_catalog_query(query: str) -> bool:
 class RAGService:
     """RAG (Retrieval-Augmented Generation) servisi"""
     
+    def __init__(self):
+        # (katalog veri nesli, kategori eşleştirici) - nesil değişince yeniden kurulur
+        self._category_matcher: Optional[Tuple[int, CategoryMatcher]] = None
+    
     def _is_connection_query(self, query: str) -> bool:
         """
         Sorgunun birleşim ile ilgili olup olmadığını kontrol et
@@ -157,35 +91,10 @@ class RAGService:
         Returns:
             True ise birleşim sorgusu
         """
-        import re
-        
-        connection_keywords = [
-            'fitil', 'birleşim', 'birlesim', 'bağlan', 'baglan',
-            'hangi profil', 'hangi fitil', 'birleşim kodu', 
-            'birlesim kodu', 'bariyer', 'conta', 'birleşir',
-            'birlesir', 'bağlanır', 'baglanir', 'hangi sistemde',
-            'gasket', 'barrier', 'sisteminde', 'sistemdeki'
-        ]
-        
-        query_lower = query.lower()
-        query_normalized = self._normalize_turkish(query)
-        
-        # LR/GL profil kodu var mı? (birleşim sistemi profili)
-        # LR-3101, LR3101-1, LR-3101-1, GL3201 gibi formatlar
         # SADECE profil kodu varsa (LR3101-1 nedir?) NORMAL ARAMA YAP
         # Ama "fitil", "birleşim" gibi kelimeler varsa connection query
-        
-        # Önce anahtar kelime kontrolü
-        has_connection_keyword = False
-        for keyword in connection_keywords:
-            keyword_normalized = self._normalize_turkish(keyword)
-            if keyword in query_lower or keyword_normalized in query_normalized:
-                logger.info(f"Connection query detected: keyword '{keyword}' found")
-                has_connection_keyword = True
-                break
-        
-        # Eğer connection keyword varsa, connection query
-        if has_connection_keyword:
+        if parse_query(query).is_connection:
+            logger.info("Connection query detected: connection keyword found")
             return True
         
         # Eğer sadece LR/GL kodu varsa, NORMAL ARAMA (embedding'den bulunacak)
@@ -202,27 +111,13 @@ class RAGService:
         Returns:
             Profil kodu veya None
         """
-        import re
-        
-        # LR/GL formatları (Linearossa/Giyotin)
-        # LR-3101, LR3101-1, LR-3101-1, GL3201 gibi formatlar
-        lr_pattern = r'[LG][LR]-?\d{4}(?:-\d)?'
-        match = re.search(lr_pattern, query, re.IGNORECASE)
-        if match:
-            code = match.group(0).upper()
+        # LR/GL formatları (LR-3101, LR3101-1, GL3201) önce, sonra AP formatları (AP0001)
+        code = parse_query(query).profile_code
+        if code:
             logger.info(f"Profile code extracted: {code}")
-            return code
-        
-        # AP veya diğer formatlar (APXXXX, AP0001, vb.)
-        ap_pattern = r'AP\d{4,5}'
-        match = re.search(ap_pattern, query, re.IGNORECASE)
-        if match:
-            code = match.group(0).upper()
-            logger.info(f"Profile code extracted: {code}")
-            return code
-        
-        logger.debug("No profile code found in query")
-        return None
+        else:
+            logger.debug("No profile code found in query")
+        return code
     
     def _search_by_connection_code(self, query: str) -> Optional[str]:
         """
@@ -236,163 +131,139 @@ class RAGService:
         """
         from services.connection_service import connection_service
         from services.catalog_service import catalog_service
-        import re
         
-        # Birleşim kodu pattern'i: GLR64-05, LR-3101, vb.
-        connection_code_pattern = r'\b([A-Z]{2,3}R?-?\d{2,4}(?:-\d{2})?)\b'
-        match = re.search(connection_code_pattern, query.upper())
+        # Birleşim kodu (GLR64-05, LR-3101, ...) parser'da çıkarılıp tireli yazıma çevrildi
+        connection_code = parse_query(query).connection_code
+        if not connection_code:
+            return None
+        
+        logger.info(f"Birleşim kodu aranıyor (normalized): {connection_code}")
         
-        if not match:
+        # Birleşim kodu -> kayıt (ConnectionService'in kod indeksi)
+        connection = connection_service.find_connection(connection_code)
+        if connection is None:
             return None
         
-        connection_code = match.group(1)
+        profile = connection['profile']
+        system_name = connection['system']
         
-        # Normalize et: LR3101 → LR-3101, GLR6405 → GLR64-05
-        # Pattern: LR/GLR + sayılar → LR/GLR-sayılar
-        if re.match(r'^(LR|GLR)(\d+)$', connection_code):
-            # Tire yok, ekle: LR3101 → LR-3101
-            prefix = connection_code[:2] if connection_code.startswith('LR') else connection_code[:3]
-            numbers = connection_code[len(prefix):]
-            connection_code = f"{prefix}-{numbers}"
-        elif re.match(r'^(GLR)(\d{2})(\d{2})$', connection_code):
-            # GLR6405 → GLR64-05
-            connection_code = f"{connection_code[:5]}-{connection_code[5:]}"
+        # Birleşim kodu bulundu!
+        logger.info(f"Birleşim kodu bulundu: {connection_code} in {system_name}")
         
-        logger.info(f"Birleşim kodu aranıyor (normalized): {connection_code}")
+        # Birleşen profilleri topla
+        profiles_info = []
+        profile_codes = []
         
-        # Tüm sistemleri al ve birleşim kodunu ara
-        all_systems = connection_service.get_all_systems()
+        if profile.get('inner_profile'):
+            profile_codes.append(profile['inner_profile'])
+        if profile.get('middle_profile'):
+            profile_codes.append(profile['middle_profile'])
+        if profile.get('outer_profile'):
+            profile_codes.append(profile['outer_profile'])
         
-        for system in all_systems:
-            for profile in system.get('profiles', []):
-                if profile.get('connection_code') == connection_code:
-                    # Birleşim kodu bulundu!
-                    logger.info(f"Birleşim kodu bulundu: {connection_code} in {system['name']}")
-                    
-                    # Birleşen profilleri topla
-                    profiles_info = []
-                    profile_codes = []
-                    
-                    if profile.get('inner_profile'):
-                        profile_codes.append(profile['inner_profile'])
-                    if profile.get('middle_profile'):
-                        profile_codes.append(profile['middle_profile'])
-                    if profile.get('outer_profile'):
-                        profile_codes.append(profile['outer_profile'])
-                    
-                    # Her profil için kategori bilgisini al
-                    for code in profile_codes:
-                        # Profil kodunu normalize et (sadece ilk tire'yi kaldır)
-                        # LR-3101-1 → LR3101-1, LR-3102-1 → LR3102-1
-                        # Ama LR3101-1 → LR3101-1 (değişmez)
-                        import re
-                        normalized_code = re.sub(r'^([A-Z]+)-(\d+)', r'\1\2', code)
-                        
-                        # Önce normalize edilmiş kod ile dene
-                        cat_profile = catalog_service.get_profile_by_no(normalized_code)
-                        
-                        # Bulunamazsa orijinal kod ile dene
-                        if not cat_profile:
-                            cat_profile = catalog_service.get_profile_by_no(code)
-                        
-                        if cat_profile:
-                            categories = ', '.join(cat_profile.get('categories', []))
-                            image_url = f"{settings.backend_url}/api/profile-image/{code}"
-                            profiles_info.append({
-                                'code': code,
-                                'categories': categories,
-                                'image_url': image_url
-                            })
+        # Her profil için kategori bilgisini al
+        for code in profile_codes:
+            # Profil kodunu normalize et (sadece ilk tire'yi kaldır)
+            # LR-3101-1 → LR3101-1, LR-3102-1 → LR3102-1
+            # Ama LR3101-1 → LR3101-1 (değişmez)
+            normalized_code = LEADING_DASH_PATTERN.sub(r'\1\2', code)
+            
+            # Orijinal yazım (LR-3101-1) katalog kod kaydında aynı anahtara düşer
+            cat_profile = catalog_service.get_profile_by_no(normalized_code)
+            
+            if cat_profile:
+                categories = ', '.join(cat_profile.get('categories', []))
+                image_url = f"{settings.backend_url}/api/profile-image/{code}"
+                profiles_info.append({
+                    'code': code,
+                    'categories': categories,
+                    'image_url': image_url
+                })
+        
+        # Cevap oluştur
+        if len(profiles_info) > 0:
+            # Profiller var - açık açıklama ile göster
+            # Açıklama oluştur: "LR-3101, LR-3101-1 ve LR-3101-2 profillerinin birleşimidir"
+            if len(profiles_info) == 1:
+                explanation = f"**{connection_code}**, {profiles_info[0]['code']} profilinden oluşur."
+            elif len(profiles_info) == 2:
+                explanation = f"**{connection_code}**, {profiles_info[0]['code']} ve {profiles_info[1]['code']} profillerinin birleşimidir."
+            else:
+                # 3 veya daha fazla profil
+                codes = [p['code'] for p in profiles_info]
+                last_code = codes[-1]
+                other_codes = ', '.join(codes[:-1])
+                explanation = f"**{connection_code}**, {other_codes} ve {last_code} profillerinin birleşimidir."
+            
+            answer_parts = [
+                f"**{connection_code}** bir birleşim kodudur.\n",
+                f"{explanation}\n",
+                f"**Sistem:** {system_name}\n",
+                f"**Birleşen Profiller:** {len(profiles_info)} profil\n"
+            ]
+            
+            for i, prof_info in enumerate(profiles_info, 1):
+                answer_parts.append(f"\n**{i}. {prof_info['code']}**")
+                answer_parts.append(f"![{prof_info['code']}]({prof_info['image_url']})")
+                if prof_info['categories']:
+                    answer_parts.append(f"Kategoriler: {prof_info['categories']}")
+            
+            return "\n".join(answer_parts)
+        else:
+            # Profil yok - bu birleşim kodunun hangi profil kodlarından oluştuğunu bul
+            logger.info(f"Birleşim kodunda inner/middle/outer profil yok, profil varyantlarını arıyorum")
+            
+            # Aday profiller: kod ailesi (önek indeksi, tüm katalog taranmaz)
+            family = catalog_service.get_profiles_by_code_prefix(connection_code)
+            
+            # LR-3101 → LR-3101-1, LR-3101-2 gibi profil kodlarını ara
+            # LR-3101 ile başlayan ve suffix'i olan profiller
+            profile_variants = [prof for prof in family if prof.get('code', '').startswith(connection_code + '-')]
+            
+            # Tire olmadan da dene: LR3101-1, LR3101-2
+            if not profile_variants:
+                connection_code_no_dash = connection_code.replace('-', '')
+                profile_variants = [
+                    prof for prof in family
+                    if prof.get('code', '').startswith(connection_code_no_dash + '-')
+                ]
+            
+            if profile_variants:
+                # Profil kodlarını topla
+                variant_codes = [prof.get('code') for prof in profile_variants]
+                
+                # Açık açıklama oluştur: "LR-3101, LR-3101-1 ve LR-3101-2 profillerinin birleşimidir"
+                if len(variant_codes) == 1:
+                    explanation = f"**{connection_code}**, {variant_codes[0]} profilinden oluşur."
+                elif len(variant_codes) == 2:
+                    explanation = f"**{connection_code}**, {variant_codes[0]} ve {variant_codes[1]} profillerinin birleşimidir."
+                else:
+                    # 3 veya daha fazla profil
+                    last_code = variant_codes[-1]
+                    other_codes = ', '.join(variant_codes[:-1])
+                    explanation = f"**{connection_code}**, {other_codes} ve {last_code} profillerinin birleşimidir."
+                
+                answer_parts = [
+                    f"**{connection_code}** bir birleşim kodudur.\n",
+                    f"{explanation}\n",
+                    f"**Sistem:** {system_name}\n",
+                    f"**Birleşen Profiller:** {len(profile_variants)} profil\n"
+                ]
+                
+                for i, prof in enumerate(profile_variants, 1):
+                    code = prof.get('code')
+                    categories = ', '.join(prof.get('categories', []))
+                    image_url = f"{settings.backend_url}/api/profile-image/{code}"
                     
-                    # Cevap oluştur
-                    if len(profiles_info) > 0:
-                        # Profiller var - açık açıklama ile göster
-                        # Açıklama oluştur: "LR-3101, LR-3101-1 ve LR-3101-2 profillerinin birleşimidir"
-                        if len(profiles_info) == 1:
-                            explanation = f"**{connection_code}**, {profiles_info[0]['code']} profilinden oluşur."
-                        elif len(profiles_info) == 2:
-                            explanation = f"**{connection_code}**, {profiles_info[0]['code']} ve {profiles_info[1]['code']} profillerinin birleşimidir."
-                        else:
-                            # 3 veya daha fazla profil
-                            codes = [p['code'] for p in profiles_info]
-                            last_code = codes[-1]
-                            other_codes = ', '.join(codes[:-1])
-                            explanation = f"**{connection_code}**, {other_codes} ve {last_code} profillerinin birleşimidir."
-                        
-                        answer_parts = [
-                            f"**{connection_code}** bir birleşim kodudur.\n",
-                            f"{explanation}\n",
-                            f"**Sistem:** {system['name']}\n",
-                            f"**Birleşen Profiller:** {len(profiles_info)} profil\n"
-                        ]
-                        
-                        for i, prof_info in enumerate(profiles_info, 1):
-                            answer_parts.append(f"\n**{i}. {prof_info['code']}**")
-                            answer_parts.append(f"![{prof_info['code']}]({prof_info['image_url']})")
-                            if prof_info['categories']:
-                                answer_parts.append(f"Kategoriler: {prof_info['categories']}")
-                        
-                        return "\n".join(answer_parts)
-                    else:
-                        # Profil yok - bu birleşim kodunun hangi profil kodlarından oluştuğunu bul
-                        logger.info(f"Birleşim kodunda inner/middle/outer profil yok, profil varyantlarını arıyorum")
-                        
-                        # Tüm profilleri al
-                        all_profiles = catalog_service.get_all_profiles()
-                        
-                        # LR-3101 → LR-3101-1, LR-3101-2 gibi profil kodlarını ara
-                        profile_variants = []
-                        
-                        for prof in all_profiles:
-                            prof_code = prof.get('code', '')
-                            # LR-3101 ile başlayan ve suffix'i olan profiller
-                            if prof_code.startswith(connection_code + '-'):
-                                profile_variants.append(prof)
-                        
-                        # Tire olmadan da dene: LR3101-1, LR3101-2
-                        if not profile_variants:
-                            connection_code_no_dash = connection_code.replace('-', '')
-                            for prof in all_profiles:
-                                prof_code = prof.get('code', '')
-                                if prof_code.startswith(connection_code_no_dash + '-'):
-                                    profile_variants.append(prof)
-                        
-                        if profile_variants:
-                            # Profil kodlarını topla
-                            variant_codes = [prof.get('code') for prof in profile_variants]
-                            
-                            # Açık açıklama oluştur: "LR-3101, LR-3101-1 ve LR-3101-2 profillerinin birleşimidir"
-                            if len(variant_codes) == 1:
-                                explanation = f"**{connection_code}**, {variant_codes[0]} profilinden oluşur."
-                            elif len(variant_codes) == 2:
-                                explanation = f"**{connection_code}**, {variant_codes[0]} ve {variant_codes[1]} profillerinin birleşimidir."
-                            else:
-                                # 3 veya daha fazla profil
-                                last_code = variant_codes[-1]
-                                other_codes = ', '.join(variant_codes[:-1])
-                                explanation = f"**{connection_code}**, {other_codes} ve {last_code} profillerinin birleşimidir."
-                            
-                            answer_parts = [
-                                f"**{connection_code}** bir birleşim kodudur.\n",
-                                f"{explanation}\n",
-                                f"**Sistem:** {system['name']}\n",
-                                f"**Birleşen Profiller:** {len(profile_variants)} profil\n"
-                            ]
-                            
-                            for i, prof in enumerate(profile_variants, 1):
-                                code = prof.get('code')
-                                categories = ', '.join(prof.get('categories', []))
-                                image_url = f"{settings.backend_url}/api/profile-image/{code}"
-                                
-                                answer_parts.append(f"\n**{i}. {code}**")
-                                answer_parts.append(f"![{code}]({image_url})")
-                                if categories:
-                                    answer_parts.append(f"Kategoriler: {categories}")
-                            
-                            return "\n".join(answer_parts)
-                        else:
-                            # Hiçbir profil bulunamadı
-                            return f"**{connection_code}** bir birleşim kodudur.\n\n**Sistem:** {system['name']}\n\nBu birleşim kodunda profil bilgisi bulunmuyor."
+                    answer_parts.append(f"\n**{i}. {code}**")
+                    answer_parts.append(f"![{code}]({image_url})")
+                    if categories:
+                        answer_parts.append(f"Kategoriler: {categories}")
+                
+                return "\n".join(answer_parts)
+            else:
+                # Hiçbir profil bulunamadı
+                return f"**{connection_code}** bir birleşim kodudur.\n\n**Sistem:** {system_name}\n\nBu birleşim kodunda profil bilgisi bulunmuyor."
         
         return None
     
@@ -595,31 +466,7 @@ class RAGService:
     
     def _normalize_turkish(self, text: str) -> str:
         """Türkçe karakterleri normalize et (encoding sorunları için)"""
-        # Önce büyük harfleri değiştir (lower() çağrılmadan önce!)
-        text = text.replace('İ', 'i')  # Türkçe büyük İ → küçük i
-        text = text.replace('I', 'ı')  # İngilizce büyük I → Türkçe küçük ı
-        
-        # Şimdi lowercase yap
-        text = text.lower()
-        
-        # Sonra diğer Türkçe karakterleri normalize et
-        replacements = {
-            'ı': 'i',  # Türkçe ı → i
-            'ş': 's', 
-            'ğ': 'g',
-            'ü': 'u',
-            'ö': 'o',
-            'ç': 'c'
-        }
-        for tr_char, en_char in replacements.items():
-            text = text.replace(tr_char, en_char)
-        
-        # Combining characters'ı temizle (İ'nin lower() sonrası bıraktığı dot)
-        import unicodedata
-        text = unicodedata.normalize('NFKD', text)
-        text = ''.join([c for c in text if not unicodedata.combining(c)])
-        
-        return text
+        return fold_turkish(text)
     
     def _normalize_profile_code(self, code: str) -> str:
         """
@@ -637,8 +484,6 @@ class RAGService:
             LR 3101-1 → LR-3101
             GL3201 → GL-3201
         """
-        import re
-        
         try:
             # Boşlukları temizle
             code = code.strip().replace(' ', '')
@@ -647,7 +492,7 @@ class RAGService:
             if code.upper().startswith(('LR', 'GL')):
                 # Pattern: LR3101-1, LR-3101-1, LR3101 gibi formatlar
                 # Hedef: LR-3101-1 (tire ekle ama suffix'i koru)
-                match = re.match(r'([A-Z]{2})-?(\d{4})(-\d+)?', code, re.IGNORECASE)
+                match = LR_GL_CODE_PATTERN.match(code)
                 if match:
                     prefix = match.group(1).upper()
                     number = match.group(2)
@@ -685,8 +530,8 @@ class RAGService:
             normalized_code = self._normalize_profile_code(profile_code)
             logger.debug(f"Getting system info for profile: {profile_code} (normalized: {normalized_code})")
             
-            # Connection service'ten profil birleşim bilgisini al
-            connection = connection_service.get_profile_connections(normalized_code)
+            # Birleşim kodu indeksinden sistem bilgisini al (bulunamaması normal)
+            connection = connection_service.find_connection(normalized_code)
             
             if connection and connection.get('system'):
                 system_name = connection['system']
@@ -753,6 +598,20 @@ class RAGService:
             logger.error(f"Failed to get connection info for profile '{profile_code}': {e}")
             return None
     
+    def _get_category_matcher(self) -> CategoryMatcher:
+        """Katalog kategorileri için eşleştirici (veri nesli başına bir kez kurulur)"""
+        from services.catalog_service import catalog_service
+        
+        generation = catalog_service.data_generation
+        if self._category_matcher is None or self._category_matcher[0] != generation:
+            all_categories = catalog_service.get_categories()
+            self._category_matcher = (generation, CategoryMatcher(
+                category
+                for cat_type in ('standard', 'shape', 'sector')
+                for category in all_categories.get(cat_type, [])
+            ))
+        return self._category_matcher[1]
+    
     def _extract_all_categories(self, query: str) -> List[str]:
         """
         Sorgudan TÜM kategorileri extract et (kombinasyon ve tekli aramalar için)
@@ -767,39 +626,18 @@ class RAGService:
             Kategori listesi (boş liste = kategori yok)
         """
         from services.catalog_service import catalog_service
-        import re
         
-        query_lower = query.lower()
-        found_categories = []
-        
-        # Sorguyu temizle - gereksiz kelimeleri kaldır
-        noise_words = ['sanırım', 'sanirim', 'galiba', 'herhalde', 'belki', 'gibi', 
-                       'varmı', 'var mı', 'var mi', 'varmı?', 'var mı?']
-        query_cleaned = query_lower
-        for noise in noise_words:
-            query_cleaned = query_cleaned.replace(noise, ' ')
-        query_cleaned = ' '.join(query_cleaned.split())  # Fazla boşlukları temizle
-        
-        logger.info(f"Temizlenmiş sorgu: '{query_cleaned}'")
-        
-        # 1. Tek harfli şekilsel kategorileri kontrol et (L, T, U, etc.)
-        shape_letters = ['L', 'T', 'U', 'C', 'H', 'V', 'S', 'F', 'D', 'M', 'K', 'R']
-        
-        for letter in shape_letters:
-            # Pattern 1: "X şeklinde", "X şekl"
-            pattern1 = rf'(?:^|\s){letter.lower()}\s+(?:şeklinde|şekl(?!li)|sekl(?!li))'
-            # Pattern 2: "şekil X", "şekli X"
-            pattern2 = rf'(?:şekil|şekli|sekil|sekli)\s+{letter.lower()}'
-            # Pattern 3: "X şekilli"
-            pattern3 = rf'(?:^|\s)({letter.lower()})\s+(?:şekilli|sekilli)'
-            
-            if re.search(pattern1, query_cleaned) or re.search(pattern2, query_cleaned) or re.search(pattern3, query_cleaned):
-                if letter not in found_categories:
-                    found_categories.append(letter)
-                    logger.info(f"Şekilsel kategori bulundu (harf): {letter}")
+        # Dolgu kelimeleri (sanırım, galiba, var mı...) parser'da temizlendi
+        parsed = parse_query(query)
+        logger.info(f"Temizlenmiş sorgu: '{parsed.cleaned}'")
+        
+        # 1. Tek harfli şekilsel kategoriler (L şeklinde, şekli T, U şekilli)
+        found_categories = list(parsed.shape_letters)
+        if found_categories:
+            logger.info(f"Şekilsel kategori bulundu (harf): {found_categories}")
         
         # 2. Özel durum: "daire", "dairesel", "daire şeklinde" → "DAİRE" kategorisi
-        if re.search(r'daire(?:sel|\s+(?:şekl|sekl))', query_cleaned) or 'daire' in query_cleaned:
+        if parsed.mentions_daire:
             all_categories = catalog_service.get_categories()
             for cat_type in ['shape', 'sector']:
                 for cat in all_categories.get(cat_type, []):
@@ -810,7 +648,7 @@ class RAGService:
                             logger.info(f"Şekilsel kategori bulundu (daire): {cat}")
         
         # 3. Özel durum: "küpeşte" → "KÜPEŞTE" kategorisi
-        if 'küpeşte' in query_cleaned or 'kupeşte' in query_cleaned or 'küpeste' in query_cleaned or 'kupeste' in query_cleaned:
+        if parsed.mentions_kupeste:
             all_categories = catalog_service.get_categories()
             for cat_type in ['sector', 'shape', 'standard']:
                 for cat in all_categories.get(cat_type, []):
@@ -820,62 +658,11 @@ class RAGService:
                             found_categories.append(cat)
                             logger.info(f"Ürün kategorisi bulundu (küpeşte): {cat}")
         
-        # 4. Tüm katalog kategorilerini kontrol et (genel eşleşme)
-        all_categories = catalog_service.get_categories()
-        all_cats = []
-        for cat_type in ['standard', 'shape', 'sector']:
-            categories = all_categories.get(cat_type, [])
-            all_cats.extend(categories)
-        
-        # Uzunluğa göre sırala (uzun olanlar önce - daha spesifik)
-        all_cats.sort(key=len, reverse=True)
-        
-        # Sorgu içinde geçen kategorileri bul (Türkçe karakter normalizasyonu ile)
-        query_normalized = self._normalize_turkish(query_cleaned)
-        
-        for category in all_cats:
-            # Tek harfli şekilsel kategorileri atla (zaten yukarıda pattern ile bulduk)
-            if len(category) == 1 and category.isalpha():
-                continue
-            
-            # Türkçe karakter normalizasyonu ile karşılaştır
-            cat_normalized = self._normalize_turkish(category)
-            
-            # İki tür eşleşme:
-            # 1. TAM KELİME eşleşmesi (öncelikli)
-            # 2. KISMI eşleşme (uzun kategori isimleri için, örn: "güneş kırıcı" → "Güneş Kırıcı Menfez")
-            
-            # Tam kelime eşleşmesi
-            pattern_exact = r'\b' + re.escape(cat_normalized) + r'\b'
-            if re.search(pattern_exact, query_normalized):
-                if category not in found_categories:
-                    found_categories.append(category)
-                    logger.info(f"Katalog kategorisi bulundu (tam): {category}")
-                    continue
-            
-            # Kısmi eşleşme (kategori 2+ kelimeden oluşuyorsa)
-            cat_words = cat_normalized.split()
-            if len(cat_words) >= 2:
-                # Sorgu kategorinin ilk N kelimesini içeriyorsa eşleş
-                # Örn: "güneş kırıcı" sorgusu → "Güneş Kırıcı Menfez" kategorisi
-                query_words = query_normalized.split()
-                
-                # İlk 2 kelimeyi kontrol et
-                first_two_words = ' '.join(cat_words[:2])
-                if first_two_words in query_normalized:
-                    if category not in found_categories:
-                        found_categories.append(category)
-                        logger.info(f"Katalog kategorisi bulundu (kısmi - ilk 2 kelime): {category}")
-                        continue
-                
-                # Tek kelime ile eşleşme (kategori içindeki herhangi bir kelime)
-                # Örn: "menfez" → "Güneş Kırıcı Menfez"
-                for cat_word in cat_words:
-                    if len(cat_word) >= 4 and cat_word in query_normalized:  # En az 4 harf
-                        if category not in found_categories:
-                            found_categories.append(category)
-                            logger.info(f"Katalog kategorisi bulundu (kısmi - tek kelime): {category}")
-                            break
+        # 4. Tüm katalog kategorilerini kontrol et (genel eşleşme, Türkçe karakter normalizasyonu ile)
+        for category, kind in self._get_category_matcher().match(parsed.cleaned_normalized):
+            if category not in found_categories:
+                found_categories.append(category)
+                logger.info(f"Katalog kategorisi bulundu ({kind}): {category}")
         
         logger.info(f"Toplam {len(found_categories)} kategori bulundu: {found_categories}")
         return found_categories
@@ -889,32 +676,9 @@ class RAGService:
         - "beymetal şirketi"
         - "alfore profilleri"
         """
-        import re
-        
-        query_lower = query.lower()
-        companies = []
-        
-        # Pattern 1: Parantez içindeki şirket isimleri
-        match = re.search(r'\((.*?)\s+şirketleri?\)', query_lower)
-        if match:
-            companies_str = match.group(1)
-            # Virgülle ayrılmış şirketleri parse et
-            companies = [c.strip() for c in companies_str.split(',')]
-            return companies
-        
-        # Pattern 2: "beymetal şirketi", "alfore şirketi"
-        company_names = ['beymetal', 'alfore', 'linearossa']
-        for company in company_names:
-            if re.search(rf'{company}\s+(?:şirketi|sirketi|firması|firmas)', query_lower):
-                companies.append(company)
-        
-        # Pattern 3: Sadece şirket ismi geçiyorsa (ama kategori değilse)
-        if not companies:
-            for company in company_names:
-                if company in query_lower:
-                    companies.append(company)
-        
-        return companies if companies else None
+        # Parantez içi liste, "X şirketi" veya sadece şirket ismi - parser'da çıkarıldı
+        companies = parse_query(query).companies
+        return list(companies) if companies else None
     
     def prepare_context(self, query: str, top_k: int = 5) -> Tuple[List[Profile], str]:
         """
@@ -989,12 +753,11 @@ class RAGService:
         Returns:
             Formatlanmış cevap
         """
-        import re
+        parsed = parse_query(query)
         
         # Yakın değer araması mı? (10, 10 lama, 3 kutu gibi)
-        range_match = re.match(r'^(\d+)(?:\s+\w+)?$', query.strip())
-        if range_match and previous_query:
-            range_value = int(range_match.group(1))
+        if parsed.range_value is not None and previous_query:
+            range_value = parsed.range_value
             logger.info(f"Yakın değer araması: ±{range_value} (önceki sorgu: {previous_query})")
             return self._search_nearby_dimensions(previous_query, range_value, top_k)
         
@@ -1022,21 +785,16 @@ class RAGService:
         
         if not results:
             # Profil bulunamadı - ama yakın değer önerisi göster (eğer ölçü araması ise)
-            import re
-            
-            # Önce AxB formatını kontrol et (100x200 gibi)
-            axb_match = re.search(r'(\d+)\s*[axye]\s*(\d+)', query.lower())
+            dimensions = parsed.dimensions
+            axb_match = dimensions.size_pair
             
             if axb_match:
-                # AxB formatı var - ilk ölçüyü kullan
-                dimension_value = int(axb_match.group(1))
-                category_match = re.search(r'\d+\s*[axye]\s*\d+\s*(\w+)', query.lower())
-                category_keyword = category_match.group(1) if category_match else "profil"
+                # AxB formatı var (100x200 gibi) - ilk ölçüyü kullan
+                dimension_value = axb_match[0]
             else:
                 # Tek ölçü var mı kontrol et
-                dimension_value = self._extract_dimension_value(query)
-                category_match = re.search(r'\d+\s*(\w+)', query.lower())
-                category_keyword = category_match.group(1) if category_match else "profil"
+                dimension_value = dimensions.value
+            category_keyword = dimensions.size_keyword or "profil"
             
             if dimension_value:
                 # STANDART kategorisi mi kontrol et (sadece standart kategorilerde yakın değer önerisi)
@@ -1045,8 +803,14 @@ class RAGService:
                 is_standard = any(kw in category_keyword.lower() for kw in standard_keywords)
                 
                 if is_standard:
+                    # AxB aramasında en yakın mevcut ölçüleri de göster (tek KD-tree sorgusu)
+                    closest = ""
+                    if axb_match:
+                        closest = self._closest_sizes_hint(query, axb_match[0], axb_match[1])
+                    
                     return (
                         f"Üzgünüm, aramanıza uygun profil bulamadım.\n\n"
+                        f"{closest}"
                         f"💡 **Yakın değerlerde aramak ister misiniz?**\n"
                         f"Sadece değer girin. Örneğin **3** yazarsanız, **{dimension_value-3} ile {dimension_value+3}** arasındaki {category_keyword.upper()} profillerini gösterebilirim."
                     )
@@ -1151,33 +915,8 @@ class RAGService:
         Returns:
             Ölçü değeri (int) veya None
         """
-        import re
-        
-        query_lower = query.lower()
-        
-        # Pattern 1 (ÖNCELİKLİ): AxB formatı (30x30, 30 a 30, 100 e 200) - AxB varsa tek ölçü DEĞİL
-        # Bu durumda None döndür (yakın değer araması yapılmasın)
-        match = re.search(r'(\d+)\s*[axye]\s*(\d+)', query_lower)
-        if match:
-            # İki farklı ölçü varsa (100x200 gibi), None döndür
-            dim1 = int(match.group(1))
-            dim2 = int(match.group(2))
-            if dim1 != dim2:
-                return None  # Farklı ölçüler, yakın değer araması yapma
-            else:
-                return dim1  # Aynı ölçüler (30x30), ilk değeri döndür
-        
-        # Pattern 2: Çap (çap 28, 28 çap)
-        match = re.search(r'(?:çap|cap)\s*(\d+)|(\d+)\s*(?:çap|cap)', query_lower)
-        if match:
-            return int(match.group(1) or match.group(2))
-        
-        # Pattern 3: Başta sayı (6 lama, 100 kutu)
-        match = re.match(r'^(\d+)\s+\w+', query_lower)
-        if match:
-            return int(match.group(1))
-        
-        return None
+        # Öncelik: AxB (farklı ölçülerse None), çap (çap 28, 28 çap), baştaki sayı (6 lama)
+        return parse_query(query).dimensions.value
     
     def _search_nearby_dimensions(self, original_query: str, range_value: int, top_k: int = 20) -> str:
         """
@@ -1203,13 +942,6 @@ class RAGService:
         
         logger.info(f"Yakın değer araması: {min_value}-{max_value} (orijinal: {original_value}, aralık: ±{range_value})")
         
-        # Kategoriyi extract et (lama, kutu, boru, vb.)
-        import re
-        # Pattern: "30 a 30 kutu" → "kutu", "6 lama" → "lama"
-        category_match = re.search(r'(?:\d+\s*[axye]\s*\d+\s+)?(\w+)', original_query.lower())
-        category_keyword = category_match.group(1) if category_match else ""
-        logger.info(f"Kategori keyword: {category_keyword}")
-        
         # Orijinal kategoriden profilleri al (kategori filtresi)
         original_results = search_service.search(original_query, top_k=1)
         original_category = None
@@ -1217,36 +949,34 @@ class RAGService:
             original_category = original_results[0][0].category
             logger.info(f"Orijinal kategori: {original_category}")
         
-        # Aralıktaki tüm değerler için arama yap
-        all_results = []
-        seen_codes = set()
-        
-        for value in range(min_value, max_value + 1):
-            # Yeni sorgu oluştur
-            new_query = f"{value} {category_keyword}" if category_keyword else str(value)
-            
-            # Arama yap
-            results = search_service.search(new_query, top_k=50)
-            
-            if results:
-                for profile, score, reason in results:
-                    # Kategori filtresi: Sadece orijinal kategoriyle eşleşenleri al
-                    if original_category and profile.category != original_category:
+        # Orijinal kategori bulunamadıysa sorgudaki kategori kelimesine uyan kategoriler
+        if original_category:
+            categories = [original_category]
+        else:
+            category_filter = get_category_filter(original_query.lower())
+            logger.info(f"Kategori filtresi: {category_filter}")
+            if category_filter:
+                categories = excel_service.state.dimension_matrix.categories_for_word(category_filter)
+            else:
+                categories = [None]
+        
+        # Her ölçü (Ø, A, B) için tek bir KD-tree sorgusu: ±aralık içindeki tüm profiller
+        best: Dict[str, Tuple[float, Profile]] = {}
+        for category in categories:
+            for key in ('Ø', 'A', 'B'):
+                for profile, _ in excel_service.nearest_profiles({key: original_value}, category, k=None, tolerance=range_value):
+                    value = profile.dimensions[key]
+                    if value < min_value:
                         continue
-                    
-                    if profile.code not in seen_codes:
-                        all_results.append((profile, score, reason, value))
-                        seen_codes.add(profile.code)
+                    difference = abs(value - original_value)
+                    if profile.code not in best or difference < best[profile.code][0]:
+                        best[profile.code] = (difference, profile)
         
-        if not all_results:
+        if not best:
             return f"Üzgünüm, **{min_value}-{max_value}** aralığında profil bulamadım."
         
-        # Sonuçları ölçüye göre grupla
-        from collections import defaultdict
-        results_by_dimension = defaultdict(list)
-        
-        for profile, score, reason, value in all_results:
-            results_by_dimension[value].append((profile, score, reason))
+        # En yakın ölçüden uzağa sırala
+        all_results = sorted(best.values(), key=lambda item: item[0])
         
         # Cevap oluştur
         answer_parts = []
@@ -1254,35 +984,76 @@ class RAGService:
             f"**{min_value}-{max_value}** aralığında **{len(all_results)} profil** buldum:\n"
         )
         
-        # Ölçüye göre sıralı göster
+        # Ölçü farkına göre sıralı göster
         profile_count = 0
-        for dimension_value in sorted(results_by_dimension.keys()):
-            profiles = results_by_dimension[dimension_value]
-            
-            for profile, score, reason in profiles[:5]:  # Her ölçüden max 5 profil
-                if profile_count >= top_k:
-                    break
-                
-                profile_count += 1
-                dims = ", ".join([f"{k}={v}mm" for k, v in profile.dimensions.items()])
-                
-                # Profil görseli ekle
-                image_url = f"{settings.backend_url}/api/profile-image/{profile.code}"
-                answer_parts.append(
-                    f"\n**{profile_count}. {profile.code}** - {profile.category}\n"
-                    f"![{profile.code}]({image_url})\n"
-                    f"   Ölçüler: {dims}\n"
-                    f"   Eşleşme: {reason}"
-                )
+        for difference, profile in all_results[:top_k]:
+            profile_count += 1
+            dims = ", ".join([f"{k}={v}mm" for k, v in profile.dimensions.items()])
+            reason = self._dimension_reason(profile)
             
-            if profile_count >= top_k:
-                break
+            # Profil görseli ekle
+            image_url = f"{settings.backend_url}/api/profile-image/{profile.code}"
+            answer_parts.append(
+                f"\n**{profile_count}. {profile.code}** - {profile.category}\n"
+                f"![{profile.code}]({image_url})\n"
+                f"   Ölçüler: {dims}\n"
+                f"   Eşleşme: {reason} (fark: {difference:g}mm)"
+            )
         
         if len(all_results) > profile_count:
             answer_parts.append(f"\n... ve {len(all_results) - profile_count} profil daha.")
         
         return "\n".join(answer_parts)
     
+    def _closest_sizes_hint(self, query: str, a_value: int, b_value: int, limit: int = 3) -> str:
+        """
+        AxB sorgusu için en yakın mevcut ölçüler
+        
+        Args:
+            query: Kullanıcı sorusu (kategori kelimesi için)
+            a_value: İstenen A ölçüsü
+            b_value: İstenen B ölçüsü
+            limit: Gösterilecek profil sayısı
+            
+        Returns:
+            Markdown satırı veya boş string
+        """
+        category_filter = get_category_filter(query.lower())
+        if not category_filter:
+            return ""
+        
+        closest = []
+        for category in excel_service.state.dimension_matrix.categories_for_word(category_filter):
+            closest.extend(excel_service.nearest_profiles({'A': a_value, 'B': b_value}, category, k=limit))
+        
+        if not closest:
+            return ""
+        
+        closest.sort(key=lambda item: item[1])
+        sizes = ", ".join(
+            f"**{profile.code}** ({profile.dimensions['A']:g}x{profile.dimensions['B']:g}mm)"
+            for profile, _ in closest[:limit]
+        )
+        return f"📏 En yakın mevcut ölçüler: {sizes}\n\n"
+    
+    def _dimension_reason(self, profile: Profile) -> str:
+        """
+        Yakın değer sonucu için eşleşme açıklaması
+        
+        Args:
+            profile: Standart profil
+            
+        Returns:
+            "Ölçü: AxBmm, Kalınlık: Kmm" veya "Çap: Ømm"
+        """
+        dimensions = profile.dimensions
+        if 'A' in dimensions and 'B' in dimensions:
+            reason = f"Ölçü: {dimensions['A']}x{dimensions['B']}mm"
+            if 'K' in dimensions:
+                reason += f", Kalınlık: {dimensions['K']}mm"
+            return reason
+        return f"Çap: {dimensions.get('Ø')}mm"
+    
     def _format_categories_with_colors(self, categories: List[str]) -> str:
         """
         Kategorileri renkli HTML span'ler ile formatla
@@ -1327,73 +1098,31 @@ class RAGService:
         Returns:
             Formatlanmış profil bilgisi veya None
         """
-        import re
         from services.catalog_service import catalog_service
         
-        # Profil kodu pattern'leri
-        # LR/GL formatları: LR-3101, LR3101-1, GL3201
-        # AP formatları: AP0028, AP278, AP17382
-        # Diğer formatlar: BM-RAY-001, vb.
-        patterns = [
-            r'\b([LG][LR]-?\d{4}(?:-\d)?)\b',  # LR-3101, LR3101-1, GL3201
-            r'\b(AP\d{3,5})\b',                 # AP0028, AP278, AP17382
-            r'\b([A-Z]{2,}-[A-Z]+-\d+)\b',     # BM-RAY-001
-        ]
+        # Kod adayları parser'da çıkarıldı (büyük harfli mesajdan):
+        # - base_code: LR3101, GLR64 gibi suffix'siz kodlar, tireli yazımla (LR-3101)
+        # - catalog_codes: LR-3101, LR3101-1, GL3201 / AP0028, AP17382 / BM-RAY-001
+        parsed = parse_query(query)
+        base_code = parsed.base_code
         
-        query_upper = query.upper()
-        
-        # Özel durum: LR3101, GLR64 gibi kodlar (suffix yok)
-        # Önce birleşim kodu mu kontrol et, değilse profil varyantlarını ara
-        base_code_pattern = r'\b([LG][LR]R?-?\d{2,4})\b(?!-\d)'  # LR3101, GLR64 (ama LR3101-1 değil)
-        base_match = re.search(base_code_pattern, query_upper)
-        
-        if base_match:
-            base_code = base_match.group(1)
-            # Tire ekle: LR3101 → LR-3101
-            if not '-' in base_code:
-                if base_code.startswith('GLR') and len(base_code) == 7:
-                    # GLR6405 → GLR64-05
-                    base_code = f"{base_code[:5]}-{base_code[5:]}"
-                elif base_code.startswith(('LR', 'GL')):
-                    # LR3101 → LR-3101
-                    prefix = base_code[:2]
-                    numbers = base_code[2:]
-                    base_code = f"{prefix}-{numbers}"
-            
+        # Özel durum: suffix'siz kod - önce birleşim kodu mu kontrol et, değilse profil varyantlarını ara
+        if base_code:
             logger.info(f"Base kod bulundu: {base_code}, önce birleşim kodu mu kontrol ediliyor...")
             
             # ÖNCE birleşim kodu mu kontrol et
             from services.connection_service import connection_service
-            all_systems = connection_service.get_all_systems()
-            
-            for system in all_systems:
-                for profile in system.get('profiles', []):
-                    if profile.get('connection_code') == base_code:
-                        # Bu bir birleşim kodu! Profil araması yapma, None döndür
-                        # Böylece birleşim kodu araması çalışacak
-                        logger.info(f"{base_code} bir birleşim kodu, profil araması yapılmıyor")
-                        return None
+            if connection_service.find_connection(base_code) is not None:
+                # Bu bir birleşim kodu! Profil araması yapma, None döndür
+                # Böylece birleşim kodu araması çalışacak
+                logger.info(f"{base_code} bir birleşim kodu, profil araması yapılmıyor")
+                return None
             
             logger.info(f"{base_code} birleşim kodu değil, profil varyantları aranıyor...")
             
-            # Tüm profilleri al ve bu base code ile başlayanları bul
-            all_profiles = catalog_service.get_all_profiles()
-            matching_profiles = []
-            
-            for prof in all_profiles:
-                prof_code = prof.get('code', '')
-                # LR-3101-1, LR-3101-2 gibi kodları bul
-                if prof_code.startswith(base_code):
-                    matching_profiles.append(prof)
-            
-            # Eğer catalog'da bulunamadıysa, tire olmadan da dene
-            if not matching_profiles:
-                # LR-3101 → LR3101 (tire kaldır)
-                base_code_no_dash = base_code.replace('-', '')
-                for prof in all_profiles:
-                    prof_code = prof.get('code', '')
-                    if prof_code.startswith(base_code_no_dash):
-                        matching_profiles.append(prof)
+            # Bu base code ile başlayanları bul (LR-3101 -> LR3101-1, LR3101-2, LR-3101-3 ...)
+            # Önek aramasında tire/boşluk önemsiz, tüm yazımlar tek seferde gelir
+            matching_profiles = catalog_service.get_profiles_by_code_prefix(base_code)
             
             if matching_profiles:
                 logger.info(f"{len(matching_profiles)} varyant bulundu")
@@ -1423,20 +1152,17 @@ class RAGService:
                 return "\n".join(answer_parts)
         
         # Normal profil kodu araması (LR3101-1, AP0028 gibi)
-        for pattern in patterns:
-            match = re.search(pattern, query_upper)
-            if match:
-                profile_code = match.group(1)
-                logger.info(f"Profil kodu bulundu: {profile_code}")
-                
-                # Katalog servisinden profili ara
-                profile = catalog_service.get_profile_by_no(profile_code)
-                
-                if profile:
-                    logger.info(f"Profil bulundu: {profile_code}")
-                    return self._format_single_profile(profile)
-                else:
-                    logger.info(f"Profil bulunamadı: {profile_code}")
+        for profile_code in parsed.catalog_codes:
+            logger.info(f"Profil kodu bulundu: {profile_code}")
+            
+            # Katalog servisinden profili ara
+            profile = catalog_service.get_profile_by_no(profile_code)
+            
+            if profile:
+                logger.info(f"Profil bulundu: {profile_code}")
+                return self._format_single_profile(profile)
+            else:
+                logger.info(f"Profil bulunamadı: {profile_code}")
         
         return None
     
@@ -1474,27 +1200,13 @@ class RAGService:
         if system_name:
             answer_parts.append(f"**Sistem:** {system_name}")
         
-        # Bu profilin hangi birleşimlerde kullanıldığını bul
+        # Bu profilin hangi birleşimlerde kullanıldığını bul (profil kodu -> birleşim ters indeksi)
         try:
             from services.connection_service import connection_service
-            all_systems = connection_service.get_all_systems()
-            used_in_connections = []
-            
-            logger.info(f"Checking {code} in {len(all_systems)} systems")
-            
-            # Normalize code: LR3101-1 → LR-3101-1
-            normalized_code = self._normalize_profile_code(code)
-            logger.info(f"Normalized code: {code} → {normalized_code}")
-            
-            for sys in all_systems:
-                for prof in sys.get('profiles', []):
-                    if (prof.get('inner_profile') == normalized_code or 
-                        prof.get('middle_profile') == normalized_code or 
-                        prof.get('outer_profile') == normalized_code):
-                        used_in_connections.append({
-                            'connection_code': prof.get('connection_code'),
-                            'name': prof.get('name')
-                        })
+            used_in_connections = [
+                {'connection_code': usage.connection_code, 'name': usage.name}
+                for usage in connection_service.get_profile_usages(code)
+            ]
             
             logger.info(f"Found {len(used_in_connections)} connections for {code}")
             
@@ -1712,22 +1424,9 @@ class RAGService:
         """
         from services.catalog_service import catalog_service
         
-        # Tüm profilleri al
-        all_profiles = catalog_service.get_all_profiles()
-        
-        # Her kategoride de bulunan profilleri filtrele
-        matching_profiles = []
-        
-        for profile in all_profiles:
-            profile_categories = profile.get('categories', [])
-            
-            # Profil tüm aranan kategorilerde var mı?
-            # Büyük/küçük harf duyarsız karşılaştırma
-            profile_cats_upper = [c.upper() for c in profile_categories]
-            search_cats_upper = [c.upper() for c in categories]
-            
-            if all(cat in profile_cats_upper for cat in search_cats_upper):
-                matching_profiles.append(profile)
+        # Her kategoride de bulunan profiller: kategori bitset'lerinin kesişimi
+        # (büyük/küçük harf duyarsız)
+        matching_profiles = catalog_service.find_profiles(categories=categories)
         
         logger.info(f"Kategori kombinasyonu sonucu: {len(matching_profiles)} profil")
         return matching_profiles
@@ -1763,9 +1462,7 @@ class RAGService:
         logger.info(f"Formatting answer with LLM: query='{query[:50]}...'")
         
         # 0. Yakın değer araması kontrolü (EN ÖNCE!)
-        import re
-        range_match = re.match(r'^(\d+)(?:\s+\w+)?$', query.strip())
-        if range_match and previous_query:
+        if parse_query(query).range_value is not None and previous_query:
             logger.info(f"Nearby search detected: {query} (previous: {previous_query})")
             # format_direct_answer'ı çağır, o zaten yakın değer aramasını yapacak
             fallback_answer = self.format_direct_answer(query, top_k, previous_query=previous_query)
@@ -0,0 +1,155 @@
+"""
+Response cache - Katalog endpoint'leri için önceden encode edilmiş JSON
+
+Kategori gezinme en sık yapılan frontend çağrısı. Her istekte to_dict() ve
+JSON encode yapmak yerine cevap orjson ile bir kez byte'a çevrilir ve
+(istek anahtarı → bytes) olarak saklanır. Cache veri nesline bağlıdır:
+katalog yenilenip data_generation değişince girişler düşer. Kapsamı (scope)
+verilen girişler advance() ile diff'ten etkilenmedikleri sürece yeni nesle
+taşınır.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Veri nesline bağlı, boyut sınırlı (LRU) JSON byte cache'i"""
+    
+    def __init__(self, name: str, max_entries: int = 1024):
+        """
+        Initialize response cache
+        
+        Args:
+            name: Cache adı (log ve istatistik için)
+            max_entries: Maksimum giriş sayısı (kullanıcı girdili anahtarlar için sınır)
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self._generation: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        # Anahtar -> cevabın bağlı olduğu veri kapsamı (None: tüm veri)
+        self._scopes: Dict[Hashable, Hashable] = {}
+        self._lock = threading.Lock()
+        
+        # Metrikler
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.carried = 0
+    
+    def get_or_build(
+        self,
+        generation: int,
+        key: Hashable,
+        builder: Callable[[], Any],
+        scope: Optional[Hashable] = None
+    ) -> bytes:
+        """
+        Encode edilmiş cevabı getir, yoksa oluşturup sakla
+        
+        Args:
+            generation: Verinin mevcut nesli (değiştiyse cache temizlenir)
+            key: İstek anahtarı
+            builder: Cevap gövdesini (dict/list) üreten fonksiyon
+            scope: Cevabın bağlı olduğu veri kapsamı (advance() için);
+                   None ise cevap tüm veriye bağlıdır
+        
+        Returns:
+            JSON byte'ları
+        """
+        with self._lock:
+            if self._generation is None or generation > self._generation:
+                self._reset(generation)
+            
+            # Eski nesle ait istek (advance() ile nesil ilerlemiş) cache'e dokunmaz
+            body = self._entries.get(key) if generation == self._generation else None
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+        
+        # Lock dışında üret - yavaş bir build diğer anahtarları bekletmesin
+        self.misses += 1
+        body = orjson.dumps(builder())
+        
+        with self._lock:
+            # Build sırasında veri yenilendiyse eski nesle ait cevabı saklama
+            if generation == self._generation:
+                self._entries[key] = body
+                self._scopes[key] = scope
+                if len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._scopes.pop(evicted, None)
+        
+        return body
+    
+    def _reset(self, generation: int) -> None:
+        """Tüm girişleri düşür ve nesli ayarla (lock altında çağrılır)"""
+        if self._entries:
+            self.invalidations += 1
+            logger.info(f"Response cache '{self.name}' temizlendi (nesil {self._generation} -> {generation})")
+        self._entries.clear()
+        self._scopes.clear()
+        self._generation = generation
+    
+    def advance(self, previous: int, generation: int, is_stale: Callable[[Hashable], bool]) -> None:
+        """
+        Yeni nesle geç; diff'ten etkilenmeyen girişleri koru
+        
+        Yeni durum yayınlanmadan hemen önce çağrılır. Kapsamı None olan
+        (tüm veriye bağlı) ve kapsamı is_stale() ile etkilenmiş girişler düşer.
+        
+        Args:
+            previous: Girişlerin üretildiği (şu anki) veri nesli
+            generation: Yayınlanacak veri nesli
+            is_stale: Kapsam -> diff'ten etkilendi mi
+        """
+        with self._lock:
+            if self._generation != previous:
+                self._reset(generation)
+                return
+            
+            dropped = [
+                key for key, scope in self._scopes.items()
+                if scope is None or is_stale(scope)
+            ]
+            for key in dropped:
+                del self._entries[key]
+                del self._scopes[key]
+            
+            self.carried += len(self._entries)
+            self._generation = generation
+            logger.info(
+                f"Response cache '{self.name}' nesil {previous} -> {generation}: "
+                f"{len(dropped)} giriş düştü, {len(self._entries)} giriş taşındı"
+            )
+    
+    def clear(self) -> None:
+        """Tüm girişleri temizle"""
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._generation = None
+    
+    def get_stats(self) -> Dict:
+        """İstatistikleri getir"""
+        return {
+            'name': self.name,
+            'generation': self._generation,
+            'entries': len(self._entries),
+            'bytes': sum(len(body) for body in self._entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'carried': self.carried
+        }
+
+
+# Global instance
+catalog_response_cache = ResponseCache("catalog")
@@ -1,56 +1,25 @@
-import re
 from typing import List, Tuple, Optional
 import logging
 
+import numpy as np
+
 from models.profile import Profile
 from services.excel_service import excel_service
 from services.embedding_service import embedding_service
+from utils.query_parser import parse_query
 
 logger = logging.getLogger(__name__)
 
-
-def matches_category_filter(profile_category: str, category_filter: str) -> bool:
-    """
-    Kategori filtresinin profile kategorisiyle eşleşip eşleşmediğini kontrol et
-    Kelime sınırı kontrolü yapar - "T" "STANDART" içinde geçmez
-    """
-    if not category_filter:
-        return True
-    
-    # Kategoriyi kelimelere ayır
-    category_words = profile_category.split()
-    return category_filter in category_words
+# Ölçü eşleşme toleransı (mm) - abs(v - x) < DIMENSION_TOLERANCE
+DIMENSION_TOLERANCE = 0.1
 
 
 def get_category_filter(query_lower: str) -> Optional[str]:
     """
     Sorgudan kategori filtresini çıkar
-    Öncelik sırasına dikkat! (uzun kelimeler önce)
+    Öncelik sırasına dikkat! (uzun kelimeler önce) - kurallar query_parser'da
     """
-    import re
-    
-    if 'köşebent' in query_lower or 'kosebent' in query_lower:
-        return 'KÖŞEBENT'
-    elif 't profil' in query_lower or 't tipi' in query_lower:
-        return 'T'
-    elif 'u profil' in query_lower or 'u tipi' in query_lower:
-        return 'U'
-    elif 'kutu' in query_lower:
-        return 'KUTU'
-    elif 'lama' in query_lower:
-        return 'LAMA'
-    
-    # Tek harf kontrolü - sorgunun sonunda tek harf varsa
-    # Örn: "50 ye 50 t", "30 a 30 u", "40x40 l"
-    words = query_lower.strip().split()
-    if len(words) > 0:
-        last_word = words[-1].strip()
-        # Son kelime tek harfse ve şekilsel kategori harfiyse
-        if len(last_word) == 1 and last_word.upper() in ['T', 'U', 'L', 'C', 'H', 'V', 'S', 'F', 'D', 'M', 'K', 'R', 'E']:
-            logger.info(f"Tek harf kategori bulundu (son kelime): {last_word.upper()}")
-            return last_word.upper()
-    
-    return None
+    return parse_query(query_lower).category_filter
 
 
 class SearchService:
@@ -82,8 +51,7 @@ class SearchService:
             return code_results[:top_k]
         
         # 3. Kategori araması dene (sadece ölçü belirtilmemişse)
-        has_dimension = bool(re.search(r'\d+', query))
-        if not has_dimension:
+        if not parse_query(query).dimensions.has_digit:
             category_results = self._search_by_category(query)
             if category_results:
                 logger.info(f"Kategori bazlı arama: {len(category_results)} sonuç")
@@ -103,145 +71,108 @@ class SearchService:
         return [(p, score, "Benzerlik araması") for p, score in emb_results]
     
     def _search_by_dimensions(self, query: str) -> List[Tuple[Profile, float, str]]:
-        """Ölçü bazlı arama"""
-        query_lower = query.lower()
+        """
+        Ölçü bazlı arama
+        
+        Profil listesini taramak yerine ilk ölçü koşulu excel_service'in ölçü
+        matrisinde ikili aramayla aday pozisyonlara indirilir, kalan koşullar
+        sadece bu adaylar üzerinde mask olarak uygulanır; sonuçlar profil
+        sırasıyla döner.
+        """
+        parsed = parse_query(query)
+        dimensions = parsed.dimensions
+        category_filter = parsed.category_filter
         results = []
         
+        # Refresh sırasında tutarlı kalmak için tek bir durum nesnesi kullan
+        state = excel_service.state
+        profiles = state.profiles
+        matrix = state.dimension_matrix
+        
         # Çap araması (boru profilleri için)
-        cap_match = re.search(r'(?:çap|cap|ø)\s*(\d+(?:\.\d+)?)', query_lower)
-        if cap_match:
-            cap_value = float(cap_match.group(1))
+        if dimensions.cap is not None:
+            cap_value = dimensions.cap
             logger.info(f"Çap araması: Ø={cap_value}")
             
-            for profile in excel_service.get_profiles():
-                if 'Ø' in profile.dimensions:
-                    if abs(profile.dimensions['Ø'] - cap_value) < 0.1:
-                        reason = f"Çap: {profile.dimensions['Ø']}mm"
-                        results.append((profile, 1.0, reason))
+            for position in matrix.near_positions('Ø', cap_value, DIMENSION_TOLERANCE).tolist():
+                profile = profiles[position]
+                reason = f"Çap: {profile.dimensions['Ø']}mm"
+                results.append((profile, 1.0, reason))
         
         # AxB formatı (30x30, 40x50 gibi)
-        axb_match = re.search(r'(\d+(?:\.\d+)?)\s*[xX×]\s*(\d+(?:\.\d+)?)', query_lower)
-        if axb_match:
-            a_value = float(axb_match.group(1))
-            b_value = float(axb_match.group(2))
-            logger.info(f"AxB araması: A={a_value}, B={b_value}")
-            
-            category_filter = get_category_filter(query_lower)
-            logger.info(f"Kategori filtresi: {category_filter}")
-            
-            for profile in excel_service.get_profiles():
-                if not matches_category_filter(profile.category, category_filter):
-                    continue
-                
-                if 'A' in profile.dimensions and 'B' in profile.dimensions:
-                    a_diff = abs(profile.dimensions['A'] - a_value)
-                    b_diff = abs(profile.dimensions['B'] - b_value)
-                    
-                    if a_diff < 0.1 and b_diff < 0.1:
-                        reason = f"Ölçü: {profile.dimensions['A']}x{profile.dimensions['B']}mm"
-                        if 'K' in profile.dimensions:
-                            reason += f", Kalınlık: {profile.dimensions['K']}mm"
-                        results.append((profile, 1.0, reason))
-        
-        # "A a B", "A ye B", "A e B" formatı (30 a 30, 20 ye 20, 40 e 50 gibi)
-        # Tüm bağlaçları destekle: a, ye, e, ya
-        aab_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:[aA]|ye|YE|[eE]|ya|YA)\s*(\d+(?:\.\d+)?)', query_lower)
-        aab_search_attempted = False  # Flag to prevent single number search
-        
-        if aab_match and not axb_match:
-            aab_search_attempted = True  # Mark that we attempted AxB search
-            a_value = float(aab_match.group(1))
-            b_value = float(aab_match.group(2))
-            logger.info(f"A [bağlaç] B araması: A={a_value}, B={b_value}")
-            
-            category_filter = get_category_filter(query_lower)
+        # "A a B", "A ye B", "A e B" formatı (30 a 30, 20 ye 20, 40 e 50 gibi) sadece AxB yoksa
+        size = dimensions.axb or dimensions.a_and_b
+        if size:
+            a_value, b_value = size
+            if dimensions.axb:
+                logger.info(f"AxB araması: A={a_value}, B={b_value}")
+            else:
+                logger.info(f"A [bağlaç] B araması: A={a_value}, B={b_value}")
             logger.info(f"Kategori filtresi: {category_filter}")
             
-            for profile in excel_service.get_profiles():
-                if not matches_category_filter(profile.category, category_filter):
-                    continue
-                
-                if 'A' in profile.dimensions and 'B' in profile.dimensions:
-                    a_diff = abs(profile.dimensions['A'] - a_value)
-                    b_diff = abs(profile.dimensions['B'] - b_value)
-                    
-                    if a_diff < 0.1 and b_diff < 0.1:
-                        reason = f"Ölçü: {profile.dimensions['A']}x{profile.dimensions['B']}mm"
-                        if 'K' in profile.dimensions:
-                            reason += f", Kalınlık: {profile.dimensions['K']}mm"
-                        results.append((profile, 1.0, reason))
+            positions = matrix.near_positions('A', a_value, DIMENSION_TOLERANCE)
+            positions = positions[
+                matrix.category_mask(category_filter, positions)
+                & matrix.near('B', b_value, DIMENSION_TOLERANCE, positions)
+            ]
+            for position in positions.tolist():
+                results.append(self._size_match(profiles[position]))
         
         # Kalınlık araması (kategori ile birlikte veya tek başına)
         # Desteklenen formatlar:
         # - "3 mm kalınlık", "kalınlık 3", "et kalınlığı 3 mm"
         # - "kalınlığı 2 milimetre olan", "kalınlığı 2mm olan"
         # - "2 milimetre kalınlıkta", "2mm kalınlık"
-        
-        # Format 1: "kalınlığı X milimetre/mm olan"
-        kalinlik_match = re.search(r'(?:kalınlığı|kalinligi)\s*(\d+(?:\.\d+)?)\s*(?:mm|milimetre|milim)?\s*(?:olan)?', query_lower)
-        
-        # Format 2: "X mm/milimetre kalınlık/kalınlıkta"
-        if not kalinlik_match:
-            kalinlik_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:mm|milimetre|milim)?\s*(?:kalınlık|kalinlik|kalınlıkta|kalinlikta)', query_lower)
-        
-        # Format 3: "kalınlık X" veya "et kalınlığı X"
-        if not kalinlik_match:
-            kalinlik_match = re.search(r'(?:kalınlık|kalinlik|et kalınlığı|et kalinligi)\s*(\d+(?:\.\d+)?)', query_lower)
-        if kalinlik_match and not results:
-            k_value = float(kalinlik_match.group(1))
-            
-            # Kategori filtresi var mı kontrol et
-            category_filter = get_category_filter(query_lower)
+        if dimensions.thickness is not None and not results:
+            k_value = dimensions.thickness
             
             if category_filter:
                 logger.info(f"Kalınlık + Kategori araması: K={k_value}, Kategori={category_filter}")
             else:
                 logger.info(f"Kalınlık araması: K={k_value}")
             
-            for profile in excel_service.get_profiles():
-                # Kategori filtresi varsa kontrol et
-                if not matches_category_filter(profile.category, category_filter):
-                    continue
-                
-                if 'K' in profile.dimensions:
-                    if abs(profile.dimensions['K'] - k_value) < 0.1:
-                        dims_str = ", ".join([f"{k}={v}mm" for k, v in profile.dimensions.items()])
-                        if category_filter:
-                            reason = f"Kalınlık: {profile.dimensions['K']}mm ({dims_str})"
-                        else:
-                            reason = f"Kalınlık: {profile.dimensions['K']}mm ({dims_str})"
-                        results.append((profile, 1.0, reason))
+            # Kategori filtresi yoksa mask tüm adayları kapsar
+            positions = matrix.near_positions('K', k_value, DIMENSION_TOLERANCE)
+            positions = positions[matrix.category_mask(category_filter, positions)]
+            for position in positions.tolist():
+                profile = profiles[position]
+                dims_str = ", ".join([f"{k}={v}mm" for k, v in profile.dimensions.items()])
+                reason = f"Kalınlık: {profile.dimensions['K']}mm ({dims_str})"
+                results.append((profile, 1.0, reason))
         
         # Tek sayı (örn: "30 profil", "40 kutu")
         # SADECE AxB araması yapılmadıysa çalıştır
-        single_num_match = re.search(r'\b(\d+(?:\.\d+)?)\b', query_lower)
-        if single_num_match and not results and not aab_search_attempted and not axb_match:
-            value = float(single_num_match.group(1))
-            category_filter = get_category_filter(query_lower)
+        if dimensions.single_number is not None and not results and not size:
+            value = dimensions.single_number
             
             if category_filter:
                 logger.info(f"{category_filter} profil araması: A veya B = {value}")
                 
-                for profile in excel_service.get_profiles():
-                    if not matches_category_filter(profile.category, category_filter):
-                        continue
-                    
-                    if 'A' in profile.dimensions and 'B' in profile.dimensions:
-                        # A veya B değerlerinden herhangi birinde eşleşme varsa
-                        a_match = abs(profile.dimensions['A'] - value) < 0.1
-                        b_match = abs(profile.dimensions['B'] - value) < 0.1
-                        
-                        if a_match or b_match:
-                            reason = f"Ölçü: {profile.dimensions['A']}x{profile.dimensions['B']}mm"
-                            if 'K' in profile.dimensions:
-                                reason += f", Kalınlık: {profile.dimensions['K']}mm"
-                            results.append((profile, 1.0, reason))
+                # A ve B'si olan, A veya B değerlerinden herhangi birinde eşleşme olanlar
+                positions = np.union1d(
+                    matrix.near_positions('A', value, DIMENSION_TOLERANCE),
+                    matrix.near_positions('B', value, DIMENSION_TOLERANCE)
+                )
+                positions = positions[
+                    matrix.category_mask(category_filter, positions)
+                    & matrix.has('A', positions) & matrix.has('B', positions)
+                ]
+                for position in positions.tolist():
+                    results.append(self._size_match(profiles[position]))
         
         return results
     
+    @staticmethod
+    def _size_match(profile: Profile) -> Tuple[Profile, float, str]:
+        """AxB eşleşmesi için sonuç tuple'ı"""
+        reason = f"Ölçü: {profile.dimensions['A']}x{profile.dimensions['B']}mm"
+        if 'K' in profile.dimensions:
+            reason += f", Kalınlık: {profile.dimensions['K']}mm"
+        return (profile, 1.0, reason)
+    
     def _search_by_code(self, query: str) -> List[Tuple[Profile, float, str]]:
         """Profil kodu ile arama"""
-        code_matches = re.findall(r'\b(AP\d+)\b', query.upper())
+        code_matches = parse_query(query).ap_codes
         
         if not code_matches:
             return []
@@ -271,13 +202,18 @@ class SearchService:
             'pervaz': 'SEKTÖREL PERVAZ'
         }
         
+        # Kategori eşleşmesi profil listesi yerine matrisin kategori kodları üzerinden
+        state = excel_service.state
+        matrix = state.dimension_matrix
+        
         for keyword, category in category_map.items():
             if keyword in query_lower:
-                profiles = excel_service.get_profiles_by_category(category)
-                if profiles:
+                positions = matrix.positions(matrix.category_contains(category))
+                if positions:
                     results = []
                     # Return all profiles (will be limited by top_k in search())
-                    for profile in profiles:
+                    for position in positions:
+                        profile = state.profiles[position]
                         dims_str = ", ".join([f"{k}={v}mm" for k, v in profile.dimensions.items()])
                         reason = f"{category} ({dims_str})"
                         results.append((profile, 0.9, reason))
@@ -2,7 +2,8 @@
 import logging
 import aiohttp
 from typing import List, Dict, Optional, Any
-import re
+
+from utils.query_parser import find_similarity_code, parse_query
 
 logger = logging.getLogger(__name__)
 
@@ -119,61 +120,32 @@ class SimilarityService:
             }
             veya None
         """
-        message_lower = message.lower()
-        
-        # Benzerlik ile ilgili anahtar kelimeler
-        similarity_keywords = ['benzer', 'benzeri', 'benzerleri', 'benzeyen', 'gibi', 'similar', 'like', 'benzer profil']
+        parsed = parse_query(message)
         
-        # Mesajda benzerlik anahtar kelimesi var mı?
-        if not any(keyword in message_lower for keyword in similarity_keywords):
+        # Mesajda benzerlik anahtar kelimesi var mı? (benzer, benzeri, gibi, similar...)
+        if not parsed.is_similarity:
             return None
         
-        # Profil kodunu bul
-        # Paternler: LR3104, LR-3104, GL3100, A 3703, AP0001 vb.
-        patterns = [
-            r'(LR[\s-]?\d{4}(?:-\d+)?)',  # LR3104, LR-3104, LR 3104-1
-            r'(GL[\s-]?\d{4}(?:-\d+)?)',  # GL3100, GL-3100
-            r'(A\s+\d{4})',                # A 3703
-            r'(AP\d{4})',                  # AP0001
-            r'([A-Z]{2,}\d{4})',           # Genel: BEYMETAL3104 gibi
-            r'([A-Z]+[\s-]?\d{3,4}(?:-\d+)?)'  # Genel pattern
-        ]
-        
-        profile_code = None
-        for pattern in patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                profile_code = match.group(1)
-                break
+        # Profil kodu: LR3104, LR-3104, GL3100, A 3703, AP0001 vb.
+        profile_code = parsed.similarity_code
         
         # Mesajda profil kodu bulunamadıysa, conversation history'den bul
         if not profile_code and conversation_history:
             # Son birkaç mesajı kontrol et (user ve assistant)
             for msg in reversed(conversation_history[-10:]):  # Son 10 mesaj
-                content = msg.get('content', '')
-                for pattern in patterns:
-                    match = re.search(pattern, content, re.IGNORECASE)
-                    if match:
-                        profile_code = match.group(1)
-                        logger.info(f"Profil kodu conversation history'den bulundu: {profile_code}")
-                        break
+                profile_code = find_similarity_code(msg.get('content', ''))
                 if profile_code:
+                    logger.info(f"Profil kodu conversation history'den bulundu: {profile_code}")
                     break
         
         if not profile_code:
             logger.warning(f"Benzerlik isteği algılandı ama profil kodu bulunamadı: {message}")
             return None
         
-        # Sayı bul (kaç tane benzer gösterilecek)
-        count = 30  # Varsayılan
-        number_match = re.search(r'\b(\d+)\s*(?:tane|adet|benzer|benzeri)?\b', message_lower)
-        if number_match:
-            count = min(int(number_match.group(1)), 100)  # Max 100 ile sınırla
-        
         return {
             "type": "similarity",
             "profile_code": profile_code,
-            "count": count
+            "count": parsed.similarity_count  # Kaç tane benzer gösterilecek (varsayılan 30, max 100)
         }
     
     def format_similarity_response(self, data: Dict) -> str:
@@ -0,0 +1,190 @@
+"""
+Snapshot servisi - Türetilmiş backend durumunu diske yazar (warm start)
+
+Soğuk başlangıçta üç Excel indirilip parse ediliyor, kategoriler gruplanıyor
+ve TF-IDF yeniden fit ediliyor. Bu servis tüm bu türetilmiş durumu tek bir
+versiyonlu dosyada saklar. Dosya, kaynak Excel'lerin hash'leri ile
+anahtarlanır; açılışta cache'deki Excel'lerin hash'leri eşleşiyorsa durum
+doğrudan yüklenir, ardından kaynaklar arka planda doğrulanır.
+"""
+import os
+import pickle
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils.fingerprint import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+# Snapshot formatı değiştiğinde (servis state yapısı, model sınıfları) artır
+SNAPSHOT_VERSION = 3
+
+
+class SnapshotService:
+    """Warm start snapshot yönetimi"""
+    
+    def __init__(self):
+        self.snapshot_path = Path(settings.snapshot_path)
+        self.last_saved: Optional[datetime] = None
+        self.last_loaded: Optional[datetime] = None
+        
+        # Son kaydedilen/yüklenen durumun veri nesilleri (gereksiz yazmayı önler)
+        self._saved_generations: Optional[Tuple[int, int, int]] = None
+    
+    def _services(self):
+        """Snapshot'a giren servisler (döngüsel import'u önlemek için geç import)"""
+        from services.excel_service import excel_service
+        from services.catalog_service import catalog_service
+        from services.connection_service import connection_service
+        from services.embedding_service import embedding_service
+        return excel_service, catalog_service, connection_service, embedding_service
+    
+    def _current_generations(self) -> Tuple[int, int, int]:
+        excel_service, catalog_service, connection_service, _ = self._services()
+        return (
+            excel_service.data_generation,
+            catalog_service.data_generation,
+            connection_service.data_generation
+        )
+    
+    def compute_source_hashes(self) -> Dict[str, Optional[str]]:
+        """
+        Cache'deki kaynak Excel dosyalarının hash'lerini hesapla
+        
+        Returns:
+            {'standard': hash, 'catalog': hash, 'connections': hash}
+        """
+        excel_service, catalog_service, connection_service, _ = self._services()
+        return {
+            'standard': compute_file_hash(excel_service.cache_path),
+            'catalog': compute_file_hash(catalog_service.catalog_file),
+            'connections': compute_file_hash(connection_service.cache_file)
+        }
+    
+    def load(self) -> bool:
+        """
+        Snapshot'ı yükle ve servislere dağıt
+        
+        Sadece versiyon ve kaynak hash'leri eşleşirse yüklenir.
+        
+        Returns:
+            Yüklendiyse True
+        """
+        if not self.snapshot_path.exists():
+            logger.info("Snapshot bulunamadı, soğuk başlangıç yapılacak")
+            return False
+        
+        start_time = time.perf_counter()
+        
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+            
+            if snapshot.get('version') != SNAPSHOT_VERSION:
+                logger.info(f"Snapshot versiyonu uyumsuz ({snapshot.get('version')} != {SNAPSHOT_VERSION}), atlanıyor")
+                return False
+            
+            source_hashes = self.compute_source_hashes()
+            if None in source_hashes.values() or snapshot.get('source_hashes') != source_hashes:
+                logger.info("Snapshot kaynak hash'leri cache ile eşleşmiyor, atlanıyor")
+                return False
+            
+            excel_service, catalog_service, connection_service, embedding_service = self._services()
+            excel_service.restore_state(snapshot['excel'])
+            catalog_service.restore_state(snapshot['catalog'])
+            connection_service.restore_state(snapshot['connections'])
+            embedding_service.restore_state(snapshot['embeddings'])
+            
+            self._saved_generations = self._current_generations()
+            self.last_loaded = datetime.now()
+            
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(f"Snapshot yüklendi: {self.snapshot_path} ({elapsed_ms:.0f} ms, oluşturma: {snapshot.get('created_at')})")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Snapshot yükleme hatası: {e}")
+            return False
+    
+    def save(self) -> bool:
+        """
+        Servislerin mevcut durumunu snapshot olarak kaydet (atomik yazma)
+        
+        Returns:
+            Başarılı ise True
+        """
+        excel_service, catalog_service, connection_service, embedding_service = self._services()
+        
+        if not (excel_service.profiles and catalog_service.is_ready and embedding_service.is_ready):
+            logger.warning("Servisler hazır değil, snapshot kaydedilmedi")
+            return False
+        
+        if connection_service.source_hash is None:
+            logger.warning("Connection verisi yok, snapshot kaydedilmedi")
+            return False
+        
+        start_time = time.perf_counter()
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        
+        try:
+            snapshot = {
+                'version': SNAPSHOT_VERSION,
+                'created_at': datetime.now().isoformat(),
+                'source_hashes': {
+                    'standard': excel_service.source_hash,
+                    'catalog': catalog_service.source_hash,
+                    'connections': connection_service.source_hash
+                },
+                'excel': excel_service.export_state(),
+                'catalog': catalog_service.export_state(),
+                'connections': connection_service.export_state(),
+                'embeddings': embedding_service.export_state()
+            }
+            
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+            
+            self._saved_generations = self._current_generations()
+            self.last_saved = datetime.now()
+            
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(f"Snapshot kaydedildi: {self.snapshot_path} ({elapsed_ms:.0f} ms)")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Snapshot kaydetme hatası: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+    
+    def save_if_changed(self) -> bool:
+        """
+        Veri nesillerinden biri son kayıttan beri değiştiyse snapshot'ı yenile
+        
+        Returns:
+            Kaydedildiyse True
+        """
+        if self._saved_generations == self._current_generations():
+            logger.debug("Snapshot güncel, kayıt atlandı")
+            return False
+        return self.save()
+    
+    def get_stats(self) -> Dict:
+        """İstatistikleri getir"""
+        return {
+            'snapshot_path': str(self.snapshot_path),
+            'snapshot_exists': self.snapshot_path.exists(),
+            'version': SNAPSHOT_VERSION,
+            'last_saved': self.last_saved.isoformat() if self.last_saved else None,
+            'last_loaded': self.last_loaded.isoformat() if self.last_loaded else None
+        }
+
+
+# Global instance
+snapshot_service = SnapshotService()
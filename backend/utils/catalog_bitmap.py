@@ -0,0 +1,291 @@
+"""
+Katalog bitmap indeksi
+Her kategori, şirket, standart bayrağı ve kalıp durumu için katalog
+pozisyonlarının bitset'ini (numpy packbits) tutar; kombinasyon, filtre ve
+sayım sorguları birkaç yüz baytlık bitwise AND/OR işlemleridir. Facet
+sayımları tüm bitset'leri içeren matris üzerinde tek adımda hesaplanır.
+Katalog diff'i sadece değişen profillerin bitlerini yazar.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.catalog_parser import CatalogProfile
+
+
+# Bayt -> set bit sayısı (popcount tablosu)
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int32)
+
+
+def _pack(positions: List[int], size: int) -> np.ndarray:
+    """Pozisyon listesini bitset'e çevir"""
+    mask = np.zeros(size, dtype=bool)
+    mask[positions] = True
+    return np.packbits(mask)
+
+
+class CatalogBitmapIndex:
+    """
+    Katalog facet bitset'leri
+    
+    Bitset'ler profil listesi sırasıyla kurulur (bit i = profiles[i]); veri
+    nesli başına bir kez kurulur, sonra değiştirilmez. Kategori bitset'leri
+    hem birebir ad hem de büyük harfe çevrilmiş ad ile tutulur; mask()
+    büyük/küçük harf duyarsız eşleşir.
+    """
+    
+    def __init__(self, profiles: List[CatalogProfile]):
+        """
+        Args:
+            profiles: Katalog profilleri (pozisyonlar bu listeye göredir)
+        """
+        self.profiles = profiles
+        self.size = len(profiles)
+        
+        # Kategoriler ilk görülme sırasıyla (satır, sütun) - grouped_profiles ile aynı sıra
+        categories: Dict[str, List[int]] = {}
+        category_types: Dict[str, str] = {}
+        companies: Dict[str, List[int]] = {}
+        standard: List[int] = []
+        mold: List[int] = []
+        
+        for position, profile in enumerate(profiles):
+            for category, cat_type in zip(profile.categories, profile.category_types):
+                categories.setdefault(category, []).append(position)
+                category_types.setdefault(category, cat_type)
+            companies.setdefault(profile.company, []).append(position)
+            if profile.is_standard:
+                standard.append(position)
+            if profile.has_mold:
+                mold.append(position)
+        
+        self._load(
+            {key: _pack(positions, self.size) for key, positions in categories.items()},
+            {key: _pack(positions, self.size) for key, positions in companies.items()},
+            _pack(standard, self.size),
+            _pack(mold, self.size),
+            category_types
+        )
+    
+    def _load(
+        self,
+        categories: Dict[str, np.ndarray],
+        companies: Dict[str, np.ndarray],
+        standard: np.ndarray,
+        mold: np.ndarray,
+        category_types: Dict[str, str]
+    ) -> None:
+        """Bitset'lerden türetilen birleşik kategori, facet matrisi ve sayımları kur"""
+        self._categories = categories
+        self._categories_upper: Dict[str, np.ndarray] = {}
+        for category, bits in self._categories.items():
+            key = category.upper()
+            upper = self._categories_upper.get(key)
+            self._categories_upper[key] = bits if upper is None else upper | bits
+        self._companies = companies
+        self._standard = standard
+        self._mold = mold
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+        self._empty = np.zeros_like(self._all)
+        self._category_types = category_types
+        
+        # Facet matrisi: her satır bir facet değerinin bitset'i
+        self._facet_keys: List[Tuple[str, str]] = (
+            [('category', category) for category in self._categories]
+            + [('company', company) for company in self._companies]
+            + [('standard', 'standard'), ('mold', 'with_mold')]
+        )
+        self._facet_matrix = np.stack(
+            list(self._categories.values())
+            + list(self._companies.values())
+            + [self._standard, self._mold]
+        )
+        
+        # Filtresiz facet sayımları yüklemede bir kez hesaplanır
+        self._unfiltered = self._facets(self._all)
+    
+    def updated(
+        self,
+        profiles: List[CatalogProfile],
+        remap: np.ndarray,
+        added: List[int]
+    ) -> 'CatalogBitmapIndex':
+        """
+        Diff'i uygulanmış yeni indeks (bu indeks değiştirilmez)
+        
+        Kalan profillerin bitleri tek numpy atamasıyla yeni pozisyonlarına
+        taşınır; sadece eklenen/değişen profiller için bit yazılır. Kategori
+        ve şirket sırası tam kurulumdaki gibi ilk görülme sırasıdır.
+        
+        Args:
+            profiles: Yeni katalog profilleri
+            remap: Eski pozisyon -> yeni pozisyon (silinen/değişen: -1)
+            added: Eklenen/değişen profillerin yeni pozisyonları
+        
+        Returns:
+            Yeni indeks
+        """
+        size = len(profiles)
+        kept = np.flatnonzero(remap >= 0)
+        old = np.unpackbits(self._facet_matrix, axis=1, count=self.size).astype(bool)
+        matrix = np.zeros((len(self._facet_keys), size), dtype=bool)
+        matrix[:, remap[kept]] = old[:, kept]
+        
+        rows = {key: row for row, key in enumerate(self._facet_keys)}
+        extra: Dict[Tuple[str, str], np.ndarray] = {}
+        category_types = dict(self._category_types)
+        
+        def facet_row(key: Tuple[str, str]) -> np.ndarray:
+            row = rows.get(key)
+            if row is not None:
+                return matrix[row]
+            if key not in extra:
+                extra[key] = np.zeros(size, dtype=bool)
+            return extra[key]
+        
+        for position in added:
+            profile = profiles[position]
+            for category, cat_type in zip(profile.categories, profile.category_types):
+                facet_row(('category', category))[position] = True
+                category_types.setdefault(category, cat_type)
+            facet_row(('company', profile.company))[position] = True
+            if profile.is_standard:
+                matrix[rows[('standard', 'standard')]][position] = True
+            if profile.has_mold:
+                matrix[rows[('mold', 'with_mold')]][position] = True
+        
+        facets = [(key, matrix[row]) for key, row in rows.items()] + list(extra.items())
+        firsts = {key: int(np.argmax(bits)) for key, bits in facets if bits.any()}
+        
+        # İlk görülme sırası: kategoriler (satır, sütun), şirketler satır
+        categories = sorted(
+            (key[1] for key, _ in facets if key[0] == 'category' and key in firsts),
+            key=lambda category: (
+                firsts[('category', category)],
+                profiles[firsts[('category', category)]].categories.index(category)
+            )
+        )
+        companies = sorted(
+            (key[1] for key, _ in facets if key[0] == 'company' and key in firsts),
+            key=lambda company: firsts[('company', company)]
+        )
+        bits = dict(facets)
+        
+        index = CatalogBitmapIndex([])
+        index.profiles = profiles
+        index.size = size
+        index._load(
+            {category: np.packbits(bits[('category', category)]) for category in categories},
+            {company: np.packbits(bits[('company', company)]) for company in companies},
+            np.packbits(bits[('standard', 'standard')]),
+            np.packbits(bits[('mold', 'with_mold')]),
+            {category: category_types[category] for category in categories}
+        )
+        return index
+    
+    def mask(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        companies: Optional[Iterable[str]] = None,
+        standard: Optional[bool] = None,
+        has_mold: Optional[bool] = None
+    ) -> np.ndarray:
+        """
+        Facet filtresi bitset'i
+        
+        Args:
+            categories: Profilin hepsinde bulunduğu kategoriler (AND)
+            companies: Profilin şirketi bunlardan biri (OR)
+            standard: Standart bayrağı (None: filtre yok)
+            has_mold: Kalıp durumu (None: filtre yok)
+        
+        Returns:
+            Bitset (np.packbits formatında)
+        """
+        bits = self._all.copy()
+        
+        for category in categories or ():
+            np.bitwise_and(bits, self._categories_upper.get(category.upper(), self._empty), out=bits)
+        
+        if companies:
+            company_bits = self._empty.copy()
+            for company in companies:
+                np.bitwise_or(company_bits, self._companies.get(company, self._empty), out=company_bits)
+            np.bitwise_and(bits, company_bits, out=bits)
+        
+        if standard is not None:
+            np.bitwise_and(bits, self._standard if standard else ~self._standard, out=bits)
+        
+        if has_mold is not None:
+            np.bitwise_and(bits, self._mold if has_mold else ~self._mold, out=bits)
+        
+        return bits
+    
+    def category_bits(self, category: str) -> np.ndarray:
+        """Birebir kategori adının bitset'i (yoksa boş)"""
+        return self._categories.get(category, self._empty)
+    
+    def positions(self, bits: np.ndarray) -> List[int]:
+        """Bitset'teki profil pozisyonları (artan sırada)"""
+        return np.flatnonzero(np.unpackbits(bits, count=self.size)).tolist()
+    
+    def count(self, bits: np.ndarray) -> int:
+        """Bitset'teki profil sayısı"""
+        return int(_POPCOUNT[bits].sum())
+    
+    def facet_counts(self, bits: Optional[np.ndarray] = None) -> Dict:
+        """
+        Facet sayımları
+        
+        Args:
+            bits: Filtre bitset'i (mask() çıktısı); None ise tüm katalog
+                  (yüklemede hesaplanmış sonuç döner)
+        
+        Returns:
+            {
+                'total': int,
+                'categories': {'standard': {kategori: sayı}, 'shape': {...}, 'sector': {...}},
+                'companies': {şirket: sayı},
+                'standard': {'standard': sayı, 'custom': sayı},
+                'mold': {'with_mold': sayı, 'without_mold': sayı}
+            }
+            Sayısı 0 olan kategori ve şirketler listelenmez; sıra filtreden
+            bağımsız olarak katalogdaki ilk görülme sırasıdır.
+        """
+        if bits is None:
+            return self._unfiltered
+        return self._facets(bits)
+    
+    def _facets(self, bits: np.ndarray) -> Dict:
+        """Tüm facet bitset'lerini filtreyle AND'leyip tek adımda say"""
+        counts = _POPCOUNT[self._facet_matrix & bits].sum(axis=1).tolist()
+        total = self.count(bits)
+        
+        result = {
+            'total': total,
+            'categories': {'standard': {}, 'shape': {}, 'sector': {}},
+            'companies': {},
+            'standard': {},
+            'mold': {}
+        }
+        for (facet, value), count in zip(self._facet_keys, counts):
+            if facet == 'category':
+                if count:
+                    result['categories'].setdefault(self._category_types[value], {})[value] = count
+            elif facet == 'company':
+                if count:
+                    result['companies'][value] = count
+            elif facet == 'standard':
+                result['standard'] = {'standard': count, 'custom': total - count}
+            else:
+                result['mold'] = {'with_mold': count, 'without_mold': total - count}
+        return result
+    
+    def first(self, bits: np.ndarray) -> Optional[int]:
+        """Bitset'teki ilk profil pozisyonu (boşsa None)"""
+        nonzero = np.flatnonzero(bits)
+        if not len(nonzero):
+            return None
+        byte = int(nonzero[0])
+        # packbits büyük bit önce (MSB) yerleştirir
+        return byte * 8 + (8 - int(bits[byte]).bit_length())
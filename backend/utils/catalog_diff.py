@@ -0,0 +1,295 @@
+"""
+Katalog diff yardımcıları
+Yeni katalog satırlarını önceki sürümle profile_no bazında karşılaştırır ve
+sadece etkilenen profilleri / kategori gruplarını yeniden oluşturur;
+positions_delta() indekslerin güncellemesi için eski -> yeni pozisyon
+eşlemesini üretir
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from utils.catalog_parser import CatalogProfile, CatalogRow, build_profile, group_by_categories
+
+logger = logging.getLogger(__name__)
+
+# Satır anahtarı: (profile_no, aynı numaranın kaçıncı tekrarı)
+# Katalogda tekrar eden profil numaraları var (örn. AP2028), bu yüzden tek başına profile_no yetmez
+RowKey = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class CatalogDiff:
+    """
+    İki katalog sürümü arasındaki fark
+    
+    Attributes:
+        added: Yeni eklenen satırlar
+        removed: Silinen satırlar
+        changed: İçeriği değişen satırlar
+        reordered: Kalan satırların sırası değişti mi (gruplar baştan kurulur)
+        full_rebuild: Önceki sürüm yoktu, her şey baştan kuruldu
+    """
+    added: Tuple[RowKey, ...] = ()
+    removed: Tuple[RowKey, ...] = ()
+    changed: Tuple[RowKey, ...] = ()
+    reordered: bool = False
+    full_rebuild: bool = False
+    
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.reordered or self.full_rebuild)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'changed': len(self.changed),
+            'reordered': self.reordered,
+            'full_rebuild': self.full_rebuild
+        }
+
+
+@dataclass(frozen=True)
+class CatalogUpdate:
+    """Diff uygulandıktan sonraki katalog verisi"""
+    profiles: List[CatalogProfile]
+    keys: List[RowKey]
+    rows: Dict[RowKey, CatalogRow]
+    grouped_profiles: Dict
+    diff: CatalogDiff
+    # Diff olayları: silinen/değişen profillerin eski halleri ve eklenen/değişenlerin yeni halleri
+    old_profiles: Tuple[CatalogProfile, ...] = ()
+    new_profiles: Tuple[CatalogProfile, ...] = ()
+
+
+def key_rows(rows: List[CatalogRow]) -> List[RowKey]:
+    """
+    Satırlar için (profile_no, tekrar sırası) anahtarlarını üret
+    
+    Args:
+        rows: Ham katalog satırları
+    
+    Returns:
+        Satırlarla aynı sırada anahtar listesi
+    """
+    seen: Dict[str, int] = {}
+    keys = []
+    
+    for row in rows:
+        profile_no = row[0].strip()
+        occurrence = seen.get(profile_no, 0)
+        seen[profile_no] = occurrence + 1
+        keys.append((profile_no, occurrence))
+    
+    return keys
+
+
+def diff_catalog_rows(
+    old_rows: Dict[RowKey, CatalogRow],
+    new_keys: List[RowKey],
+    new_rows: List[CatalogRow]
+) -> CatalogDiff:
+    """
+    Yeni satırları önceki sürümle karşılaştır
+    
+    Args:
+        old_rows: Önceki sürümün satırları (eski satır sırasıyla)
+        new_keys: Yeni satır anahtarları
+        new_rows: Yeni satırlar
+    
+    Returns:
+        CatalogDiff
+    """
+    new_key_set = set(new_keys)
+    
+    added = tuple(key for key in new_keys if key not in old_rows)
+    changed = tuple(
+        key for key, row in zip(new_keys, new_rows)
+        if key in old_rows and old_rows[key] != row
+    )
+    removed = tuple(key for key in old_rows if key not in new_key_set)
+    
+    # Ortak satırların göreli sırası değiştiyse gruplar içindeki sıra da değişir
+    old_order = [key for key in old_rows if key in new_key_set]
+    new_order = [key for key in new_keys if key in old_rows]
+    
+    return CatalogDiff(
+        added=added,
+        removed=removed,
+        changed=changed,
+        reordered=old_order != new_order
+    )
+
+
+def apply_catalog_rows(
+    rows: List[CatalogRow],
+    previous_rows: Optional[Dict[RowKey, CatalogRow]] = None,
+    previous_profiles: Optional[Dict[RowKey, CatalogProfile]] = None,
+    previous_grouped: Optional[Dict] = None
+) -> CatalogUpdate:
+    """
+    Yeni satırları uygula: değişmeyen profilleri yeniden kullan, sadece
+    eklenen/değişen satırlar için profil oluştur ve sadece etkilenen
+    kategori gruplarını güncelle
+    
+    Args:
+        rows: Yeni ham satırlar
+        previous_rows: Önceki sürümün satırları (yoksa tam build)
+        previous_profiles: Önceki sürümün anahtar -> profil eşlemesi
+        previous_grouped: Önceki sürümün kategori grupları
+    
+    Returns:
+        CatalogUpdate
+    """
+    keys = key_rows(rows)
+    incremental = bool(previous_rows) and previous_profiles is not None and previous_grouped is not None
+    
+    if incremental:
+        diff = diff_catalog_rows(previous_rows, keys, rows)
+        touched = set(diff.added) | set(diff.changed)
+    else:
+        diff = CatalogDiff(added=tuple(keys), full_rebuild=True)
+        touched = None
+    
+    profiles: List[CatalogProfile] = []
+    profile_keys: List[RowKey] = []
+    row_map: Dict[RowKey, CatalogRow] = {}
+    new_profiles = []
+    
+    for key, row in zip(keys, rows):
+        # Parse edilemeyen satırlar da kaydedilir; aksi halde her yenilemede "eklendi" görünürler
+        row_map[key] = row
+        
+        if touched is None or key in touched:
+            profile = build_profile(row)
+            if profile is None:
+                continue
+            new_profiles.append(profile)
+        else:
+            profile = previous_profiles.get(key)
+            if profile is None:
+                # Önceki sürümde de parse edilemeyen, değişmemiş satır
+                continue
+        
+        profiles.append(profile)
+        profile_keys.append(key)
+    
+    old_profiles = []
+    if incremental:
+        old_profiles = [
+            previous_profiles[key] for key in (*diff.removed, *diff.changed)
+            if key in previous_profiles
+        ]
+    
+    if not incremental or diff.reordered:
+        grouped = group_by_categories(profiles)
+    else:
+        grouped = update_groups(previous_grouped, old_profiles, new_profiles, profiles)
+    
+    return CatalogUpdate(
+        profiles=profiles,
+        keys=profile_keys,
+        rows=row_map,
+        grouped_profiles=grouped,
+        diff=diff,
+        old_profiles=tuple(old_profiles),
+        new_profiles=tuple(new_profiles)
+    )
+
+
+@dataclass(frozen=True)
+class PositionsDelta:
+    """
+    Diff'in profil pozisyonlarına etkisi (indeks güncellemeleri için)
+    
+    Attributes:
+        remap: Eski pozisyon -> yeni pozisyon; silinen ve değişen profiller -1
+        added: Eklenen ve değişen profillerin yeni pozisyonları (artan sırada)
+    """
+    remap: np.ndarray
+    added: Tuple[int, ...]
+
+
+def positions_delta(old_keys: List[RowKey], update: CatalogUpdate) -> PositionsDelta:
+    """
+    Önceki profil anahtarlarını güncellemenin profilleriyle eşle
+    
+    Args:
+        old_keys: Önceki sürümün profil anahtarları (profil sırasıyla)
+        update: apply_catalog_rows() çıktısı (sıra değişmemiş olmalı)
+    
+    Returns:
+        PositionsDelta
+    """
+    touched = set(update.diff.changed)
+    new_positions = {key: position for position, key in enumerate(update.keys)}
+    
+    remap = np.array(
+        [
+            -1 if key in touched else new_positions.get(key, -1)
+            for key in old_keys
+        ],
+        dtype=np.int64
+    )
+    touched.update(update.diff.added)
+    added = tuple(position for position, key in enumerate(update.keys) if key in touched)
+    return PositionsDelta(remap=remap, added=added)
+
+
+def update_groups(
+    grouped: Dict,
+    old_profiles: List[CatalogProfile],
+    new_profiles: List[CatalogProfile],
+    profiles: List[CatalogProfile]
+) -> Dict:
+    """
+    Sadece etkilenen kategori gruplarını güncelle
+    
+    Sonuç group_by_categories(profiles) ile birebir aynıdır: grup içi sıra
+    satır sırası, kategori sırası ilk görülme sırasıdır.
+    
+    Args:
+        grouped: Önceki kategori grupları (değiştirilmez)
+        old_profiles: Çıkarılacak profiller (silinen ve değişenlerin eski hali)
+        new_profiles: Eklenecek profiller (eklenen ve değişenlerin yeni hali)
+        profiles: Yeni sürümün tüm profilleri (satır sırasıyla)
+    
+    Returns:
+        Yeni kategori grupları (etkilenmeyen listeler paylaşılır)
+    """
+    affected = {
+        (cat_type, category)
+        for profile in (*old_profiles, *new_profiles)
+        for category, cat_type in zip(profile.categories, profile.category_types)
+    }
+    if not affected:
+        return grouped
+    
+    stale = {id(profile) for profile in old_profiles}
+    position = {id(profile): index for index, profile in enumerate(profiles)}
+    updated = {cat_type: dict(categories) for cat_type, categories in grouped.items()}
+    
+    for cat_type, category in affected:
+        members = [p for p in updated[cat_type].get(category, []) if id(p) not in stale]
+        
+        # Aynı kategori bir profilde birden fazla sütunda olabilir - group_by_categories gibi her biri için ekle
+        for profile in new_profiles:
+            members.extend(profile for c in profile.categories if c == category)
+        
+        if members:
+            members.sort(key=lambda p: position[id(p)])
+            updated[cat_type][category] = members
+        else:
+            updated[cat_type].pop(category, None)
+    
+    # Kategori sırası: ilk profilin satır sırası, aynı profilde sütun sırası
+    for cat_type in {cat_type for cat_type, _ in affected}:
+        updated[cat_type] = dict(sorted(
+            updated[cat_type].items(),
+            key=lambda item: (position[id(item[1][0])], item[1][0].categories.index(item[0]))
+        ))
+    
+    return updated
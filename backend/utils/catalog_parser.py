@@ -3,40 +3,116 @@ Beymetal Katalog Excel Parser
 Tüm profil kataloğunu parse eder
 """
 import openpyxl
-from typing import List, Dict, Optional
+import sys
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Katalog sütunları (A: Profil No ... M: Açıklama)
+CATALOG_COLUMNS = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M')
+
+# Ham katalog satırı (CATALOG_COLUMNS sırasıyla string değerler)
+CatalogRow = Tuple[str, ...]
+
+
+def _text(row_data: Dict, column: str) -> str:
+    """Hücre değerini strip edip intern et (tekrar eden değerler tek kopya tutulur)"""
+    return sys.intern(row_data.get(column, '').strip())
+
+
+@lru_cache(maxsize=None)
+def category_type(category: str) -> str:
+    """
+    Kategori tipini belirle
+    
+    Sonuç sadece kategori adına bağlı olduğu için her kategori için bir kez
+    hesaplanır ve cache'lenir.
+    
+    Returns:
+        'standard', 'shape', 'sector' veya 'other'
+    """
+    if not category:
+        return 'other'
+    
+    category_upper = category.upper()
+    
+    # Standart profiller
+    if category_upper.startswith('STANDART'):
+        return 'standard'
+    
+    # Şekilsel kategoriler - DAİRE ve DAİRESEL şekilsel kategorilerdir
+    shape_keywords = ['DAİRE', 'DAIRE', 'DAİRESEL', 'DAIRESEL']
+    if any(keyword in category_upper for keyword in shape_keywords):
+        return 'shape'
+    
+    # Kutu kategorisi Sektörel'e taşı
+    if 'KUTU' in category_upper:
+        return 'sector'
+    
+    # Sektörel kategoriler (özel isimler)
+    sector_keywords = ['RAY', 'CAM TUTUCU', 'PENCERE', 'KAPI', 'CEPHE', 'PERDE', 
+                      'SÜRGÜ', 'SÜRME', 'PANEL', 'BÖLME', 'VITRIN']
+    if any(keyword in category_upper for keyword in sector_keywords):
+        return 'sector'
+    
+    # Şekilsel kategori (sadece tek harf veya çok kısa harfler)
+    if category[0].isalpha() and not category_upper.startswith('STANDART'):
+        # İlk kelime sadece harf mi kontrol et
+        first_word = category.split()[0] if ' ' in category else category
+        # Sadece 1-2 harflik kategoriler şekilsel (T, U, L, C, H, V, S, F, D, M, K, R gibi)
+        if first_word.isalpha() and len(first_word) <= 2:
+            return 'shape'
+    
+    # Diğerleri sektörel
+    return 'sector'
+
 
 class CatalogProfile:
-    """Katalog profil modeli"""
+    """
+    Katalog profil modeli
+    
+    __slots__ ile instance başına __dict__ tutulmaz; müşteri, şirket ve
+    kategori gibi tekrar eden string'ler intern edilir ve kategori tipleri
+    yüklemede bir kez hesaplanır.
+    """
+    
+    __slots__ = (
+        'profile_no', 'customer', 'description', 'is_standard',
+        'mold_tonnage', 'mold_status',
+        'category_1', 'category_2', 'category_3', 'category_4', 'category_5',
+        'explanation', 'categories', 'category_types', 'has_mold', 'company'
+    )
     
     def __init__(self, row_data: Dict):
         self.profile_no = row_data.get('A', '').strip()
-        self.customer = row_data.get('B', '').strip()
+        self.customer = _text(row_data, 'B')
         self.description = row_data.get('C', '').strip()
         self.is_standard = row_data.get('D', '').strip().upper() == 'STANDART'
         # E sütunu bilgi amaçlı, kullanmıyoruz
-        self.mold_tonnage = row_data.get('F', '').strip()
-        self.mold_status = row_data.get('G', '').strip()
-        self.category_1 = row_data.get('H', '').strip()
-        self.category_2 = row_data.get('I', '').strip()
-        self.category_3 = row_data.get('J', '').strip()
-        self.category_4 = row_data.get('K', '').strip()
-        self.category_5 = row_data.get('L', '').strip()
+        self.mold_tonnage = _text(row_data, 'F')
+        self.mold_status = _text(row_data, 'G')
+        self.category_1 = _text(row_data, 'H')
+        self.category_2 = _text(row_data, 'I')
+        self.category_3 = _text(row_data, 'J')
+        self.category_4 = _text(row_data, 'K')
+        self.category_5 = _text(row_data, 'L')
         self.explanation = row_data.get('M', '').strip()
         
         # Kategorileri H-L sütunlarından al (boş olmayanlar)
-        self.categories = [
-            cat for cat in [
+        self.categories = tuple(
+            cat for cat in (
                 self.category_1,
                 self.category_2,
                 self.category_3,
                 self.category_4,
                 self.category_5
-            ] if cat  # Boş olmayanları al
-        ]
+            ) if cat  # Boş olmayanları al
+        )
+        
+        # Kategori tipleri (categories ile aynı sırada)
+        self.category_types = tuple(category_type(cat) for cat in self.categories)
         
         # Kalıp durumu normalize et
         if self.mold_status:
@@ -70,40 +146,7 @@ class CatalogProfile:
     
     def get_category_type(self, category: str) -> str:
         """Kategori tipini belirle"""
-        if not category:
-            return 'other'
-        
-        category_upper = category.upper()
-        
-        # Standart profiller
-        if category_upper.startswith('STANDART'):
-            return 'standard'
-        
-        # Şekilsel kategoriler - DAİRE ve DAİRESEL şekilsel kategorilerdir
-        shape_keywords = ['DAİRE', 'DAIRE', 'DAİRESEL', 'DAIRESEL']
-        if any(keyword in category_upper for keyword in shape_keywords):
-            return 'shape'
-        
-        # Kutu kategorisi Sektörel'e taşı
-        if 'KUTU' in category_upper:
-            return 'sector'
-        
-        # Sektörel kategoriler (özel isimler)
-        sector_keywords = ['RAY', 'CAM TUTUCU', 'PENCERE', 'KAPI', 'CEPHE', 'PERDE', 
-                          'SÜRGÜ', 'SÜRME', 'PANEL', 'BÖLME', 'VITRIN']
-        if any(keyword in category_upper for keyword in sector_keywords):
-            return 'sector'
-        
-        # Şekilsel kategori (sadece tek harf veya çok kısa harfler)
-        if category[0].isalpha() and not category_upper.startswith('STANDART'):
-            # İlk kelime sadece harf mi kontrol et
-            first_word = category.split()[0] if ' ' in category else category
-            # Sadece 1-2 harflik kategoriler şekilsel (T, U, L, C, H, V, S, F, D, M, K, R gibi)
-            if first_word.isalpha() and len(first_word) <= 2:
-                return 'shape'
-        
-        # Diğerleri sektörel
-        return 'sector'
+        return category_type(category)
     
     def to_dict(self) -> Dict:
         """Dict'e çevir - Profile ile uyumlu format"""
@@ -113,65 +156,91 @@ class CatalogProfile:
             'customer': self.customer,
             'description': self.description,
             'is_standard': self.is_standard,
-            'categories': self.categories,
+            'categories': list(self.categories),
             'company': self.company,  # Şirket bilgisi
             'mold_status': 'Kalıp Mevcut' if self.has_mold else 'Kalıp Yok',
             'has_mold': self.has_mold,
             'explanation': self.explanation,
-            'category_types': {
-                cat: self.get_category_type(cat) 
-                for cat in self.categories
-            }
+            'category_types': dict(zip(self.categories, self.category_types))
         }
 
 
-def parse_catalog_excel(file_path: str) -> List[CatalogProfile]:
+def read_catalog_rows(file_path: str) -> List[CatalogRow]:
     """
-    Katalog Excel dosyasını parse et
+    Katalog Excel'inin ham satırlarını oku (build executor giriş noktası)
+    
+    Profil nesnesi oluşturmaz; satırlar diff aşamasında önceki sürümle
+    karşılaştırılır ve sadece değişen satırlar için CatalogProfile üretilir.
     
     Args:
         file_path: Excel dosya yolu
         
     Returns:
-        CatalogProfile listesi
+        A-M sütunlarının string değerlerinden oluşan satır tuple'ları
     """
-    logger.info(f"Katalog Excel parse ediliyor: {file_path}")
+    logger.info(f"Katalog Excel okunuyor: {file_path}")
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
     
     try:
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
         sheet = workbook.active
+        rows = []
         
-        profiles = []
-        header_row = 1  # İlk satır başlık
-        
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=header_row + 1), start=header_row + 1):
-            # Boş satırları atla
-            if not row[0].value:  # A sütunu (Profil No) boşsa
+        for values in sheet.iter_rows(min_row=2, max_col=len(CATALOG_COLUMNS), values_only=True):
+            # Boş satırları atla (A sütunu - Profil No boşsa)
+            if not values or not values[0]:
                 continue
             
-            # Satır verisini dict'e çevir
-            row_data = {
-                'A': str(row[0].value) if row[0].value else '',
-                'B': str(row[1].value) if row[1].value else '',
-                'C': str(row[2].value) if row[2].value else '',
-                'D': str(row[3].value) if row[3].value else '',
-                'E': str(row[4].value) if row[4].value else '',
-                'F': str(row[5].value) if row[5].value else '',
-                'G': str(row[6].value) if row[6].value else '',
-                'H': str(row[7].value) if row[7].value else '',
-                'I': str(row[8].value) if row[8].value else '',
-                'J': str(row[9].value) if row[9].value else '',
-                'K': str(row[10].value) if row[10].value else '',
-                'L': str(row[11].value) if row[11].value else '',
-                'M': str(row[12].value) if row[12].value else '',
-            }
+            row = tuple(str(value) if value else '' for value in values)
+            
+            # Read-only modda kısa satırlar eksik sütunla gelebilir
+            if len(row) < len(CATALOG_COLUMNS):
+                row += ('',) * (len(CATALOG_COLUMNS) - len(row))
             
-            try:
-                profile = CatalogProfile(row_data)
+            rows.append(row)
+        
+        logger.info(f"Toplam {len(rows)} katalog satırı okundu")
+        return rows
+        
+    finally:
+        workbook.close()
+
+
+def build_profile(row: CatalogRow) -> Optional[CatalogProfile]:
+    """
+    Ham satırdan CatalogProfile oluştur
+    
+    Args:
+        row: read_catalog_rows() satırı
+        
+    Returns:
+        CatalogProfile veya satır parse edilemezse None
+    """
+    try:
+        return CatalogProfile(dict(zip(CATALOG_COLUMNS, row)))
+    except Exception as e:
+        logger.warning(f"Satır parse edilemedi ({row[0]}): {e}")
+        return None
+
+
+def parse_catalog_excel(file_path: str) -> List[CatalogProfile]:
+    """
+    Katalog Excel dosyasını parse et
+    
+    Args:
+        file_path: Excel dosya yolu
+        
+    Returns:
+        CatalogProfile listesi
+    """
+    logger.info(f"Katalog Excel parse ediliyor: {file_path}")
+    
+    try:
+        profiles = []
+        for row in read_catalog_rows(file_path):
+            profile = build_profile(row)
+            if profile is not None:
                 profiles.append(profile)
-            except Exception as e:
-                logger.warning(f"Satır {row_idx} parse edilemedi: {e}")
-                continue
         
         logger.info(f"Toplam {len(profiles)} profil parse edildi")
         return profiles
@@ -199,12 +268,11 @@ def group_by_categories(profiles: List[CatalogProfile]) -> Dict:
     }
     
     for profile in profiles:
-        for category in profile.categories:
-            cat_type = profile.get_category_type(category)
-            
+        for category, cat_type in zip(profile.categories, profile.category_types):
             if category not in grouped[cat_type]:
                 grouped[cat_type][category] = []
             
             grouped[cat_type][category].append(profile)
     
     return grouped
+
@@ -0,0 +1,343 @@
+"""
+Katalog arama indeksi
+Profil no, müşteri, açıklama ve kategorileri Türkçe katlanmış karakter
+n-gram'ları (1-3) ile indeksler; serbest metin araması posting list
+kesişimi + alt dize doğrulaması ile yapılır ve alan ağırlığına göre sıralanır.
+Katalog diff'i sadece değişen profillerin posting'lerini günceller
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.catalog_parser import CatalogProfile
+from utils.query_parser import fold_turkish
+
+# Alan ağırlıkları (profil no > kategori > müşteri > açıklama)
+FIELD_WEIGHTS = (
+    ('profile_no', 8),
+    ('categories', 4),
+    ('customer', 2),
+    ('description', 1),
+)
+
+# Posting list'lerdeki en uzun n-gram; daha uzun sorgular trigram'larına ayrılır
+MAX_GRAM = 3
+
+_TOKEN = re.compile(r'\w+')
+
+# Toplu indekslemede fold_turkish'in sorgu cache'ini doldurmamak için cache'siz hali
+_fold = fold_turkish.__wrapped__
+
+
+def _grams(text: str) -> Set[str]:
+    """Metnin 1..MAX_GRAM uzunluğundaki tüm alt dizeleri"""
+    return {
+        text[start:start + size]
+        for size in range(1, MAX_GRAM + 1)
+        for start in range(len(text) - size + 1)
+    }
+
+
+def _words(text: str) -> str:
+    """Kelime sınırı kontrolü için ' tok1 tok2 ' biçimi"""
+    return f" {' '.join(_TOKEN.findall(text))} "
+
+
+def _arrays(postings: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+    """Posting list'leri numpy dizilerine çevir"""
+    return {key: np.array(slots, dtype=np.int32) for key, slots in postings.items()}
+
+
+def _patch_postings(
+    postings: Dict[str, np.ndarray],
+    removed: Dict[str, List[int]],
+    added: Dict[str, List[int]]
+) -> Dict[str, np.ndarray]:
+    """
+    Posting dizilerinin kopyasında sadece etkilenen anahtarları güncelle
+    
+    Yeni slot'lar mevcut slot'ların hepsinden büyük olduğu için sona
+    eklemek diziyi sıralı tutar.
+    """
+    patched = dict(postings)
+    for key in removed.keys() | added.keys():
+        slots = patched.get(key)
+        if slots is None:
+            slots = np.empty(0, dtype=np.int32)
+        if key in removed:
+            slots = slots[~np.isin(slots, removed[key])]
+        if key in added:
+            slots = np.concatenate([slots, np.array(added[key], dtype=np.int32)])
+        if len(slots):
+            patched[key] = slots
+        else:
+            patched.pop(key, None)
+    return patched
+
+
+class _Entry:
+    """Bir profilin katlanmış alan metinleri"""
+    
+    __slots__ = ('texts', 'tokens', 'words')
+    
+    def __init__(self, profile: CatalogProfile):
+        # Kategoriler '\n' ile birleştirilir; sorgu '\n' içermediği için
+        # "herhangi bir kategori sorguyu içeriyor" ile aynı sonucu verir
+        raw = {
+            'profile_no': profile.profile_no,
+            'categories': '\n'.join(profile.categories),
+            'customer': profile.customer,
+            'description': profile.description,
+        }
+        self.texts = tuple(_fold(raw[field]) for field, _ in FIELD_WEIGHTS)
+        self.tokens = tuple(_TOKEN.findall(text) for text in self.texts)
+        self.words = tuple(f" {' '.join(tokens)} " for tokens in self.tokens)
+    
+    def keys(self) -> Tuple[Set[str], List[Set[str]], List[Set[str]]]:
+        """(tüm alanların n-gram'ları, alan bazlı n-gram'lar, alan bazlı kelimeler)"""
+        field_grams = [_grams(text) for text in self.texts]
+        field_tokens = [set(tokens) for tokens in self.tokens]
+        return set().union(*field_grams), field_grams, field_tokens
+
+
+class CatalogSearchIndex:
+    """
+    Katalog serbest metin arama indeksi
+    
+    Posting list'ler bir kez kurulur (warm() veya ilk arama) ve veri nesli
+    boyunca saklanır. Sorgu alanlardan birinde alt dize olarak geçmelidir
+    (eski substring araması gibi), ancak karşılaştırma Türkçe katlanmış
+    metinler üzerinde yapılır ("kosebent" -> "KÖŞEBENT", "kilit" -> "KİLİT").
+    
+    Kısa tek kelimelik sorgular (<= MAX_GRAM) doğrudan alan bazlı posting
+    dizilerinden numpy ile puanlanır; neredeyse tüm katalogla eşleşen "a"
+    gibi sorgularda profil başına doğrulama yapılmaz. Uzun sorgularda
+    trigram kesişimi aday kümesini daraltır, adaylar alt dize ile doğrulanır.
+    
+    Posting'ler katalog pozisyonu yerine slot tutar: tam kurulumda slot ==
+    pozisyon, updated() ise kalan profillerin slot'larını korur, silinen/
+    değişen profillerin slot'larını boşaltır ve eklenenlere yeni slot verir.
+    Böylece araya satır eklenip pozisyonlar kaysa da sadece değişen
+    profillerin n-gram'ları güncellenir; slot -> pozisyon dizisi yeniden
+    numaralanır.
+    """
+    
+    def __init__(self, profiles: List[CatalogProfile]):
+        """
+        Args:
+            profiles: Katalog profilleri (pozisyonlar bu listeye göredir)
+        """
+        self.profiles = profiles
+        self._entries: Optional[List[Optional[_Entry]]] = None
+        self._postings: Dict[str, np.ndarray] = {}
+        self._field_grams: List[Dict[str, np.ndarray]] = []
+        self._field_tokens: List[Dict[str, np.ndarray]] = []
+        # slot -> katalog pozisyonu (boş slot: -1) ve pozisyon -> slot
+        self._slot_positions = np.empty(0, dtype=np.int32)
+        self._position_slots = np.empty(0, dtype=np.int32)
+        self._lock = threading.Lock()
+    
+    def warm(self) -> None:
+        """İndeksi şimdi kur (yayından önce thread'de çağrılır)"""
+        self._build()
+    
+    def _build(self) -> List[Optional[_Entry]]:
+        """Alan metinlerini ve n-gram/kelime posting list'lerini kur"""
+        with self._lock:
+            if self._entries is None:
+                entries = [_Entry(profile) for profile in self.profiles]
+                postings: Dict[str, List[int]] = {}
+                field_grams: List[Dict[str, List[int]]] = [{} for _ in FIELD_WEIGHTS]
+                field_tokens: List[Dict[str, List[int]]] = [{} for _ in FIELD_WEIGHTS]
+                
+                for slot, entry in enumerate(entries):
+                    grams, entry_grams, entry_tokens = entry.keys()
+                    for gram in grams:
+                        postings.setdefault(gram, []).append(slot)
+                    for index in range(len(FIELD_WEIGHTS)):
+                        for gram in entry_grams[index]:
+                            field_grams[index].setdefault(gram, []).append(slot)
+                        for token in entry_tokens[index]:
+                            field_tokens[index].setdefault(token, []).append(slot)
+                
+                self._postings = _arrays(postings)
+                self._field_grams = [_arrays(grams) for grams in field_grams]
+                self._field_tokens = [_arrays(tokens) for tokens in field_tokens]
+                self._slot_positions = np.arange(len(entries), dtype=np.int32)
+                self._position_slots = self._slot_positions
+                self._entries = entries
+        return self._entries
+    
+    def updated(
+        self,
+        profiles: List[CatalogProfile],
+        remap: np.ndarray,
+        added: List[int]
+    ) -> 'CatalogSearchIndex':
+        """
+        Diff'i uygulanmış yeni indeks (bu indeks değiştirilmez)
+        
+        Args:
+            profiles: Yeni katalog profilleri
+            remap: Eski pozisyon -> yeni pozisyon (silinen/değişen: -1)
+            added: Eklenen/değişen profillerin yeni pozisyonları
+        
+        Returns:
+            Yeni indeks; bu indeks henüz kurulmadıysa veya boş slot'lar dolu
+            slot'ları geçtiyse baştan kurulacak (tembel) indeks
+        """
+        index = CatalogSearchIndex(profiles)
+        if self._entries is None:
+            return index
+        
+        old_slot_positions = self._slot_positions
+        alive = old_slot_positions >= 0
+        slot_positions = np.full(len(old_slot_positions) + len(added), -1, dtype=np.int32)
+        slot_positions[:len(old_slot_positions)][alive] = remap[old_slot_positions[alive]]
+        
+        dead = int(np.count_nonzero(slot_positions < 0)) - len(added)
+        if dead > len(profiles):
+            # Çok sayıda boş slot birikti - sıkıştırmak için baştan kur
+            return index
+        
+        entries = list(self._entries)
+        removed_keys: Dict[str, List[int]] = {}
+        removed_fields = [({}, {}) for _ in FIELD_WEIGHTS]
+        added_keys: Dict[str, List[int]] = {}
+        added_fields = [({}, {}) for _ in FIELD_WEIGHTS]
+        
+        def collect(slot: int, entry: _Entry, keys: Dict, fields: List) -> None:
+            grams, entry_grams, entry_tokens = entry.keys()
+            for gram in grams:
+                keys.setdefault(gram, []).append(slot)
+            for field, (gram_keys, token_keys) in enumerate(fields):
+                for gram in entry_grams[field]:
+                    gram_keys.setdefault(gram, []).append(slot)
+                for token in entry_tokens[field]:
+                    token_keys.setdefault(token, []).append(slot)
+        
+        # Silinen/değişen profiller: eski slot'ları boşalt
+        for slot in np.flatnonzero(alive & (slot_positions[:len(old_slot_positions)] < 0)).tolist():
+            collect(slot, entries[slot], removed_keys, removed_fields)
+            entries[slot] = None
+        
+        # Eklenen/değişen profiller: yeni slot'lar (mevcutların hepsinden büyük)
+        for position in added:
+            slot = len(entries)
+            entry = _Entry(profiles[position])
+            entries.append(entry)
+            slot_positions[slot] = position
+            collect(slot, entry, added_keys, added_fields)
+        
+        index._postings = _patch_postings(self._postings, removed_keys, added_keys)
+        index._field_grams = [
+            _patch_postings(postings, removed_fields[i][0], added_fields[i][0])
+            for i, postings in enumerate(self._field_grams)
+        ]
+        index._field_tokens = [
+            _patch_postings(postings, removed_fields[i][1], added_fields[i][1])
+            for i, postings in enumerate(self._field_tokens)
+        ]
+        live = np.flatnonzero(slot_positions >= 0)
+        position_slots = np.empty(len(profiles), dtype=np.int32)
+        position_slots[slot_positions[live]] = live
+        index._slot_positions = slot_positions
+        index._position_slots = position_slots
+        index._entries = entries
+        return index
+    
+    def _score_short(self, query: str, size: int) -> np.ndarray:
+        """
+        Kısa tek kelimelik sorgu için slot skorları
+        
+        Alt dize eşleşmesi alanın n-gram posting'i, tam kelime eşleşmesi
+        kelime posting'i ile bulunur (doğrulama gerekmez).
+        """
+        scores = np.zeros(size, dtype=np.int32)
+        for index, (_, weight) in enumerate(FIELD_WEIGHTS):
+            hits = self._field_grams[index].get(query)
+            if hits is not None:
+                scores[hits] += weight
+            words = self._field_tokens[index].get(query)
+            if words is not None:
+                scores[words] += weight
+        return scores
+    
+    def _candidates(self, query: str) -> Optional[np.ndarray]:
+        """
+        Sorgunun tüm n-gram'larını içeren slot'lar
+        
+        Returns:
+            Aday slot dizisi (None: sorgu hiçbir profilde geçemez)
+        """
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query)
+        
+        postings = []
+        for start in range(len(query) - MAX_GRAM + 1):
+            posting = self._postings.get(query[start:start + MAX_GRAM])
+            if posting is None:
+                return None
+            postings.append(posting)
+        
+        # En kısa listeden başlayarak kesiş (posting dizileri sıralı ve tekil)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return None
+        return candidates
+    
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> List[int]:
+        """
+        Serbest metin araması
+        
+        Args:
+            query: Arama metni (büyük/küçük harf ve Türkçe karakter farkı önemsiz)
+            offset: Atlanacak sonuç sayısı
+            limit: Maksimum sonuç sayısı
+        
+        Returns:
+            Profil pozisyonları, skora göre azalan (eşitlikte katalog sırası)
+        """
+        entries = self._entries if self._entries is not None else self._build()
+        slot_positions = self._slot_positions
+        folded = fold_turkish(query)
+        
+        # Boş sorgu her profille eşleşir (katalog sırasıyla)
+        if not folded:
+            return list(range(len(self._position_slots)))[offset:offset + limit]
+        
+        if len(folded) <= MAX_GRAM and _TOKEN.fullmatch(folded):
+            scores = self._score_short(folded, len(entries))
+            slots = np.flatnonzero(scores)
+            positions = slot_positions[slots]
+            # Skora göre azalan, eşitlikte katalog sırası
+            ranked = positions[np.lexsort((positions, -scores[slots]))]
+            return ranked[offset:offset + limit].tolist()
+        
+        candidates = self._candidates(folded)
+        if candidates is None or not len(candidates):
+            return []
+        
+        query_words = _words(folded)
+        whole_word = query_words.strip() != ''
+        
+        scored: List[Tuple[int, int]] = []
+        for slot in candidates.tolist():
+            entry = entries[slot]
+            score = 0
+            for (_, weight), text, words in zip(FIELD_WEIGHTS, entry.texts, entry.words):
+                if folded in text:
+                    score += weight
+                    # Tam alan veya tam kelime eşleşmesi ek puan alır
+                    if text == folded or (whole_word and query_words in words):
+                        score += weight
+            if score:
+                scored.append((-score, int(slot_positions[slot])))
+        
+        scored.sort()
+        return [position for _, position in scored[offset:offset + limit]]
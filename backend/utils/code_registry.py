@@ -0,0 +1,195 @@
+"""
+Profil kodu kaydı
+Profil kodlarının farklı yazımlarını (LR-3101-1, LR3101-1, lr3101-1,
+GLR-27-01, AP0030 R) tek bir sözlük aramasıyla kanonik kayda çözer;
+CodePrefixIndex kod ailelerini (LR3101 -> LR3101-1, LR3101-2, ...) önek
+aramasıyla bulur
+"""
+import re
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+_SEPARATORS = re.compile(r'[\s\-]+')
+
+
+def normalize_code(code: str) -> str:
+    """
+    Profil kodunun karşılaştırma anahtarı
+    
+    Büyük harfe çevrilir, boşluk ve tireler kaldırılır.
+    
+    Args:
+        code: Profil kodu
+    
+    Returns:
+        Anahtar (örn. "LR-3101-1" -> "LR31011", "GLR-27-01" -> "GLR2701")
+    """
+    return _SEPARATORS.sub('', code.upper())
+
+
+class CodeRegistry(Generic[T]):
+    """
+    Profil kodu -> kayıt sözlüğü
+    
+    Önce birebir kod (büyük/küçük harf ve baş/son boşluk hariç), bulunamazsa
+    normalize_code() anahtarı aranır; böylece kayıtlarda ayrı ayrı bulunan
+    yakın yazımlar (örn. "AP0030 R" ve "AP0030-R") birbirini ezmez. Aynı
+    anahtara düşen kayıtlardan ilki tutulur (listeyi baştan taramakla aynı
+    sonuç). Veri nesli başına bir kez kurulur, sonra değiştirilmez.
+    """
+    
+    def __init__(self, entries: Iterable[Tuple[str, T]]):
+        """
+        Args:
+            entries: (kod, kayıt) çiftleri, öncelik sırasıyla
+        """
+        self._exact: Dict[str, T] = {}
+        self._normalized: Dict[str, T] = {}
+        
+        for code, record in entries:
+            if not code:
+                continue
+            self._exact.setdefault(code.strip().upper(), record)
+            self._normalized.setdefault(normalize_code(code), record)
+    
+    def __len__(self) -> int:
+        return len(self._exact)
+    
+    def get(self, code: Optional[str]) -> Optional[T]:
+        """
+        Koda karşılık gelen kaydı getir
+        
+        Args:
+            code: Profil kodu (herhangi bir yazım)
+        
+        Returns:
+            Kayıt veya None
+        """
+        if not code:
+            return None
+        
+        record = self._exact.get(code.strip().upper())
+        if record is None:
+            record = self._normalized.get(normalize_code(code))
+        return record
+    
+    def updated(
+        self,
+        codes: Iterable[str],
+        entries: Callable[[str], Iterable[Tuple[str, T]]]
+    ) -> 'CodeRegistry[T]':
+        """
+        Değişen kodlar için güncellenmiş kopya (bu kayıt değiştirilmez)
+        
+        Değişen kodların normalize anahtarına düşen kayıtlar yeni veriden
+        öncelik sırasıyla yeniden eklenir; diğer anahtarlara dokunulmaz.
+        
+        Args:
+            codes: Silinen, değişen ve eklenen kayıtların kodları (eski ve yeni)
+            entries: normalize anahtar -> yeni veride o anahtara düşen
+                     (kod, kayıt) çiftleri, öncelik sırasıyla
+        
+        Returns:
+            Yeni kayıt
+        """
+        registry: CodeRegistry[T] = CodeRegistry([])
+        registry._exact = dict(self._exact)
+        registry._normalized = dict(self._normalized)
+        
+        keys = set()
+        for code in codes:
+            if not code:
+                continue
+            registry._exact.pop(code.strip().upper(), None)
+            keys.add(normalize_code(code))
+        
+        for key in keys:
+            registry._normalized.pop(key, None)
+            for code, record in entries(key):
+                registry._exact.setdefault(code.strip().upper(), record)
+                registry._normalized.setdefault(key, record)
+        return registry
+
+
+class CodePrefixIndex:
+    """
+    normalize_code() anahtarlarına göre sıralı kod dizisi
+    
+    Bir önekle başlayan kodlar bisect ile bulunan tek bir aralıktır; aralık
+    dışındaki kayıtlara hiç bakılmaz. Veri nesli başına bir kez kurulur.
+    """
+    
+    def __init__(self, codes: Iterable[str]):
+        """
+        Args:
+            codes: Kodlar (pozisyonlar bu sıraya göredir)
+        """
+        pairs = sorted(
+            (normalize_code(code), position)
+            for position, code in enumerate(codes)
+            if code
+        )
+        self._keys: List[str] = [key for key, _ in pairs]
+        self._positions: List[int] = [position for _, position in pairs]
+    
+    def updated(self, remap: np.ndarray, added: Iterable[Tuple[int, str]]) -> 'CodePrefixIndex':
+        """
+        Diff'i uygulanmış kopya (bu indeks değiştirilmez)
+        
+        Kalan kodların anahtarları yeniden hesaplanmaz, sadece pozisyonları
+        yeniden numaralanır; sıra değişmediği için dizi neredeyse sıralı
+        kalır ve eklenen kodlarla birlikte tek sort'ta birleşir.
+        
+        Args:
+            remap: Eski pozisyon -> yeni pozisyon (silinen/değişen: -1)
+            added: Eklenen/değişen kodların (yeni pozisyon, kod) çiftleri
+        
+        Returns:
+            Yeni indeks
+        """
+        positions = remap[np.asarray(self._positions, dtype=np.int64)].tolist() if self._positions else []
+        pairs = [
+            (key, position)
+            for key, position in zip(self._keys, positions)
+            if position >= 0
+        ]
+        pairs.extend((normalize_code(code), position) for position, code in added if code)
+        pairs.sort()
+        
+        index = CodePrefixIndex(())
+        index._keys = [key for key, _ in pairs]
+        index._positions = [position for _, position in pairs]
+        return index
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def positions(self, prefix: str) -> List[int]:
+        """
+        Öneki taşıyan kodların pozisyonları
+        
+        Args:
+            prefix: Kod öneki (herhangi bir yazım, örn. "LR-3101", "lr3101")
+        
+        Returns:
+            Pozisyon listesi, normalize kod sırasıyla
+        """
+        key = normalize_code(prefix)
+        start = bisect_left(self._keys, key)
+        # Öneki taşıyan anahtarlar key ile key + en büyük karakter arasındadır
+        end = bisect_left(self._keys, key + '\U0010ffff', start)
+        return self._positions[start:end]
+    
+    def key_positions(self, key: str) -> List[int]:
+        """
+        normalize_code() anahtarı tam olarak key olan kodların pozisyonları
+        
+        Returns:
+            Pozisyon listesi, artan sırada
+        """
+        start = bisect_left(self._keys, key)
+        return self._positions[start:bisect_right(self._keys, key, start)]
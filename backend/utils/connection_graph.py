@@ -0,0 +1,235 @@
+"""
+Birleşim uyumluluk grafı
+Birleşim sheet'indeki sistem, birleşim kodu, profil (iç/orta/dış) ve fitil
+(bariyer) ilişkilerini yüklemede bir kez yönsüz bir komşuluk grafına (CSR
+dizileri) çevirir; "LR-3101 ile hangi fitiller kullanılır" veya "bu dış
+profili hangi sistemler paylaşır" gibi çok adımlı sorular birkaç düğümlük
+BFS ile cevaplanır
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.code_registry import normalize_code
+
+# Düğüm türleri (kenarlar bu sıraya göre küçük türden büyüğe yönlendirilir)
+NODE_TYPES = ('system', 'connection', 'profile', 'gasket')
+
+# Birleşim satırındaki profil rolleri (sütun sırasıyla)
+PROFILE_ROLES = ('inner_profile', 'middle_profile', 'outer_profile')
+
+# İzin verilen en büyük BFS derinliği
+MAX_DEPTH = 4
+
+_SYSTEM, _CONNECTION, _PROFILE, _GASKET = range(len(NODE_TYPES))
+
+
+def _is_code(value) -> bool:
+    """Hücre değeri kod mu ("kalıp yok" gibi notlar düğüm olmaz)"""
+    return isinstance(value, str) and any(char.isdigit() for char in value)
+
+
+class ConnectionGraph:
+    """
+    Sistem / birleşim / profil / fitil komşuluk grafı
+    
+    Aynı kod (normalize_code) tek düğümdür; örneğin birden fazla birleşimde
+    kullanılan dış profil bu birleşimlerin ortak komşusudur. Kenarlar:
+    sistem - birleşim ('contains'), birleşim - profil (rolü) ve birleşim -
+    fitil (bariyer alanı). Bir düğüm çiftinin ilk görülen ilişkisi tutulur.
+    Veri nesli başına bir kez kurulur, sonra değiştirilmez.
+    """
+    
+    def __init__(self, data: Optional[Dict]):
+        """
+        Args:
+            data: Parse edilmiş birleşim verisi ({'systems': [...]})
+        """
+        self._types: List[int] = []
+        self._labels: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._nodes: Dict[Tuple[int, str], int] = {}
+        self._relations: List[str] = []
+        relation_ids: Dict[str, int] = {}
+        edges: Dict[Tuple[int, int], int] = {}
+        
+        def node(node_type: int, label: str, name: Optional[str] = None) -> int:
+            key = (node_type, normalize_code(label))
+            node_id = self._nodes.get(key)
+            if node_id is None:
+                node_id = self._nodes[key] = len(self._types)
+                self._types.append(node_type)
+                self._labels.append(label.strip())
+                self._names.append(name)
+            return node_id
+        
+        def link(source: int, target: int, relation: str) -> None:
+            relation_id = relation_ids.get(relation)
+            if relation_id is None:
+                relation_id = relation_ids[relation] = len(self._relations)
+                self._relations.append(relation)
+            edges.setdefault((source, target), relation_id)
+        
+        for system in (data or {}).get('systems', []):
+            system_node = node(_SYSTEM, system.get('name') or '')
+            for profile in system.get('profiles', []):
+                code = profile.get('connection_code')
+                if not code:
+                    continue
+                connection_node = node(_CONNECTION, code, profile.get('name'))
+                link(system_node, connection_node, 'contains')
+                for role in PROFILE_ROLES:
+                    if _is_code(profile.get(role)):
+                        link(connection_node, node(_PROFILE, profile[role]), role)
+                for slot, gasket in (profile.get('gaskets') or {}).items():
+                    if _is_code(gasket):
+                        link(connection_node, node(_GASKET, gasket), slot)
+        
+        # Yönsüz CSR: her kenar iki yönde, komşular kenar ekleme sırasıyla
+        pairs = list(edges.items())
+        sources = np.array(
+            [s for (s, _), _ in pairs] + [t for (_, t), _ in pairs], dtype=np.int32
+        )
+        targets = np.array(
+            [t for (_, t), _ in pairs] + [s for (s, _), _ in pairs], dtype=np.int32
+        )
+        relations = np.array([r for _, r in pairs] * 2, dtype=np.uint8)
+        order = np.argsort(sources, kind='stable')
+        
+        self._indptr = np.zeros(len(self._types) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=len(self._types)), out=self._indptr[1:])
+        self._indices = targets[order]
+        self._edge_relations = relations[order]
+        self._edge_count = len(pairs)
+    
+    def __len__(self) -> int:
+        return len(self._types)
+    
+    @property
+    def edge_count(self) -> int:
+        return self._edge_count
+    
+    def roots(self, code: str) -> List[int]:
+        """
+        Koda karşılık gelen düğümler (tür sırasıyla)
+        
+        Aynı yazım hem birleşim hem profil kodu olabilir (örn. LR-3233 ve
+        LR3233); bu durumda ikisi de döner.
+        """
+        if not code:
+            return []
+        key = normalize_code(code)
+        return [
+            node_id
+            for node_id in (self._nodes.get((node_type, key)) for node_type in range(len(NODE_TYPES)))
+            if node_id is not None
+        ]
+    
+    def _neighbors(self, node_id: int) -> Iterable[Tuple[int, int]]:
+        """(komşu, ilişki id) çiftleri"""
+        start, end = self._indptr[node_id], self._indptr[node_id + 1]
+        return zip(self._indices[start:end].tolist(), self._edge_relations[start:end].tolist())
+    
+    def _traverse(self, roots: List[int], depth: int) -> Dict[int, int]:
+        """Kökten BFS; düğüm -> uzaklık (ziyaret sırasıyla)"""
+        distances = {root: 0 for root in roots}
+        frontier = list(distances)
+        for hop in range(1, depth + 1):
+            next_frontier = []
+            for node_id in frontier:
+                for neighbor, _ in self._neighbors(node_id):
+                    if neighbor not in distances:
+                        distances[neighbor] = hop
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return distances
+    
+    def _node_key(self, node_id: int) -> str:
+        return f"{NODE_TYPES[self._types[node_id]]}:{self._labels[node_id]}"
+    
+    def neighborhood(self, code: str, depth: int = 2) -> Optional[Dict]:
+        """
+        Kodun derinlik içindeki komşuluğu
+        
+        Args:
+            code: Birleşim, profil, fitil kodu veya sistem adı (herhangi bir yazım)
+            depth: Adım sayısı (0..MAX_DEPTH aralığına çekilir)
+        
+        Returns:
+            {
+                'depth': int,
+                'roots': [düğüm id],
+                'nodes': [{'id', 'type', 'code', 'name', 'distance'}],  # BFS sırasıyla
+                'edges': [{'source', 'target', 'relation'}]
+            }
+            veya kod grafta yoksa None
+        """
+        roots = self.roots(code)
+        if not roots:
+            return None
+        
+        depth = max(0, min(depth, MAX_DEPTH))
+        distances = self._traverse(roots, depth)
+        
+        nodes = [
+            {
+                'id': self._node_key(node_id),
+                'type': NODE_TYPES[self._types[node_id]],
+                'code': self._labels[node_id],
+                'name': self._names[node_id],
+                'distance': distance
+            }
+            for node_id, distance in distances.items()
+        ]
+        
+        # Derinlik içinde yürünen kenarlar (en az bir ucu sınırın içinde)
+        edges = []
+        for node_id, distance in distances.items():
+            if distance >= depth:
+                continue
+            for neighbor, relation in self._neighbors(node_id):
+                if neighbor not in distances:
+                    continue
+                # Her kenar bir kez: sınırdaki komşu veya id'si büyük olan taraftan
+                if distances[neighbor] < depth and neighbor < node_id:
+                    continue
+                source, target = (
+                    (node_id, neighbor) if self._types[node_id] < self._types[neighbor] else (neighbor, node_id)
+                )
+                edges.append({
+                    'source': self._node_key(source),
+                    'target': self._node_key(target),
+                    'relation': self._relations[relation]
+                })
+        
+        return {
+            'depth': depth,
+            'roots': [self._node_key(root) for root in roots],
+            'nodes': nodes,
+            'edges': edges
+        }
+    
+    def reachable(self, code: str, node_type: str, depth: int = 2) -> List[str]:
+        """
+        Koddan derinlik içinde ulaşılan belirli türdeki düğümler
+        
+        Args:
+            code: Başlangıç kodu
+            node_type: 'system', 'connection', 'profile' veya 'gasket'
+            depth: Adım sayısı
+        
+        Returns:
+            Düğüm kodları/adları, uzaklık ve ziyaret sırasıyla (kökler hariç)
+        """
+        roots = self.roots(code)
+        if not roots:
+            return []
+        wanted = NODE_TYPES.index(node_type)
+        distances = self._traverse(roots, max(0, min(depth, MAX_DEPTH)))
+        return [
+            self._labels[node_id]
+            for node_id, distance in distances.items()
+            if distance and self._types[node_id] == wanted
+        ]
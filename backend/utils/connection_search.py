@@ -0,0 +1,197 @@
+"""
+Birleşim arama indeksi
+Sistem adlarını, profil adlarını (TR/EN), birleşim kodlarını ve fitil
+kodlarını yüklemede bir kez küçük harfli ve Türkçe normalize edilmiş
+halleriyle hazırlar; arama n-gram posting list kesişimi + alt dize
+doğrulamasıdır
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Posting list'lerdeki en uzun n-gram; daha uzun sorgular trigram'larına ayrılır
+MAX_GRAM = 3
+
+_TURKISH_ASCII = str.maketrans('ışğüöç', 'isguoc')
+
+
+def normalize_turkish(text: Optional[str]) -> str:
+    """
+    Türkçe karakterleri normalize et (arama için)
+    
+    Args:
+        text: Normalize edilecek metin
+    
+    Returns:
+        Küçük harfli, Türkçe karakterleri ASCII karşılıklarına çevrilmiş metin
+        (örn. "KÖŞE SİSTEMİ" -> "kose sistemi")
+    """
+    if not text:
+        return ""
+    # Büyük harfler lower() çağrılmadan önce: Türkçe İ → i, İngilizce I → ı → i
+    return text.replace('İ', 'i').replace('I', 'ı').lower().translate(_TURKISH_ASCII)
+
+
+def _forms(text: Optional[str]) -> Tuple[str, str]:
+    """Metnin (küçük harfli, normalize) halleri"""
+    text = text or ''
+    return text.lower(), normalize_turkish(text)
+
+
+def _grams(text: str) -> Set[str]:
+    """Metnin 1..MAX_GRAM uzunluğundaki tüm alt dizeleri"""
+    return {
+        text[start:start + size]
+        for size in range(1, MAX_GRAM + 1)
+        for start in range(len(text) - size + 1)
+    }
+
+
+class _Document:
+    """Aranabilir bir sistem veya birleşim satırı"""
+    
+    __slots__ = ('system', 'profile', 'names', 'code', 'gaskets')
+    
+    def __init__(self, system: str, profile: Optional[Dict] = None):
+        self.system = system
+        self.profile = profile
+        if profile is None:
+            self.names = (_forms(system),)
+            self.code = None
+            self.gaskets: Tuple[str, ...] = ()
+        else:
+            self.names = (_forms(profile.get('name')), _forms(profile.get('name_eng')))
+            self.code = _forms(profile.get('connection_code'))
+            # Fitil kodları yalnızca küçük harfle karşılaştırılır (normalize edilmez)
+            self.gaskets = tuple(
+                str(value).lower()
+                for value in (profile.get('gaskets') or {}).values()
+                if value
+            )
+    
+    def texts(self) -> Iterable[str]:
+        """Posting list'e girecek tüm metin halleri"""
+        for lower, normalized in self.names:
+            yield lower
+            yield normalized
+        if self.code is not None:
+            yield from self.code
+        yield from self.gaskets
+    
+    def match(self, query_lower: str, query_normalized: str) -> Optional[str]:
+        """
+        Belgenin sorguyla eşleşme türü
+        
+        Returns:
+            'system_name', 'profile_name', 'connection_code', 'gasket' veya None
+        """
+        def contains(forms: Tuple[str, str]) -> bool:
+            return query_lower in forms[0] or query_normalized in forms[1]
+        
+        if self.profile is None:
+            return 'system_name' if contains(self.names[0]) else None
+        if any(contains(forms) for forms in self.names):
+            return 'profile_name'
+        if contains(self.code):
+            return 'connection_code'
+        if any(query_lower in gasket for gasket in self.gaskets):
+            return 'gasket'
+        return None
+
+
+class ConnectionSearchIndex:
+    """
+    Birleşim verisi serbest metin arama indeksi
+    
+    Belgeler sistem sırasıyladır (her sistemin kendi satırı, ardından
+    birleşim satırları); sonuçlar bu sırayla döner. Sorgu alanlardan birinde
+    küçük harfli veya Türkçe normalize haliyle alt dize olarak geçmelidir.
+    Veri nesli başına bir kez kurulur, sonra değiştirilmez.
+    """
+    
+    def __init__(self, data: Optional[Dict]):
+        """
+        Args:
+            data: Parse edilmiş birleşim verisi ({'systems': [...]})
+        """
+        documents: List[_Document] = []
+        for system in (data or {}).get('systems', []):
+            system_name = system.get('name', '')
+            documents.append(_Document(system_name))
+            for profile in system.get('profiles', []):
+                documents.append(_Document(system_name, profile))
+        
+        postings: Dict[str, List[int]] = {}
+        for position, document in enumerate(documents):
+            grams: Set[str] = set()
+            for text in document.texts():
+                grams |= _grams(text)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        
+        self._documents = documents
+        self._postings = postings
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    def _candidates(self, query: str) -> Set[int]:
+        """Sorgunun tüm n-gram'larını içeren belge pozisyonları"""
+        if len(query) <= MAX_GRAM:
+            return set(self._postings.get(query, ()))
+        
+        postings = []
+        for start in range(len(query) - MAX_GRAM + 1):
+            posting = self._postings.get(query[start:start + MAX_GRAM])
+            if not posting:
+                return set()
+            postings.append(posting)
+        
+        # En kısa listeden başlayarak kesiş
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+    
+    def search(self, query: str) -> List[Dict]:
+        """
+        Birleşim verilerinde arama yap
+        
+        Args:
+            query: Arama sorgusu
+        
+        Returns:
+            Sistem sonuçları {'type': 'system', 'system', 'match'} ve profil
+            sonuçları {'type': 'profile', 'system', 'profile', 'match'}
+        """
+        if not query:
+            return []
+        
+        query_lower = query.lower()
+        query_normalized = normalize_turkish(query)
+        
+        candidates = self._candidates(query_lower)
+        if query_normalized != query_lower:
+            candidates |= self._candidates(query_normalized)
+        
+        results = []
+        for position in sorted(candidates):
+            document = self._documents[position]
+            match = document.match(query_lower, query_normalized)
+            if match is None:
+                continue
+            if document.profile is None:
+                results.append({
+                    'type': 'system',
+                    'system': document.system,
+                    'match': match
+                })
+            else:
+                results.append({
+                    'type': 'profile',
+                    'system': document.system,
+                    'profile': document.profile,
+                    'match': match
+                })
+        return results
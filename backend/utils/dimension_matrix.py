@@ -0,0 +1,194 @@
+"""
+Ölçü matrisi
+Standart profillerin ölçülerini (Ø, A, B, K) bir numpy matrisinde, kategorilerini
+kod dizisinde tutar; arama koşulları tek bir boolean mask olarak hesaplanır.
+Her ölçü sütunu ayrıca sıralı tutulur; tolerans ve aralık aramaları
+np.searchsorted ile logaritmik zamanda aday pozisyonlara iner
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.profile import Profile
+
+# Matris sütunları
+DIMENSION_KEYS = ('Ø', 'A', 'B', 'K')
+_COLUMN = {key: column for column, key in enumerate(DIMENSION_KEYS)}
+
+
+class DimensionMatrix:
+    """
+    profiller × (Ø, A, B, K) ölçü matrisi + kategori kod dizisi
+    
+    Matris float64'tür: float32'ye yuvarlanan değerler tolerans sınırındaki
+    eşleşmeleri değiştiriyor (örn. "kalınlık 2.4" için K=2.5). 100k profilde
+    bile matris birkaç MB'tır.
+    
+    Eksik ölçüler NaN'dır; NaN ile her karşılaştırma False döner, bu yüzden
+    "ölçü var mı" kontrolü maskelere kendiliğinden dahil olur. Mask'ten
+    dönen pozisyonlar artan sıradadır, yani sonuçlar profil listesi baştan
+    sona taranmış gibi aynı sırada gelir.
+    
+    near_positions()/between_positions() sütunun sıralı kopyasında ikili
+    arama yapar; near()/has()/category_mask() positions verilirse sadece o
+    adaylar için değerlendirilir, böylece koşullar tüm matris yerine ilk
+    aramanın sonucu üzerinde daraltılır.
+    """
+    
+    def __init__(self, profiles: List[Profile]):
+        """
+        Args:
+            profiles: Standart profil listesi (pozisyonlar bu listeye göredir)
+        """
+        self.size = len(profiles)
+        self.values = np.full((self.size, len(DIMENSION_KEYS)), np.nan, dtype=np.float64)
+        
+        # Kategoriler ilk görülme sırasıyla kodlanır
+        codes: Dict[str, int] = {}
+        category_codes = np.empty(self.size, dtype=np.int32)
+        
+        for position, profile in enumerate(profiles):
+            for key, value in profile.dimensions.items():
+                column = _COLUMN.get(key)
+                if column is not None:
+                    self.values[position, column] = value
+            category_codes[position] = codes.setdefault(profile.category, len(codes))
+        
+        self.categories: List[str] = list(codes)
+        self.category_codes = category_codes
+        self._category_counts = dict(zip(
+            self.categories,
+            np.bincount(category_codes, minlength=len(self.categories)).tolist()
+        ))
+        
+        # Kategori kelimesi -> o kelimeyi içeren kategori kodları ("KUTU" -> STANDART KUTU, ...)
+        word_codes: Dict[str, List[int]] = {}
+        for code, category in enumerate(self.categories):
+            for word in set(category.split()):
+                word_codes.setdefault(word, []).append(code)
+        self._word_codes = {word: np.array(codes, dtype=np.int32) for word, codes in word_codes.items()}
+        
+        # Sütun -> (sıralı değerler, o değerlerin pozisyonları); NaN'lar dahil edilmez
+        self._sorted = []
+        for column in range(len(DIMENSION_KEYS)):
+            present = np.flatnonzero(~np.isnan(self.values[:, column]))
+            order = np.argsort(self.values[present, column], kind='stable')
+            self._sorted.append((self.values[present[order], column], present[order]))
+    
+    def column(self, key: str) -> np.ndarray:
+        """Bir ölçünün sütunu (eksikler NaN)"""
+        return self.values[:, _COLUMN[key]]
+    
+    def has(self, key: str, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Ölçüsü tanımlı olan profiller (positions verilirse o adaylar için)"""
+        column = self.column(key)
+        return ~np.isnan(column if positions is None else column[positions])
+    
+    def _range_positions(self, key: str, low: float, high: float) -> np.ndarray:
+        """Sıralı sütunda [low, high] aralığına düşen pozisyonlar (sırasız)"""
+        values, positions = self._sorted[_COLUMN[key]]
+        start = np.searchsorted(values, low, side='left')
+        end = np.searchsorted(values, high, side='right')
+        return positions[start:end]
+    
+    def near_positions(self, key: str, value: float, tolerance: float) -> np.ndarray:
+        """
+        Toleranslı eşitlik aramasının pozisyonları (ikili arama)
+        
+        Aday aralık sınırlarda birkaç ulp genişletilip abs(v - value) <
+        tolerance ile tekrar süzülür; sonuç near() maskesiyle birebir aynıdır.
+        
+        Args:
+            key: Ölçü anahtarı (Ø, A, B, K)
+            value: Aranan değer
+            tolerance: abs(v - value) < tolerance
+        
+        Returns:
+            Artan sırada pozisyon dizisi
+        """
+        margin = tolerance + 1e-9 * max(1.0, abs(value))
+        candidates = self._range_positions(key, value - margin, value + margin)
+        keep = np.abs(self.values[candidates, _COLUMN[key]] - value) < tolerance
+        return np.sort(candidates[keep])
+    
+    def between_positions(self, key: str, low: float, high: float) -> np.ndarray:
+        """low <= v <= high aramasının pozisyonları (ikili arama, artan sırada)"""
+        return np.sort(self._range_positions(key, low, high))
+    
+    def near(
+        self,
+        key: str,
+        value: float,
+        tolerance: float,
+        positions: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Toleranslı eşitlik maskesi
+        
+        Args:
+            key: Ölçü anahtarı (Ø, A, B, K)
+            value: Aranan değer
+            tolerance: abs(v - value) < tolerance
+            positions: Aday pozisyonlar; verilirse mask bu adaylar içindir
+        
+        Returns:
+            Boolean mask
+        """
+        if positions is not None:
+            return np.abs(self.column(key)[positions] - value) < tolerance
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.near_positions(key, value, tolerance)] = True
+        return mask
+    
+    def between(self, key: str, low: float, high: float) -> np.ndarray:
+        """low <= v <= high maskesi"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._range_positions(key, low, high)] = True
+        return mask
+    
+    def category_mask(self, category_filter: Optional[str], positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Kategori kelimesi filtresi - kelime sınırıyla eşleşir ("T" "STANDART" içinde geçmez)
+        
+        Args:
+            category_filter: Kategori kelimesi veya None (tüm profiller)
+            positions: Aday pozisyonlar; verilirse mask bu adaylar içindir
+        
+        Returns:
+            Boolean mask
+        """
+        category_codes = self.category_codes if positions is None else self.category_codes[positions]
+        if not category_filter:
+            return np.ones(len(category_codes), dtype=bool)
+        codes = self._word_codes.get(category_filter)
+        if codes is None:
+            return np.zeros(len(category_codes), dtype=bool)
+        return np.isin(category_codes, codes)
+    
+    def category_counts(self) -> Dict[str, int]:
+        """Kategori -> profil sayısı (ilk görülme sırasıyla, yüklemede hesaplanır)"""
+        return dict(self._category_counts)
+    
+    def category_contains(self, text: str) -> np.ndarray:
+        """Kategori adı text'i içeren profiller (büyük/küçük harf duyarsız)"""
+        text = text.upper()
+        codes = [code for code, category in enumerate(self.categories) if text in category.upper()]
+        return np.isin(self.category_codes, codes)
+    
+    def category_equals(self, category: str) -> np.ndarray:
+        """Kategori adı tam eşleşen profiller"""
+        try:
+            code = self.categories.index(category)
+        except ValueError:
+            return np.zeros(self.size, dtype=bool)
+        return self.category_codes == code
+    
+    def categories_for_word(self, category_filter: str) -> List[str]:
+        """Kategori kelimesini içeren kategori adları"""
+        codes = self._word_codes.get(category_filter)
+        return [self.categories[code] for code in codes] if codes is not None else []
+    
+    @staticmethod
+    def positions(mask: np.ndarray) -> List[int]:
+        """Mask'teki profil pozisyonları (artan sırada)"""
+        return np.flatnonzero(mask).tolist()
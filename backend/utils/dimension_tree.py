@@ -0,0 +1,122 @@
+"""
+Ölçü ağacı
+Kategori başına KD-tree ile en yakın ölçüdeki standart profilleri bulur
+("±3 yakın değerler", "en yakın mevcut ölçü" soruları tek sorgu)
+"""
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from utils.dimension_matrix import DIMENSION_KEYS, DimensionMatrix
+
+
+class _CategoryTree:
+    """Bir (kategori, ölçü seti) için normalize edilmiş KD-tree"""
+    
+    def __init__(self, positions: np.ndarray, values: np.ndarray):
+        """
+        Args:
+            positions: Profil pozisyonları
+            values: positions × ölçü seti değer matrisi (mm, NaN yok)
+        """
+        self.positions = positions
+        self.values = values
+        
+        # Her ölçü kategorideki standart sapmasıyla ölçeklenir; böylece
+        # kalınlık (1-3 mm) gibi dar aralıklı ölçüler de mesafeye eşit katkı verir
+        scale = values.std(axis=0) if len(values) else np.ones(values.shape[1])
+        scale[~(scale > 0)] = 1.0
+        self.scale = scale
+        self.tree = KDTree(values / scale) if len(values) else None
+
+
+class DimensionTree:
+    """
+    Standart profiller için en yakın ölçü araması
+    
+    Ağaçlar (kategori, sorgudaki ölçü seti) başına ilk kullanımda kurulur ve
+    saklanır; sadece sorgudaki ölçülerin hepsine sahip profiller aday olur.
+    """
+    
+    def __init__(self, matrix: DimensionMatrix):
+        """
+        Args:
+            matrix: Ağaçların kurulacağı ölçü matrisi
+        """
+        self.matrix = matrix
+        self._trees: Dict[Tuple[Optional[str], Tuple[str, ...]], _CategoryTree] = {}
+        self._lock = threading.Lock()
+    
+    def _get_tree(self, category: Optional[str], keys: Tuple[str, ...]) -> _CategoryTree:
+        """(kategori, ölçü seti) ağacını getir, yoksa kur"""
+        tree_key = (category, keys)
+        tree = self._trees.get(tree_key)
+        if tree is not None:
+            return tree
+        
+        with self._lock:
+            tree = self._trees.get(tree_key)
+            if tree is None:
+                matrix = self.matrix
+                mask = matrix.category_equals(category) if category else np.ones(matrix.size, dtype=bool)
+                for key in keys:
+                    mask &= matrix.has(key)
+                
+                positions = np.flatnonzero(mask)
+                columns = [DIMENSION_KEYS.index(key) for key in keys]
+                tree = _CategoryTree(positions, matrix.values[np.ix_(positions, columns)])
+                self._trees[tree_key] = tree
+        
+        return tree
+    
+    def nearest(
+        self,
+        dims: Dict[str, float],
+        category: Optional[str] = None,
+        k: Optional[int] = 10,
+        tolerance: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        En yakın ölçülerdeki profiller
+        
+        Args:
+            dims: Aranan ölçüler (örn. {'A': 30, 'B': 30}); sadece bu ölçülere bakılır
+            category: Tam kategori adı (örn. "STANDART KUTU") veya None (tüm kategoriler)
+            k: Maksimum sonuç sayısı (None: tolerans içindeki tüm profiller)
+            tolerance: Her ölçüde izin verilen maksimum fark (mm); None ise sınır yok
+        
+        Returns:
+            (profil pozisyonu, normalize mesafe) listesi, mesafeye göre artan
+        """
+        keys = tuple(key for key in DIMENSION_KEYS if key in dims)
+        if not keys or (k is None and tolerance is None):
+            return []
+        
+        entry = self._get_tree(category, keys)
+        if entry.tree is None:
+            return []
+        
+        target = np.array([float(dims[key]) for key in keys])
+        point = (target / entry.scale).reshape(1, -1)
+        
+        if tolerance is None:
+            distances, indices = entry.tree.query(point, k=min(k, len(entry.positions)))
+            return [
+                (int(entry.positions[i]), float(d))
+                for i, d in zip(indices[0], distances[0])
+            ]
+        
+        # Her ölçüde ±tolerance kutusunu kapsayan küre ile adayları al, sonra kutuya göre kesin filtrele
+        radius = tolerance / entry.scale.min() * math.sqrt(len(keys))
+        indices, distances = entry.tree.query_radius(point, r=radius, return_distance=True, sort_results=True)
+        
+        results = []
+        for i, d in zip(indices[0], distances[0]):
+            if np.all(np.abs(entry.values[i] - target) <= tolerance):
+                results.append((int(entry.positions[i]), float(d)))
+                if k is not None and len(results) >= k:
+                    break
+        return results
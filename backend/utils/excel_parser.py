@@ -1,6 +1,7 @@
 import openpyxl
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import time
 
 from models.profile import Profile
 
@@ -36,10 +37,28 @@ CATEGORY_COLUMNS = {
 }
 
 
+# Satır tuple'ından okunacak en son kolon (iter_rows'u bu genişlikle sınırla)
+_MAX_COLUMN = max(
+    max([config["code_col"], *config["dimensions"].values()])
+    for config in CATEGORY_COLUMNS.values()
+) + 1
+
+# Art arda bu kadar boş satır görülünce veri bitmiş sayılır ve tarama durur.
+# Sayfa sonundaki formatlı ama boş satırlar (kayıtlı max_row'a kadar binlerce
+# satır olabilir) böylece okunmaz; veri blokları arasındaki birkaç satırlık
+# boşluklar bu sınırın çok altındadır.
+MAX_BLANK_RUN = 100
+
+
 def parse_excel_file(file_path: str) -> List[Profile]:
     """
     Excel dosyasını parse eder ve Profile listesi döner
     
+    Workbook read-only modda açılır ve satırlar iter_rows(values_only=True)
+    ile tek geçişte akıtılır; her kategori kolon grubu satır tuple'ından
+    dilimlenir. Hücre başına random-access yapılmaz. Art arda MAX_BLANK_RUN
+    boş satırdan sonra tarama durur (verinin gerçek sonu).
+    
     Args:
         file_path: Excel dosyasının yolu
         
@@ -49,17 +68,39 @@ def parse_excel_file(file_path: str) -> List[Profile]:
     logger.info(f"Excel dosyası parse ediliyor: {file_path}")
     
     try:
-        workbook = openpyxl.load_workbook(file_path)
-        worksheet = workbook.active
-        
-        profiles = []
+        start_time = time.perf_counter()
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
         
-        # Her satırı işle (başlık satırını atla, 2. satırdan başla)
-        for row_idx in range(2, worksheet.max_row + 1):
-            row_profiles = _parse_row(worksheet, row_idx)
-            profiles.extend(row_profiles)
-        
-        logger.info(f"Toplam {len(profiles)} profil parse edildi")
+        try:
+            worksheet = workbook.active
+            
+            profiles = []
+            row_count = 0
+            blank_run = 0
+            
+            # Başlık satırını atla, 2. satırdan başla
+            for row in worksheet.iter_rows(min_row=2, max_col=_MAX_COLUMN, values_only=True):
+                # Tamamen boş satırlar (sadece formatlı) için kategori kontrolü yapma
+                if not any(row):
+                    blank_run += 1
+                    if blank_run >= MAX_BLANK_RUN:
+                        logger.info(f"{MAX_BLANK_RUN} boş satır art arda, veri sonu kabul edildi")
+                        break
+                    continue
+                
+                blank_run = 0
+                row_count += 1
+                profiles.extend(_parse_row(row))
+        finally:
+            # Read-only workbook dosya handle'ını açık tutar
+            workbook.close()
+        
+        elapsed = time.perf_counter() - start_time
+        rows_per_sec = row_count / elapsed if elapsed > 0 else float(row_count)
+        logger.info(
+            f"Toplam {len(profiles)} profil parse edildi "
+            f"({row_count} veri satırı, {elapsed * 1000:.1f} ms, {rows_per_sec:.0f} satır/sn)"
+        )
         return profiles
         
     except Exception as e:
@@ -67,18 +108,18 @@ def parse_excel_file(file_path: str) -> List[Profile]:
         raise
 
 
-def _parse_row(worksheet, row_idx: int) -> List[Profile]:
+def _parse_row(row: Tuple) -> List[Profile]:
     """
     Tek bir satırı parse eder ve tüm kategorilerdeki profilleri döner
     
     Args:
-        worksheet: Excel worksheet
-        row_idx: Satır numarası
+        row: Satır değerleri (values_only tuple)
         
     Returns:
         Bu satırdaki Profile nesnelerinin listesi
     """
     profiles = []
+    row_len = len(row)
     
     # Her kategori için kontrol et
     for category_name, config in CATEGORY_COLUMNS.items():
@@ -86,8 +127,7 @@ def _parse_row(worksheet, row_idx: int) -> List[Profile]:
         dimension_cols = config["dimensions"]
         
         # Profil kodunu al
-        code_cell = worksheet.cell(row=row_idx, column=code_col + 1)
-        code = code_cell.value
+        code = row[code_col] if code_col < row_len else None
         
         # Kod yoksa veya boşsa bu kategoriyi atla
         if not code or not isinstance(code, str):
@@ -98,8 +138,7 @@ def _parse_row(worksheet, row_idx: int) -> List[Profile]:
         has_valid_dimension = False
         
         for dim_name, dim_col in dimension_cols.items():
-            dim_cell = worksheet.cell(row=row_idx, column=dim_col + 1)
-            dim_value = dim_cell.value
+            dim_value = row[dim_col] if dim_col < row_len else None
             
             # Ölçü değeri varsa ve sayısal ise ekle
             if dim_value is not None and isinstance(dim_value, (int, float)):
@@ -177,6 +216,19 @@ def validate_profiles(profiles: List[Profile]) -> List[Profile]:
     return valid_profiles
 
 
+def build_profiles(file_path: str) -> List[Profile]:
+    """
+    Excel'i parse edip validate eder (build executor giriş noktası)
+    
+    Args:
+        file_path: Excel dosya yolu
+        
+    Returns:
+        Validate edilmiş Profile listesi
+    """
+    return validate_profiles(parse_excel_file(file_path))
+
+
 def get_category_summary(profiles: List[Profile]) -> Dict[str, int]:
     """
     Kategorilere göre profil sayılarını döner
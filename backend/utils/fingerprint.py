@@ -0,0 +1,61 @@
+"""
+Dosya parmak izi yardımcıları
+İndirilen Excel dosyalarının ve türetilmiş metin kümelerinin içerik hash'ini
+hesaplar (değişiklik tespiti için)
+"""
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dosyayı parça parça oku (büyük dosyalarda belleği şişirmemek için)
+_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: Union[str, Path]) -> Optional[str]:
+    """
+    Dosyanın SHA-256 içerik hash'ini hesapla
+
+    Args:
+        file_path: Dosya yolu
+
+    Returns:
+        Hex formatında hash veya dosya yoksa None
+    """
+    path = Path(file_path)
+
+    if not path.exists():
+        return None
+
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    except OSError as e:
+        logger.error(f"Hash hesaplama hatası ({path}): {e}")
+        return None
+
+
+def compute_text_hash(texts: Iterable[str], salt: str = "") -> str:
+    """
+    Metin listesinin SHA-256 hash'i (sıra dahil)
+
+    Args:
+        texts: Metinler
+        salt: Hash'e katılacak ek bilgi (örn. vectorizer parametreleri)
+
+    Returns:
+        Hex formatında hash
+    """
+    digest = hashlib.sha256(salt.encode('utf-8'))
+    for text in texts:
+        # Uzunluk öneki metin sınırlarını belirsizlikten korur ("ab","c" != "a","bc")
+        encoded = text.encode('utf-8')
+        digest.update(len(encoded).to_bytes(8, 'little'))
+        digest.update(encoded)
+    return digest.hexdigest()
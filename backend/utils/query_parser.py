@@ -0,0 +1,548 @@
+"""
+Sorgu parser'ı
+Chat mesajını bir kez ayrıştırıp yapılandırılmış ParsedQuery üretir.
+Tüm regex'ler modül yüklenirken derlenir; aynı mesaj için sonuç LRU
+cache'ten döner. Yönlendirme (small talk, katalog, birleşim, benzerlik)
+ve arama kodu mesajı tekrar tekrar taramak yerine bu nesneyi kullanır.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+# Parse edilen mesaj cache'i (ham mesaj → ParsedQuery)
+PARSE_CACHE_SIZE = 2048
+
+# --- Small talk ---
+GREETINGS = (
+    'merhaba', 'selam', 'günaydın', 'iyi günler', 'hey', 'hi', 'hello',
+    'nasılsın', 'nasılsınız', 'naber', 'nasilsin', 'nasilsiniz',
+    'hoş geldin', 'hoşgeldin', 'hos geldin', 'hosgeldin'
+)
+
+FAREWELLS = (
+    'görüşürüz', 'hoşça kal', 'güle güle', 'bay', 'bye', 'görüşmek üzere',
+    'gorusuruz', 'hosca kal', 'gule gule', 'teşekkür', 'tesekkur', 'sağol', 'sagol'
+)
+
+QUESTIONS_ABOUT_BOT = (
+    'kimsin', 'kim sin', 'adın ne', 'adin ne', 'ne yaparsın', 'ne yaparsin',
+    'nasıl yardım', 'nasil yardim', 'ne işe yarar', 'ne ise yarar',
+    'sen kimsin', 'sen ne', 'nedir bu', 'ne bu', 'yardım et', 'yardim et'
+)
+
+GENERAL_CHAT = (
+    'nasıl gidiyor', 'nasil gidiyor', 'ne var ne yok', 'naber',
+    'iyi misin', 'iyi misiniz', 'keyifler nasıl', 'keyifler nasil'
+)
+
+SMALL_TALK_KEYWORDS = GREETINGS + FAREWELLS + QUESTIONS_ABOUT_BOT + GENERAL_CHAT
+
+# --- Katalog / standart profil ayrımı ---
+# Ölçü bilgisi varsa katalog araması yapılmaz (örn. "30 a 30 kutu", "çap 28", "6 lama")
+DIMENSION_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'\d+\s*[axye]\s*\d+',  # 30x30, 30 a 30, 50 ye 50
+    r'\d+\s*mm',            # 30mm
+    r'çap\s*\d+',           # çap 28
+    r'\d+\s*çap',           # 28 çap
+    r'kalınlık',            # kalınlık 2mm
+    r'et\s*kalınlığı',      # et kalınlığı
+    r'\d+\s+\w+\s+\d+',     # 30 a 30, 50 ye 50
+    r'^\d+\s+\w+',          # 6 lama, 100 kutu (başta sayı + kelime)
+))
+SHAPE_PATTERN = re.compile(r'[ltucfhvsdmkr]\s+(?:şekl|sekl)')
+KUPESTE_WORDS = ('küpeşte', 'kupeşte', 'küpeste', 'kupeste')
+CATEGORY_WORDS = ('kategorisinde', 'kategorisindeki', 'kategoriden')
+
+# Katalog kategori çıkarımında atılan dolgu kelimeleri (sıra önemli)
+NOISE_WORDS = (
+    'sanırım', 'sanirim', 'galiba', 'herhalde', 'belki', 'gibi',
+    'varmı', 'var mı', 'var mi', 'varmı?', 'var mı?'
+)
+
+# Tek harfli şekilsel kategoriler: "L şeklinde", "şekli T", "U şekilli"
+SHAPE_LETTER_PATTERNS = tuple(
+    (letter, re.compile(
+        rf'(?:^|\s){letter.lower()}\s+(?:şeklinde|şekl(?!li)|sekl(?!li))'
+        rf'|(?:şekil|şekli|sekil|sekli)\s+{letter.lower()}'
+        rf'|(?:^|\s)({letter.lower()})\s+(?:şekilli|sekilli)'
+    ))
+    for letter in ('L', 'T', 'U', 'C', 'H', 'V', 'S', 'F', 'D', 'M', 'K', 'R')
+)
+
+# --- Standart profil ölçüleri ---
+CAP_PATTERN = re.compile(r'(?:çap|cap|ø)\s*(\d+(?:\.\d+)?)')
+AXB_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*[xX×]\s*(\d+(?:\.\d+)?)')
+A_AND_B_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:[aA]|ye|YE|[eE]|ya|YA)\s*(\d+(?:\.\d+)?)')
+THICKNESS_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    # "kalınlığı X milimetre/mm olan"
+    r'(?:kalınlığı|kalinligi)\s*(\d+(?:\.\d+)?)\s*(?:mm|milimetre|milim)?\s*(?:olan)?',
+    # "X mm/milimetre kalınlık/kalınlıkta"
+    r'(\d+(?:\.\d+)?)\s*(?:mm|milimetre|milim)?\s*(?:kalınlık|kalinlik|kalınlıkta|kalinlikta)',
+    # "kalınlık X" veya "et kalınlığı X"
+    r'(?:kalınlık|kalinlik|et kalınlığı|et kalinligi)\s*(\d+(?:\.\d+)?)',
+))
+SINGLE_NUMBER_PATTERN = re.compile(r'\b(\d+(?:\.\d+)?)\b')
+DIGIT_PATTERN = re.compile(r'\d+')
+SHAPE_CATEGORY_LETTERS = ('T', 'U', 'L', 'C', 'H', 'V', 'S', 'F', 'D', 'M', 'K', 'R', 'E')
+
+# Yakın değer önerisi için tam sayı ölçüler
+SIZE_PAIR_PATTERN = re.compile(r'(\d+)\s*[axye]\s*(\d+)')
+SIZE_PAIR_KEYWORD_PATTERN = re.compile(r'\d+\s*[axye]\s*\d+\s*(\w+)')
+SIZE_KEYWORD_PATTERN = re.compile(r'\d+\s*(\w+)')
+CAP_VALUE_PATTERN = re.compile(r'(?:çap|cap)\s*(\d+)|(\d+)\s*(?:çap|cap)')
+LEADING_NUMBER_PATTERN = re.compile(r'^(\d+)\s+\w+')
+
+# "±N" takip mesajı: "3", "10 lama"
+RANGE_PATTERN = re.compile(r'^(\d+)(?:\s+\w+)?$')
+
+# --- Profil kodları ---
+LR_CODE_PATTERN = re.compile(r'[LG][LR]-?\d{4}(?:-\d)?', re.IGNORECASE)
+AP_CODE_PATTERN = re.compile(r'AP\d{4,5}', re.IGNORECASE)
+AP_CODES_PATTERN = re.compile(r'\b(AP\d+)\b')
+
+# Katalog profil kodu aramaları (büyük harfli mesajda, öncelik sırasıyla)
+CATALOG_CODE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'\b([LG][LR]-?\d{4}(?:-\d)?)\b',  # LR-3101, LR3101-1, GL3201
+    r'\b(AP\d{3,5})\b',                 # AP0028, AP278, AP17382
+    r'\b([A-Z]{2,}-[A-Z]+-\d+)\b',     # BM-RAY-001
+))
+# Suffix'siz temel kod: LR3101, GLR64 (ama LR3101-1 değil)
+BASE_CODE_PATTERN = re.compile(r'\b([LG][LR]R?-?\d{2,4})\b(?!-\d)')
+
+# --- Birleşim sorguları ---
+# Birleşim kodu: GLR64-05, LR-3101, vb. (büyük harfli mesajda)
+CONNECTION_CODE_PATTERN = re.compile(r'\b([A-Z]{2,3}R?-?\d{2,4}(?:-\d{2})?)\b')
+CONNECTION_CODE_NO_DASH_PATTERN = re.compile(r'^(LR|GLR)(\d+)$')
+CONNECTION_CODE_SPLIT_PATTERN = re.compile(r'^(GLR)(\d{2})(\d{2})$')
+CONNECTION_KEYWORDS = (
+    'fitil', 'birleşim', 'birlesim', 'bağlan', 'baglan',
+    'hangi profil', 'hangi fitil', 'birleşim kodu',
+    'birlesim kodu', 'bariyer', 'conta', 'birleşir',
+    'birlesir', 'bağlanır', 'baglanir', 'hangi sistemde',
+    'gasket', 'barrier', 'sisteminde', 'sistemdeki'
+)
+
+# --- Şirket filtreleri ---
+COMPANY_NAMES = ('beymetal', 'alfore', 'linearossa')
+COMPANY_LIST_PATTERN = re.compile(r'\((.*?)\s+şirketleri?\)')
+COMPANY_PATTERNS = tuple(
+    (company, re.compile(rf'{company}\s+(?:şirketi|sirketi|firması|firmas)'))
+    for company in COMPANY_NAMES
+)
+
+# --- Benzerlik istekleri ---
+SIMILARITY_KEYWORDS = ('benzer', 'benzeri', 'benzerleri', 'benzeyen', 'gibi', 'similar', 'like', 'benzer profil')
+SIMILARITY_CODE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(LR[\s-]?\d{4}(?:-\d+)?)',  # LR3104, LR-3104, LR 3104-1
+    r'(GL[\s-]?\d{4}(?:-\d+)?)',  # GL3100, GL-3100
+    r'(A\s+\d{4})',                # A 3703
+    r'(AP\d{4})',                  # AP0001
+    r'([A-Z]{2,}\d{4})',           # Genel: BEYMETAL3104 gibi
+    r'([A-Z]+[\s-]?\d{3,4}(?:-\d+)?)'  # Genel pattern
+))
+SIMILARITY_COUNT_PATTERN = re.compile(r'\b(\d+)\s*(?:tane|adet|benzer|benzeri)?\b')
+DEFAULT_SIMILARITY_COUNT = 30
+MAX_SIMILARITY_COUNT = 100
+
+_TURKISH_FOLD = str.maketrans({'ı': 'i', 'ş': 's', 'ğ': 'g', 'ü': 'u', 'ö': 'o', 'ç': 'c'})
+
+
+@lru_cache(maxsize=4096)
+def fold_turkish(text: str) -> str:
+    """
+    Türkçe karakterleri ASCII'ye katla ve küçük harfe çevir
+    
+    Args:
+        text: Metin (örn. "KÜPEŞTE", "Daİre")
+    
+    Returns:
+        Katlanmış metin (örn. "kupeste", "daire")
+    """
+    # Büyük harfler lower() çağrılmadan önce: Türkçe İ → i, İngilizce I → ı → i
+    text = text.replace('İ', 'i').replace('I', 'ı').lower().translate(_TURKISH_FOLD)
+    
+    # Combining karakterleri temizle (İ'nin lower() sonrası bıraktığı nokta)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+CONNECTION_KEYWORDS_FOLDED = tuple(fold_turkish(keyword) for keyword in CONNECTION_KEYWORDS)
+
+
+@dataclass(frozen=True)
+class QueryDimensions:
+    """
+    Sorgudaki ölçü ifadeleri
+    
+    Attributes:
+        cap: "çap 28", "ø28"
+        axb: "30x40" (A, B)
+        a_and_b: "30 a 40", "20 ye 20" (A, B)
+        thickness: "kalınlık 2", "2 mm kalınlıkta"
+        single_number: Sorgudaki ilk sayı
+        size_pair: Tam sayı çifti ("30x30", "30 a 30", "100 e 200")
+        size_keyword: Ölçüden sonra gelen kelime ("30x30 kutu" → "kutu")
+        value: Yakın değer araması için tek ölçü (AxB farklıysa None)
+        has_digit: Sorguda rakam var mı
+    """
+    cap: Optional[float] = None
+    axb: Optional[Tuple[float, float]] = None
+    a_and_b: Optional[Tuple[float, float]] = None
+    thickness: Optional[float] = None
+    single_number: Optional[float] = None
+    size_pair: Optional[Tuple[int, int]] = None
+    size_keyword: Optional[str] = None
+    value: Optional[int] = None
+    has_digit: bool = False
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """
+    Tek geçişte ayrıştırılmış chat mesajı
+    
+    Attributes:
+        raw: Ham mesaj
+        lower: Küçük harfli mesaj
+        normalized: Türkçe karakterleri katlanmış mesaj
+        cleaned: Dolgu kelimeleri atılmış küçük harfli mesaj (katalog kategorileri için)
+        cleaned_normalized: cleaned'in katlanmış hali
+        dimensions: Ölçü ifadeleri
+        category_filter: Standart profil kategori kelimesi (KUTU, LAMA, T, ...)
+        shape_letters: "L şeklinde" gibi tek harfli şekilsel kategoriler
+        companies: Şirket filtresi (yoksa None)
+        profile_code: LR/GL veya AP profil kodu
+        ap_codes: Sorgudaki tüm AP kodları
+        catalog_codes: Katalog profil kodu adayları (LR/GL, AP, BM-RAY-001 sırasıyla)
+        base_code: Suffix'siz temel kod, tireli yazımla (LR3101 → LR-3101)
+        connection_code: Birleşim kodu, tireli yazımla (LR3101 → LR-3101)
+        range_value: "±N" takip mesajındaki N
+        similarity_code: Benzerlik isteğindeki profil kodu
+        similarity_count: Benzerlik isteğinde istenen sonuç sayısı
+        dimension_pattern: Katalog aramasını engelleyen ölçü pattern'i
+        is_small_talk: Genel sohbet mi
+        is_connection: Birleşim / fitil sorusu mu
+        is_similarity: Benzerlik isteği mi
+        catalog_hint: Şekil / daire / küpeşte / "kategorisinde" ifadesi var mı
+        mentions_daire: "daire" geçiyor mu
+        mentions_kupeste: "küpeşte" geçiyor mu
+    """
+    raw: str
+    lower: str
+    normalized: str
+    cleaned: str
+    cleaned_normalized: str
+    dimensions: QueryDimensions
+    category_filter: Optional[str] = None
+    shape_letters: Tuple[str, ...] = ()
+    companies: Optional[Tuple[str, ...]] = None
+    profile_code: Optional[str] = None
+    ap_codes: Tuple[str, ...] = ()
+    catalog_codes: Tuple[str, ...] = ()
+    base_code: Optional[str] = None
+    connection_code: Optional[str] = None
+    range_value: Optional[int] = None
+    similarity_code: Optional[str] = None
+    similarity_count: int = DEFAULT_SIMILARITY_COUNT
+    dimension_pattern: Optional[str] = None
+    is_small_talk: bool = False
+    is_connection: bool = False
+    is_similarity: bool = False
+    catalog_hint: bool = False
+    mentions_daire: bool = False
+    mentions_kupeste: bool = False
+
+
+def _float_pair(match: Optional[re.Match]) -> Optional[Tuple[float, float]]:
+    return (float(match.group(1)), float(match.group(2))) if match else None
+
+
+def _parse_dimensions(lower: str) -> QueryDimensions:
+    """Ölçü ifadelerini çıkar"""
+    cap_match = CAP_PATTERN.search(lower)
+    
+    thickness = None
+    for pattern in THICKNESS_PATTERNS:
+        match = pattern.search(lower)
+        if match:
+            thickness = float(match.group(1))
+            break
+    
+    single_match = SINGLE_NUMBER_PATTERN.search(lower)
+    
+    # Yakın değer önerisi: AxB önce (farklı ölçülerse tek değer yok), sonra çap, sonra baştaki sayı
+    pair_match = SIZE_PAIR_PATTERN.search(lower)
+    size_pair = None
+    if pair_match:
+        size_pair = (int(pair_match.group(1)), int(pair_match.group(2)))
+        keyword_match = SIZE_PAIR_KEYWORD_PATTERN.search(lower)
+        value = size_pair[0] if size_pair[0] == size_pair[1] else None
+    else:
+        keyword_match = SIZE_KEYWORD_PATTERN.search(lower)
+        value = None
+        match = CAP_VALUE_PATTERN.search(lower)
+        if match:
+            value = int(match.group(1) or match.group(2))
+        else:
+            match = LEADING_NUMBER_PATTERN.match(lower)
+            if match:
+                value = int(match.group(1))
+    
+    return QueryDimensions(
+        cap=float(cap_match.group(1)) if cap_match else None,
+        axb=_float_pair(AXB_PATTERN.search(lower)),
+        a_and_b=_float_pair(A_AND_B_PATTERN.search(lower)),
+        thickness=thickness,
+        single_number=float(single_match.group(1)) if single_match else None,
+        size_pair=size_pair,
+        size_keyword=keyword_match.group(1) if keyword_match else None,
+        value=value,
+        has_digit=DIGIT_PATTERN.search(lower) is not None
+    )
+
+
+def _parse_category_filter(lower: str) -> Optional[str]:
+    """Standart profil kategori filtresi - öncelik sırasına dikkat (uzun kelimeler önce)"""
+    if 'köşebent' in lower or 'kosebent' in lower:
+        return 'KÖŞEBENT'
+    elif 't profil' in lower or 't tipi' in lower:
+        return 'T'
+    elif 'u profil' in lower or 'u tipi' in lower:
+        return 'U'
+    elif 'kutu' in lower:
+        return 'KUTU'
+    elif 'lama' in lower:
+        return 'LAMA'
+    
+    # Tek harf kontrolü - sorgunun sonunda tek harf varsa ("50 ye 50 t", "40x40 l")
+    words = lower.strip().split()
+    if words:
+        last_word = words[-1].strip()
+        if len(last_word) == 1 and last_word.upper() in SHAPE_CATEGORY_LETTERS:
+            return last_word.upper()
+    
+    return None
+
+
+def _parse_small_talk(lower: str) -> bool:
+    """Kısa ve small talk kelimesi içeren veya sadece selamlaşma olan mesajlar"""
+    stripped = lower.strip()
+    if len(stripped.split()) <= 5 and any(keyword in stripped for keyword in SMALL_TALK_KEYWORDS):
+        return True
+    return stripped in GREETINGS or stripped in FAREWELLS
+
+
+def _parse_companies(lower: str) -> Optional[Tuple[str, ...]]:
+    """Şirket filtresi: "(alfore, beymetal şirketleri)", "beymetal şirketi", "alfore" """
+    match = COMPANY_LIST_PATTERN.search(lower)
+    if match:
+        return tuple(c.strip() for c in match.group(1).split(','))
+    
+    companies = tuple(company for company, pattern in COMPANY_PATTERNS if pattern.search(lower))
+    if not companies:
+        companies = tuple(company for company in COMPANY_NAMES if company in lower)
+    
+    return companies or None
+
+
+def _parse_profile_code(raw: str) -> Optional[str]:
+    """LR/GL (Linearossa/Giyotin) kodu önce, sonra AP kodu"""
+    match = LR_CODE_PATTERN.search(raw) or AP_CODE_PATTERN.search(raw)
+    return match.group(0).upper() if match else None
+
+
+def _parse_catalog_codes(upper: str) -> Tuple[str, ...]:
+    """Her katalog kodu pattern'inin ilk eşleşmesi, pattern sırasıyla"""
+    return tuple(
+        match.group(1)
+        for match in (pattern.search(upper) for pattern in CATALOG_CODE_PATTERNS)
+        if match
+    )
+
+
+def _parse_base_code(upper: str) -> Optional[str]:
+    """Suffix'siz temel kod; tire yoksa eklenir (LR3101 → LR-3101, GLR6405 → GLR64-05)"""
+    match = BASE_CODE_PATTERN.search(upper)
+    if not match:
+        return None
+    
+    base_code = match.group(1)
+    if '-' not in base_code:
+        if base_code.startswith('GLR') and len(base_code) == 7:
+            base_code = f"{base_code[:5]}-{base_code[5:]}"
+        elif base_code.startswith(('LR', 'GL')):
+            base_code = f"{base_code[:2]}-{base_code[2:]}"
+    return base_code
+
+
+def _parse_connection_code(upper: str) -> Optional[str]:
+    """Birleşim kodu; tire yoksa eklenir (LR3101 → LR-3101)"""
+    match = CONNECTION_CODE_PATTERN.search(upper)
+    if not match:
+        return None
+    
+    connection_code = match.group(1)
+    if CONNECTION_CODE_NO_DASH_PATTERN.match(connection_code):
+        prefix = connection_code[:2] if connection_code.startswith('LR') else connection_code[:3]
+        connection_code = f"{prefix}-{connection_code[len(prefix):]}"
+    elif CONNECTION_CODE_SPLIT_PATTERN.match(connection_code):
+        # GLR6405 → GLR64-05
+        connection_code = f"{connection_code[:5]}-{connection_code[5:]}"
+    return connection_code
+
+
+def find_similarity_code(text: str) -> Optional[str]:
+    """
+    Benzerlik isteği için metindeki profil kodunu bul
+    
+    Args:
+        text: Mesaj veya konuşma geçmişindeki bir içerik
+    
+    Returns:
+        Profil kodu (yazıldığı gibi) veya None
+    """
+    for pattern in SIMILARITY_CODE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_query(message: str) -> ParsedQuery:
+    """
+    Mesajı tek geçişte ayrıştır
+    
+    Args:
+        message: Ham kullanıcı mesajı (cache anahtarı)
+    
+    Returns:
+        ParsedQuery (değiştirilemez, cache'ten paylaşılır)
+    """
+    lower = message.lower()
+    upper = message.upper()
+    normalized = fold_turkish(message)
+    
+    cleaned = lower
+    for noise in NOISE_WORDS:
+        cleaned = cleaned.replace(noise, ' ')
+    cleaned = ' '.join(cleaned.split())
+    
+    dimension_pattern = next(
+        (pattern.pattern for pattern in DIMENSION_PATTERNS if pattern.search(lower)),
+        None
+    )
+    mentions_daire = 'daire' in cleaned
+    mentions_kupeste = any(word in cleaned for word in KUPESTE_WORDS)
+    catalog_hint = (
+        SHAPE_PATTERN.search(lower) is not None
+        or 'daire' in lower
+        or any(word in lower for word in KUPESTE_WORDS)
+        or any(word in lower for word in CATEGORY_WORDS)
+    )
+    
+    is_similarity = any(keyword in lower for keyword in SIMILARITY_KEYWORDS)
+    similarity_code = find_similarity_code(message) if is_similarity else None
+    similarity_count = DEFAULT_SIMILARITY_COUNT
+    if is_similarity:
+        count_match = SIMILARITY_COUNT_PATTERN.search(lower)
+        if count_match:
+            similarity_count = min(int(count_match.group(1)), MAX_SIMILARITY_COUNT)
+    
+    range_match = RANGE_PATTERN.match(message.strip())
+    
+    return ParsedQuery(
+        raw=message,
+        lower=lower,
+        normalized=normalized,
+        cleaned=cleaned,
+        cleaned_normalized=fold_turkish(cleaned),
+        dimensions=_parse_dimensions(lower),
+        category_filter=_parse_category_filter(lower),
+        shape_letters=tuple(letter for letter, pattern in SHAPE_LETTER_PATTERNS if pattern.search(cleaned)),
+        companies=_parse_companies(lower),
+        profile_code=_parse_profile_code(message),
+        ap_codes=tuple(AP_CODES_PATTERN.findall(upper)),
+        catalog_codes=_parse_catalog_codes(upper),
+        base_code=_parse_base_code(upper),
+        connection_code=_parse_connection_code(upper),
+        range_value=int(range_match.group(1)) if range_match else None,
+        similarity_code=similarity_code,
+        similarity_count=similarity_count,
+        dimension_pattern=dimension_pattern,
+        is_small_talk=_parse_small_talk(lower),
+        is_connection=any(
+            keyword in lower or folded in normalized
+            for keyword, folded in zip(CONNECTION_KEYWORDS, CONNECTION_KEYWORDS_FOLDED)
+        ),
+        is_similarity=is_similarity,
+        catalog_hint=catalog_hint,
+        mentions_daire=mentions_daire,
+        mentions_kupeste=mentions_kupeste
+    )
+
+
+class CategoryMatcher:
+    """
+    Katalog kategorilerinin sorguda geçip geçmediğini bulan eşleştirici
+    
+    Kategori adları bir kez katlanır ve tam kelime pattern'leri bir kez
+    derlenir; veri nesli başına kurulur, sonra her mesajda sadece
+    match() çağrılır. Tek harfli şekilsel kategoriler (L, T, ...)
+    SHAPE_LETTER_PATTERNS ile bulunduğu için atlanır.
+    """
+    
+    def __init__(self, categories: Iterable[str]):
+        """
+        Args:
+            categories: Katalog kategori adları (standard, shape, sector sırasıyla)
+        """
+        # Uzun olanlar önce (daha spesifik); eşit uzunlukta verilen sıra korunur
+        ordered = sorted(categories, key=len, reverse=True)
+        self._entries = []
+        for category in ordered:
+            if len(category) == 1 and category.isalpha():
+                continue
+            folded = fold_turkish(category)
+            words = folded.split()
+            self._entries.append((
+                category,
+                folded,
+                re.compile(r'\b' + re.escape(folded) + r'\b'),
+                ' '.join(words[:2]) if len(words) >= 2 else None,
+                tuple(word for word in words if len(word) >= 4) if len(words) >= 2 else ()
+            ))
+    
+    def match(self, query_normalized: str) -> List[Tuple[str, str]]:
+        """
+        Sorguda geçen kategoriler
+        
+        Önce tam kelime eşleşmesi; 2+ kelimeli kategorilerde ilk iki kelime
+        veya en az 4 harfli herhangi bir kelime de yeterlidir (örn. "güneş
+        kırıcı" ve "menfez" → "Güneş Kırıcı Menfez").
+        
+        Args:
+            query_normalized: Katlanmış sorgu (ParsedQuery.cleaned_normalized)
+        
+        Returns:
+            (kategori, eşleşme türü) listesi; tür 'tam', 'kısmi - ilk 2 kelime'
+            veya 'kısmi - tek kelime'
+        """
+        found = []
+        seen = set()
+        for category, folded, pattern, first_two, words in self._entries:
+            if category in seen:
+                continue
+            if folded in query_normalized and pattern.search(query_normalized):
+                kind = 'tam'
+            elif first_two is not None and first_two in query_normalized:
+                kind = 'kısmi - ilk 2 kelime'
+            elif any(word in query_normalized for word in words):
+                kind = 'kısmi - tek kelime'
+            else:
+                continue
+            seen.add(category)
+            found.append((category, kind))
+        return found
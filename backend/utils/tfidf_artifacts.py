@@ -0,0 +1,138 @@
+"""
+TF-IDF artefaktları
+Fit edilmiş vectorizer'ın sözlüğünü/IDF'ini ve CSR embedding matrisini, profil
+metinlerinin hash'iyle etiketlenmiş bir klasöre yazar; başlangıçta hash
+tutuyorsa yeniden fit etmek yerine buradan (mmap ile) yükler
+"""
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Artefakt formatı değişirse artır (eski klasörler yok sayılır)
+ARTIFACT_VERSION = 1
+
+_MANIFEST = "manifest.json"
+_VOCABULARY = "vocabulary.json"
+_ARRAYS = ("idf", "data", "indices", "indptr")
+
+
+def _artifact_dir(root: Path, text_hash: str) -> Path:
+    """Hash'e ait artefakt klasörü"""
+    return root / text_hash[:16]
+
+
+def save_tfidf_artifacts(
+    root: Path,
+    vectorizer: TfidfVectorizer,
+    embeddings: sparse.csr_matrix,
+    text_hash: str
+) -> None:
+    """
+    Vectorizer sözlüğü/IDF'i ve CSR matrisi diske yaz
+    
+    Dosyalar önce geçici klasöre yazılır ve klasör tek rename ile yerine
+    konur; manifest'i olmayan klasör yüklenmez. Diğer hash'lere ait eski
+    klasörler silinir.
+    
+    Args:
+        root: Artefakt kök klasörü
+        vectorizer: Fit edilmiş vectorizer
+        embeddings: Profiller × özellikler CSR matrisi
+        text_hash: Profil metinlerinin hash'i
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    target = _artifact_dir(root, text_hash)
+    staging = root / f".{target.name}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    
+    matrix = sparse.csr_matrix(embeddings)
+    arrays = {
+        "idf": np.asarray(vectorizer.idf_),
+        "data": matrix.data,
+        "indices": matrix.indices,
+        "indptr": matrix.indptr,
+    }
+    for name in _ARRAYS:
+        np.save(staging / f"{name}.npy", arrays[name])
+    
+    # Sözlük sütun sırasıyla terim listesi olarak (terim -> indeks dict'i yerine)
+    with open(staging / _VOCABULARY, "w", encoding="utf-8") as f:
+        json.dump(vectorizer.get_feature_names_out().tolist(), f, ensure_ascii=False)
+    
+    with open(staging / _MANIFEST, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": ARTIFACT_VERSION,
+            "text_hash": text_hash,
+            "shape": list(matrix.shape),
+        }, f)
+    
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    
+    # Eski hash klasörlerini sil; başka süreçlerin geçici (.) klasörlerine dokunma
+    for entry in root.iterdir():
+        if entry.is_dir() and entry != target and not entry.name.startswith('.'):
+            shutil.rmtree(entry, ignore_errors=True)
+    
+    logger.info(f"TF-IDF artefaktları kaydedildi: {target} {matrix.shape}")
+
+
+def load_tfidf_artifacts(
+    root: Path,
+    template: TfidfVectorizer,
+    text_hash: str
+) -> Optional[Tuple[TfidfVectorizer, sparse.csr_matrix]]:
+    """
+    Hash'e ait artefaktları yükle
+    
+    Matris dizileri mmap ile açılır (kopyalanmaz).
+    
+    Args:
+        root: Artefakt kök klasörü
+        template: Fit edilmemiş vectorizer şablonu (parametreler buradan alınır)
+        text_hash: Güncel profil metinlerinin hash'i
+    
+    Returns:
+        (vectorizer, embeddings) veya artefakt yoksa/eşleşmiyorsa None
+    """
+    directory = _artifact_dir(root, text_hash)
+    manifest_path = directory / _MANIFEST
+    if not manifest_path.exists():
+        return None
+    
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != ARTIFACT_VERSION or manifest.get("text_hash") != text_hash:
+            return None
+        
+        with open(directory / _VOCABULARY, encoding="utf-8") as f:
+            terms = json.load(f)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        
+        vectorizer = clone(template)
+        vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        vectorizer.idf_ = np.array(arrays["idf"])
+        
+        embeddings = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(manifest["shape"]),
+            copy=False
+        )
+        logger.info(f"TF-IDF artefaktları yüklendi: {directory} {embeddings.shape}")
+        return vectorizer, embeddings
+    
+    except Exception as e:
+        logger.warning(f"TF-IDF artefaktları yüklenemedi ({directory}): {e}")
+        return None